@@ -6,6 +6,7 @@ import streamlit as st
 
 from visualizations.catalog import HOME_PAGE_KEY, PAGE_BY_KEY, PAGE_ORDER, VISUALIZATION_PAGES
 from visualizations.shared import load_project_text
+from visualizations.thumbnails import thumbnail_url
 
 
 st.set_page_config(
@@ -57,14 +58,21 @@ def render_home() -> None:
     )
     st.caption("Tip: the current page is mirrored in the URL as `?page=...`, so individual sketches are easy to bookmark.")
 
+    # Thumbnails are pre-rendered stills (python -m visualizations.thumbnails); the home page only
+    # links the ones already on disk, so browsing the catalog never starts a simulation.
     columns = st.columns(3, gap="large")
     for index, page in enumerate(VISUALIZATION_PAGES):
+        thumbnail = thumbnail_url(page.key)
+        if thumbnail:
+            preview = f'<img class="home-card-thumbnail" src="{thumbnail}" alt="{page.title}" loading="lazy" decoding="async">'
+        else:
+            preview = f'<div class="home-card-icon">{page.icon}</div>'
         with columns[index % 3]:
             with st.container(border=True):
                 st.markdown(
                     f"""
                     <div class="home-card">
-                        <div class="home-card-icon">{page.icon}</div>
+                        {preview}
                         <h3>{page.title}</h3>
                         <p>{page.description}</p>
                     </div>
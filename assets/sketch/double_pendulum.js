@@ -0,0 +1,187 @@
+// Many double pendulums stepped together from parallel typed arrays.
+//
+// Angles are measured from the downward vertical; the arms are massless rods of length r1 and
+// r2 carrying point masses m1 and m2. Pendulum i is (a1[i], a2[i]) with angular velocities
+// (v1[i], v2[i]). Time is measured in frames of the original sketch, which took one
+// semi-implicit Euler step of length 1 per frame.
+//
+// step() advances the first `count` pendulums by `steps` fixed steps of length `dt`:
+//   "euler"   semi-implicit Euler, the original update
+//   "verlet"  Stormer-Verlet for the non-separable Hamiltonian, in canonical momenta; second order
+//             and symplectic, so the energy error stays bounded instead of drifting. Its two
+//             implicit half steps are solved by fixed-point iteration.
+//   "rk4"     classic fourth-order Runge-Kutta
+
+const PENDULUM_EULER = "euler";
+const PENDULUM_VERLET = "verlet";
+const PENDULUM_RK4 = "rk4";
+const VERLET_MAX_ITERATIONS = 8;
+const VERLET_TOLERANCE = 1e-13;
+
+class PendulumEnsemble {
+  constructor(count) {
+    this.count = count;
+    this.a1 = new Float64Array(count);
+    this.a2 = new Float64Array(count);
+    this.v1 = new Float64Array(count);
+    this.v2 = new Float64Array(count);
+    this.energy0 = new Float64Array(count);
+    this.acc = new Float64Array(2);
+    this.velocity = new Float64Array(2);
+  }
+
+  step(method, dt, steps, g, m1, m2, r1, r2, count = this.count) {
+    const { a1, a2, v1, v2, acc } = this;
+    for (let i = 0; i < count; i++) {
+      let t1 = a1[i];
+      let t2 = a2[i];
+      let w1 = v1[i];
+      let w2 = v2[i];
+      for (let s = 0; s < steps; s++) {
+        if (method === PENDULUM_RK4) {
+          pendulumAcceleration(t1, t2, w1, w2, g, m1, m2, r1, r2, acc);
+          const k1a = acc[0];
+          const k1b = acc[1];
+          pendulumAcceleration(t1 + w1 * dt / 2, t2 + w2 * dt / 2, w1 + k1a * dt / 2, w2 + k1b * dt / 2, g, m1, m2, r1, r2, acc);
+          const k2a = acc[0];
+          const k2b = acc[1];
+          const u1 = w1 + k1a * dt / 2;
+          const u2 = w2 + k1b * dt / 2;
+          pendulumAcceleration(t1 + u1 * dt / 2, t2 + u2 * dt / 2, w1 + k2a * dt / 2, w2 + k2b * dt / 2, g, m1, m2, r1, r2, acc);
+          const k3a = acc[0];
+          const k3b = acc[1];
+          const x1 = w1 + k2a * dt / 2;
+          const x2 = w2 + k2b * dt / 2;
+          pendulumAcceleration(t1 + x1 * dt, t2 + x2 * dt, w1 + k3a * dt, w2 + k3b * dt, g, m1, m2, r1, r2, acc);
+          const y1 = w1 + k3a * dt;
+          const y2 = w2 + k3b * dt;
+          t1 += (w1 + 2 * u1 + 2 * x1 + y1) * dt / 6;
+          t2 += (w2 + 2 * u2 + 2 * x2 + y2) * dt / 6;
+          w1 += (k1a + 2 * k2a + 2 * k3a + acc[0]) * dt / 6;
+          w2 += (k1b + 2 * k2b + 2 * k3b + acc[1]) * dt / 6;
+        } else if (method === PENDULUM_VERLET) {
+          this.verlet(t1, t2, w1, w2, dt, g, m1, m2, r1, r2);
+          t1 = acc[0];
+          t2 = acc[1];
+          w1 = this.velocity[0];
+          w2 = this.velocity[1];
+        } else {
+          pendulumAcceleration(t1, t2, w1, w2, g, m1, m2, r1, r2, acc);
+          w1 += acc[0] * dt;
+          w2 += acc[1] * dt;
+          t1 += w1 * dt;
+          t2 += w2 * dt;
+        }
+      }
+      a1[i] = t1;
+      a2[i] = t2;
+      v1[i] = w1;
+      v2[i] = w2;
+    }
+  }
+
+  // One Stormer-Verlet step; the new angles land in this.acc and the angular velocities in this.velocity.
+  verlet(t1, t2, w1, w2, dt, g, m1, m2, r1, r2) {
+    const { acc: out, velocity } = this;
+    const inertia1 = (m1 + m2) * r1 * r1;
+    const inertia2 = m2 * r2 * r2;
+    const coupling = m2 * r1 * r2 * Math.cos(t1 - t2);
+    const p1 = inertia1 * w1 + coupling * w2;
+    const p2 = coupling * w1 + inertia2 * w2;
+
+    // p' = p - dt/2 dH/dq(q, p')
+    let h1 = p1;
+    let h2 = p2;
+    for (let k = 0; k < VERLET_MAX_ITERATIONS; k++) {
+      pendulumVelocity(t1, t2, h1, h2, m1, m2, r1, r2, velocity);
+      pendulumForce(t1, t2, velocity[0], velocity[1], g, m1, m2, r1, r2, out);
+      const next1 = p1 + out[0] * dt / 2;
+      const next2 = p2 + out[1] * dt / 2;
+      const change = Math.abs(next1 - h1) + Math.abs(next2 - h2);
+      h1 = next1;
+      h2 = next2;
+      if (change <= VERLET_TOLERANCE * (Math.abs(h1) + Math.abs(h2) + 1)) break;
+    }
+
+    // q'' = q + dt/2 (dH/dp(q, p') + dH/dp(q'', p'))
+    pendulumVelocity(t1, t2, h1, h2, m1, m2, r1, r2, velocity);
+    const u1 = velocity[0];
+    const u2 = velocity[1];
+    let n1 = t1 + u1 * dt;
+    let n2 = t2 + u2 * dt;
+    for (let k = 0; k < VERLET_MAX_ITERATIONS; k++) {
+      pendulumVelocity(n1, n2, h1, h2, m1, m2, r1, r2, velocity);
+      const next1 = t1 + (u1 + velocity[0]) * dt / 2;
+      const next2 = t2 + (u2 + velocity[1]) * dt / 2;
+      const change = Math.abs(next1 - n1) + Math.abs(next2 - n2);
+      n1 = next1;
+      n2 = next2;
+      if (change <= VERLET_TOLERANCE * (Math.abs(n1) + Math.abs(n2) + 1)) break;
+    }
+
+    // p'' = p' - dt/2 dH/dq(q'', p')
+    pendulumVelocity(n1, n2, h1, h2, m1, m2, r1, r2, velocity);
+    pendulumForce(n1, n2, velocity[0], velocity[1], g, m1, m2, r1, r2, out);
+    pendulumVelocity(n1, n2, h1 + out[0] * dt / 2, h2 + out[1] * dt / 2, m1, m2, r1, r2, velocity);
+    out[0] = n1;
+    out[1] = n2;
+  }
+
+  captureEnergy(g, m1, m2, r1, r2) {
+    for (let i = 0; i < this.count; i++) {
+      this.energy0[i] = pendulumEnergy(this.a1[i], this.a2[i], this.v1[i], this.v2[i], g, m1, m2, r1, r2);
+    }
+  }
+
+  // Largest |E - E0| over the ensemble, relative to the depth of the potential well.
+  maxEnergyDrift(g, m1, m2, r1, r2) {
+    let drift = 0;
+    for (let i = 0; i < this.count; i++) {
+      const energy = pendulumEnergy(this.a1[i], this.a2[i], this.v1[i], this.v2[i], g, m1, m2, r1, r2);
+      drift = Math.max(drift, Math.abs(energy - this.energy0[i]));
+    }
+    return drift / (g * ((m1 + m2) * r1 + m2 * r2));
+  }
+}
+
+function pendulumAcceleration(t1, t2, w1, w2, g, m1, m2, r1, r2, out) {
+  const total = 2 * m1 + m2;
+  const sum = m1 + m2;
+  const delta = t1 - t2;
+  const sinDelta = Math.sin(delta);
+  const cosDelta = Math.cos(delta);
+  const den = total - m2 * Math.cos(2 * delta);
+  out[0] = (-g * total * Math.sin(t1) - m2 * g * Math.sin(t1 - 2 * t2)
+    - 2 * sinDelta * m2 * (w2 * w2 * r2 + w1 * w1 * r1 * cosDelta)) / (r1 * den);
+  out[1] = (2 * sinDelta * (w1 * w1 * r1 * sum + g * sum * Math.cos(t1) + w2 * w2 * r2 * m2 * cosDelta))
+    / (r2 * den);
+}
+
+// Angular velocities for canonical momenta (p1, p2), inverting the 2x2 mass matrix.
+function pendulumVelocity(t1, t2, p1, p2, m1, m2, r1, r2, out) {
+  const inertia1 = (m1 + m2) * r1 * r1;
+  const inertia2 = m2 * r2 * r2;
+  const coupling = m2 * r1 * r2 * Math.cos(t1 - t2);
+  const det = inertia1 * inertia2 - coupling * coupling;
+  out[0] = (inertia2 * p1 - coupling * p2) / det;
+  out[1] = (inertia1 * p2 - coupling * p1) / det;
+}
+
+// Generalized forces -dH/dq, written in terms of the angular velocities.
+function pendulumForce(t1, t2, w1, w2, g, m1, m2, r1, r2, out) {
+  const coupling = m2 * r1 * r2 * w1 * w2 * Math.sin(t1 - t2);
+  out[0] = -coupling - (m1 + m2) * g * r1 * Math.sin(t1);
+  out[1] = coupling - m2 * g * r2 * Math.sin(t2);
+}
+
+function pendulumEnergy(t1, t2, w1, w2, g, m1, m2, r1, r2) {
+  const kinetic = 0.5 * (m1 + m2) * r1 * r1 * w1 * w1 + 0.5 * m2 * r2 * r2 * w2 * w2
+    + m2 * r1 * r2 * w1 * w2 * Math.cos(t1 - t2);
+  const potential = -(m1 + m2) * g * r1 * Math.cos(t1) - m2 * g * r2 * Math.cos(t2);
+  return kinetic + potential;
+}
+
+// Angle folded into [-PI, PI).
+function wrapAngle(angle) {
+  return angle - 2 * Math.PI * Math.floor((angle + Math.PI) / (2 * Math.PI));
+}
@@ -0,0 +1,464 @@
+// Gray-Scott reaction-diffusion backends sharing one interface:
+//   load(a, b)                      upload a row-major size x size state
+//   step(iterations, feed, kill)    advance the simulation
+//   paint(...)                      color the B concentration for display
+//   size                            grid edge length in cells
+//
+// GrayScottGpu ping-pongs an RG32F texture between two framebuffers in a private WebGL2 context and
+// paints into its own `canvas`. Without renderable float textures, GrayScottWorkers runs the
+// typed-array stencil of GrayScottCpu in Web Workers, one row band each, and GrayScottCpu itself is
+// the last resort on the main thread. All use the same 9-point Laplacian (0.2 edges, 0.05 corners),
+// keep the border cells fixed, and clamp concentrations to [0, 1].
+
+const GRAY_SCOTT_DIFFUSION_A = 1.0;
+const GRAY_SCOTT_DIFFUSION_B = 0.5;
+
+const GRAY_SCOTT_VERTEX_SHADER = `#version 300 es
+void main() {
+  vec2 corner = vec2(float((gl_VertexID << 1) & 2), float(gl_VertexID & 2));
+  gl_Position = vec4(corner * 2.0 - 1.0, 0.0, 1.0);
+}`;
+
+const GRAY_SCOTT_STEP_SHADER = `#version 300 es
+precision highp float;
+precision highp sampler2D;
+uniform sampler2D u_state;
+uniform float u_feed;
+uniform float u_kill;
+out vec4 outState;
+
+vec2 cell(ivec2 p) {
+  return texelFetch(u_state, p, 0).rg;
+}
+
+void main() {
+  ivec2 size = textureSize(u_state, 0);
+  ivec2 p = ivec2(gl_FragCoord.xy);
+  vec2 c = cell(p);
+  if (p.x == 0 || p.y == 0 || p.x == size.x - 1 || p.y == size.y - 1) {
+    outState = vec4(c, 0.0, 1.0);
+    return;
+  }
+  vec2 laplacian = -c
+    + 0.2 * (cell(p + ivec2(1, 0)) + cell(p - ivec2(1, 0)) + cell(p + ivec2(0, 1)) + cell(p - ivec2(0, 1)))
+    + 0.05 * (cell(p + ivec2(1, 1)) + cell(p - ivec2(1, 1)) + cell(p + ivec2(1, -1)) + cell(p - ivec2(1, -1)));
+  float reaction = c.r * c.g * c.g;
+  vec2 next = c + vec2(
+    ${GRAY_SCOTT_DIFFUSION_A.toFixed(1)} * laplacian.r - reaction + u_feed * (1.0 - c.r),
+    ${GRAY_SCOTT_DIFFUSION_B.toFixed(1)} * laplacian.g + reaction - (u_kill + u_feed) * c.g
+  );
+  outState = vec4(clamp(next, 0.0, 1.0), 0.0, 1.0);
+}`;
+
+// Same palette as grayScottColor() below.
+const GRAY_SCOTT_DISPLAY_SHADER = `#version 300 es
+precision highp float;
+precision highp sampler2D;
+uniform sampler2D u_state;
+out vec4 outColor;
+
+void main() {
+  ivec2 size = textureSize(u_state, 0);
+  ivec2 p = ivec2(gl_FragCoord.x, float(size.y) - gl_FragCoord.y);
+  float b = clamp(texelFetch(u_state, p, 0).g, 0.0, 1.0);
+  vec3 color = vec3(
+    11.0 + b * 30.0,
+    11.0 + (b > 0.2 ? b * 255.0 : b * 120.0),
+    11.0 + (b > 0.1 ? b * 382.5 : b * 150.0)
+  );
+  outColor = vec4(clamp(color, 0.0, 255.0) / 255.0, 1.0);
+}`;
+
+function grayScottColor(b, out, offset) {
+  out[offset] = 11 + b * 30;
+  out[offset + 1] = 11 + (b > 0.2 ? b * 255 : b * 120);
+  out[offset + 2] = 11 + (b > 0.1 ? b * 382.5 : b * 150);
+  out[offset + 3] = 255;
+}
+
+// Starting state: all A, with roughly one 15x15 square of B per 2000 cells (20 on a 200x200 grid).
+function seedGrayScott(size) {
+  const a = new Float32Array(size * size).fill(1);
+  const b = new Float32Array(size * size);
+  const squares = Math.max(1, Math.round(20 * (size * size) / 40000));
+  for (let s = 0; s < squares; s++) {
+    const startX = Math.floor(10 + Math.random() * (size - 20));
+    const startY = Math.floor(10 + Math.random() * (size - 20));
+    for (let y = startY; y < Math.min(size - 1, startY + 15); y++) {
+      for (let x = startX; x < Math.min(size - 1, startX + 15); x++) {
+        b[y * size + x] = 1;
+      }
+    }
+  }
+  return { a, b };
+}
+
+// `rows` defaults to a square grid; workers use shorter grids holding one band plus its halo.
+class GrayScottCpu {
+  constructor(size, rows = size) {
+    this.size = size;
+    this.rows = rows;
+    this.a = new Float32Array(size * rows);
+    this.b = new Float32Array(size * rows);
+    this.nextA = new Float32Array(size * rows);
+    this.nextB = new Float32Array(size * rows);
+  }
+
+  load(a, b) {
+    this.a.set(a);
+    this.b.set(b);
+    this.nextA.set(a);
+    this.nextB.set(b);
+  }
+
+  // Takes ownership of `a` and `b` without copying. The stencil never writes the outermost cells,
+  // so only those need mirroring into the scratch grids.
+  adopt(a, b) {
+    const w = this.size;
+    const lastRow = (this.rows - 1) * w;
+    this.a = a;
+    this.b = b;
+    for (const [source, scratch] of [[a, this.nextA], [b, this.nextB]]) {
+      scratch.set(source.subarray(0, w));
+      scratch.set(source.subarray(lastRow), lastRow);
+      for (let i = w; i < lastRow; i += w) {
+        scratch[i] = source[i];
+        scratch[i + w - 1] = source[i + w - 1];
+      }
+    }
+  }
+
+  step(iterations, feed, kill) {
+    const w = this.size;
+    for (let iter = 0; iter < iterations; iter++) {
+      const gridA = this.a;
+      const gridB = this.b;
+      const nextA = this.nextA;
+      const nextB = this.nextB;
+      for (let y = 1; y < this.rows - 1; y++) {
+        for (let x = 1; x < w - 1; x++) {
+          const i = y * w + x;
+          const a = gridA[i];
+          const b = gridB[i];
+
+          const lapA = -a
+            + (gridA[i - w] + gridA[i + w] + gridA[i - 1] + gridA[i + 1]) * 0.2
+            + (gridA[i - w - 1] + gridA[i - w + 1] + gridA[i + w - 1] + gridA[i + w + 1]) * 0.05;
+          const lapB = -b
+            + (gridB[i - w] + gridB[i + w] + gridB[i - 1] + gridB[i + 1]) * 0.2
+            + (gridB[i - w - 1] + gridB[i - w + 1] + gridB[i + w - 1] + gridB[i + w + 1]) * 0.05;
+
+          const reaction = a * b * b;
+          const valA = a + GRAY_SCOTT_DIFFUSION_A * lapA - reaction + feed * (1 - a);
+          const valB = b + GRAY_SCOTT_DIFFUSION_B * lapB + reaction - (kill + feed) * b;
+          nextA[i] = valA < 0 ? 0 : valA > 1 ? 1 : valA;
+          nextB[i] = valB < 0 ? 0 : valB > 1 ? 1 : valB;
+        }
+      }
+      this.a = nextA;
+      this.b = nextB;
+      this.nextA = gridA;
+      this.nextB = gridB;
+    }
+  }
+
+  // Writes the B concentration of rows [first, last) as RGBA into `pixels`, starting at its first byte.
+  paint(pixels, first = 0, last = this.rows) {
+    const b = this.b;
+    const offset = first * this.size;
+    for (let i = offset; i < last * this.size; i++) {
+      grayScottColor(b[i], pixels, (i - offset) * 4);
+    }
+    return true;
+  }
+}
+
+// Body of each simulation worker. A message carries one band of rows padded with `haloTop` and
+// `haloBottom` rows of neighbouring state. Halo rows are held fixed, so errors creep inward one row
+// per iteration, and halos as deep as the iteration count leave the band's own rows exact. The
+// state buffers are adopted rather than copied and go back, with the painted band, as transfers.
+function grayScottWorkerMain() {
+  let band = null;
+  self.onmessage = (event) => {
+    const { index, size, rows, haloTop, haloBottom, iterations, feed, kill } = event.data;
+    if (!band || band.rows !== rows) {
+      band = new GrayScottCpu(size, rows);
+    }
+    band.adopt(new Float32Array(event.data.a), new Float32Array(event.data.b));
+    band.step(iterations, feed, kill);
+
+    const pixels = new Uint8ClampedArray(event.data.pixels);
+    band.paint(pixels, haloTop, rows - haloBottom);
+    self.postMessage(
+      { index, a: band.a.buffer, b: band.b.buffer, pixels: pixels.buffer },
+      [band.a.buffer, band.b.buffer, pixels.buffer],
+    );
+  };
+}
+
+function grayScottWorkerSource() {
+  return [
+    `const GRAY_SCOTT_DIFFUSION_A = ${GRAY_SCOTT_DIFFUSION_A};`,
+    `const GRAY_SCOTT_DIFFUSION_B = ${GRAY_SCOTT_DIFFUSION_B};`,
+    grayScottColor.toString(),
+    GrayScottCpu.toString(),
+    `(${grayScottWorkerMain.toString()})();`,
+  ].join("\n");
+}
+
+// Runs the CPU stencil off the main thread. Bands advance in batches of `iterations`; as soon as
+// every band reports back, the next batch is dispatched, so the simulation runs at its own rate and
+// paint() simply copies out the newest finished frame.
+class GrayScottWorkers {
+  // Returns null when workers cannot be started (no Worker support or blob URLs blocked).
+  static create(size, count) {
+    if (typeof Worker === "undefined") {
+      return null;
+    }
+    let url = null;
+    try {
+      url = URL.createObjectURL(new Blob([grayScottWorkerSource()], { type: "text/javascript" }));
+      const workers = Array.from({ length: Math.max(1, Math.min(count, size >> 5)) }, () => new Worker(url));
+      return new GrayScottWorkers(size, workers, url);
+    } catch (error) {
+      if (url) URL.revokeObjectURL(url);
+      return null;
+    }
+  }
+
+  constructor(size, workers, url) {
+    this.size = size;
+    this.workers = workers;
+    this.url = url;
+    this.a = new Float32Array(size * size);
+    this.b = new Float32Array(size * size);
+    this.frame = new Uint8ClampedArray(size * size * 4);
+    this.frameVersion = 0;
+    this.paintedVersion = 0;
+    this.iterations = 1;
+    this.feed = 0;
+    this.kill = 0;
+    this.pending = 0;
+    this.failed = false;
+    this.bands = workers.map((worker, index) => {
+      const first = Math.floor(index * size / workers.length);
+      const last = Math.floor((index + 1) * size / workers.length);
+      worker.onmessage = (event) => this.receive(event.data);
+      worker.onerror = () => {
+        this.failed = true;
+      };
+      return { first, last, haloTop: 0, haloRows: -1, a: null, b: null, pixels: new ArrayBuffer((last - first) * size * 4) };
+    });
+  }
+
+  load(a, b) {
+    this.a.set(a);
+    this.b.set(b);
+  }
+
+  step(iterations, feed, kill) {
+    this.iterations = iterations;
+    this.feed = feed;
+    this.kill = kill;
+    if (this.pending === 0 && !this.failed) {
+      this.dispatch();
+    }
+  }
+
+  dispatch() {
+    const size = this.size;
+    const halo = this.workers.length > 1 ? this.iterations : 0;
+    this.bands.forEach((band, index) => {
+      const top = Math.max(0, band.first - halo);
+      const bottom = Math.min(size, band.last + halo);
+      const rows = bottom - top;
+      if (band.haloRows !== rows) {
+        band.haloRows = rows;
+        band.a = new ArrayBuffer(rows * size * 4);
+        band.b = new ArrayBuffer(rows * size * 4);
+      }
+      band.haloTop = band.first - top;
+      const a = new Float32Array(band.a);
+      const b = new Float32Array(band.b);
+      a.set(this.a.subarray(top * size, bottom * size));
+      b.set(this.b.subarray(top * size, bottom * size));
+      this.workers[index].postMessage({
+        index,
+        size,
+        rows,
+        haloTop: band.haloTop,
+        haloBottom: bottom - band.last,
+        iterations: this.iterations,
+        feed: this.feed,
+        kill: this.kill,
+        a: band.a,
+        b: band.b,
+        pixels: band.pixels,
+      }, [band.a, band.b, band.pixels]);
+    });
+    this.pending = this.bands.length;
+  }
+
+  receive({ index, a, b, pixels }) {
+    if (!this.workers) {
+      return;
+    }
+    const band = this.bands[index];
+    const size = this.size;
+    band.a = a;
+    band.b = b;
+    band.pixels = pixels;
+
+    const owned = (band.last - band.first) * size;
+    const offset = band.haloTop * size;
+    this.a.set(new Float32Array(a, offset * 4, owned), band.first * size);
+    this.b.set(new Float32Array(b, offset * 4, owned), band.first * size);
+    this.frame.set(new Uint8ClampedArray(pixels), band.first * size * 4);
+
+    this.pending--;
+    if (this.pending === 0) {
+      this.frameVersion++;
+      if (!this.failed) {
+        this.dispatch();
+      }
+    }
+  }
+
+  // Copies the newest finished frame into `pixels`; returns false if there is nothing new.
+  paint(pixels) {
+    if (this.paintedVersion === this.frameVersion) {
+      return false;
+    }
+    pixels.set(this.frame);
+    this.paintedVersion = this.frameVersion;
+    return true;
+  }
+
+  release() {
+    this.workers.forEach((worker) => worker.terminate());
+    this.workers = null;
+    URL.revokeObjectURL(this.url);
+  }
+}
+
+class GrayScottGpu {
+  // Returns null when WebGL2 or renderable float textures are unavailable.
+  static create(size) {
+    const canvas = document.createElement("canvas");
+    canvas.width = size;
+    canvas.height = size;
+    const gl = canvas.getContext("webgl2", { alpha: false, antialias: false, depth: false, stencil: false });
+    if (!gl || !gl.getExtension("EXT_color_buffer_float") || size > gl.getParameter(gl.MAX_TEXTURE_SIZE)) {
+      return null;
+    }
+    const step = linkGrayScottProgram(gl, GRAY_SCOTT_STEP_SHADER);
+    const display = linkGrayScottProgram(gl, GRAY_SCOTT_DISPLAY_SHADER);
+    if (!step || !display) {
+      return null;
+    }
+    const simulation = new GrayScottGpu(gl, size, step, display);
+    return simulation.complete() ? simulation : null;
+  }
+
+  constructor(gl, size, step, display) {
+    this.gl = gl;
+    this.canvas = gl.canvas;
+    this.size = size;
+    this.stepProgram = step;
+    this.displayProgram = display;
+    this.uniforms = {
+      stepState: gl.getUniformLocation(step, "u_state"),
+      feed: gl.getUniformLocation(step, "u_feed"),
+      kill: gl.getUniformLocation(step, "u_kill"),
+      displayState: gl.getUniformLocation(display, "u_state"),
+    };
+    this.vao = gl.createVertexArray();
+    this.textures = [this.createTexture(), this.createTexture()];
+    this.framebuffers = this.textures.map((texture) => {
+      const framebuffer = gl.createFramebuffer();
+      gl.bindFramebuffer(gl.FRAMEBUFFER, framebuffer);
+      gl.framebufferTexture2D(gl.FRAMEBUFFER, gl.COLOR_ATTACHMENT0, gl.TEXTURE_2D, texture, 0);
+      return framebuffer;
+    });
+    gl.bindFramebuffer(gl.FRAMEBUFFER, null);
+    this.current = 0;
+  }
+
+  createTexture() {
+    const gl = this.gl;
+    const texture = gl.createTexture();
+    gl.bindTexture(gl.TEXTURE_2D, texture);
+    gl.texParameteri(gl.TEXTURE_2D, gl.TEXTURE_MIN_FILTER, gl.NEAREST);
+    gl.texParameteri(gl.TEXTURE_2D, gl.TEXTURE_MAG_FILTER, gl.NEAREST);
+    gl.texParameteri(gl.TEXTURE_2D, gl.TEXTURE_WRAP_S, gl.CLAMP_TO_EDGE);
+    gl.texParameteri(gl.TEXTURE_2D, gl.TEXTURE_WRAP_T, gl.CLAMP_TO_EDGE);
+    gl.texImage2D(gl.TEXTURE_2D, 0, gl.RG32F, this.size, this.size, 0, gl.RG, gl.FLOAT, null);
+    return texture;
+  }
+
+  complete() {
+    const gl = this.gl;
+    gl.bindFramebuffer(gl.FRAMEBUFFER, this.framebuffers[0]);
+    const status = gl.checkFramebufferStatus(gl.FRAMEBUFFER);
+    gl.bindFramebuffer(gl.FRAMEBUFFER, null);
+    return status === gl.FRAMEBUFFER_COMPLETE;
+  }
+
+  load(a, b) {
+    const gl = this.gl;
+    const interleaved = new Float32Array(a.length * 2);
+    for (let i = 0; i < a.length; i++) {
+      interleaved[2 * i] = a[i];
+      interleaved[2 * i + 1] = b[i];
+    }
+    gl.bindTexture(gl.TEXTURE_2D, this.textures[this.current]);
+    gl.texSubImage2D(gl.TEXTURE_2D, 0, 0, 0, this.size, this.size, gl.RG, gl.FLOAT, interleaved);
+  }
+
+  step(iterations, feed, kill) {
+    const gl = this.gl;
+    gl.useProgram(this.stepProgram);
+    gl.bindVertexArray(this.vao);
+    gl.uniform1i(this.uniforms.stepState, 0);
+    gl.uniform1f(this.uniforms.feed, feed);
+    gl.uniform1f(this.uniforms.kill, kill);
+    gl.activeTexture(gl.TEXTURE0);
+    gl.viewport(0, 0, this.size, this.size);
+    for (let iter = 0; iter < iterations; iter++) {
+      const target = 1 - this.current;
+      gl.bindFramebuffer(gl.FRAMEBUFFER, this.framebuffers[target]);
+      gl.bindTexture(gl.TEXTURE_2D, this.textures[this.current]);
+      gl.drawArrays(gl.TRIANGLES, 0, 3);
+      this.current = target;
+    }
+    gl.bindFramebuffer(gl.FRAMEBUFFER, null);
+  }
+
+  // Colors the current state into this.canvas, top row first like the CPU pixel layout.
+  paint() {
+    const gl = this.gl;
+    gl.useProgram(this.displayProgram);
+    gl.bindVertexArray(this.vao);
+    gl.uniform1i(this.uniforms.displayState, 0);
+    gl.activeTexture(gl.TEXTURE0);
+    gl.bindTexture(gl.TEXTURE_2D, this.textures[this.current]);
+    gl.viewport(0, 0, this.size, this.size);
+    gl.drawArrays(gl.TRIANGLES, 0, 3);
+  }
+
+  release() {
+    this.gl.getExtension("WEBGL_lose_context")?.loseContext();
+  }
+}
+
+function linkGrayScottProgram(gl, fragmentSource) {
+  const program = gl.createProgram();
+  for (const [type, source] of [[gl.VERTEX_SHADER, GRAY_SCOTT_VERTEX_SHADER], [gl.FRAGMENT_SHADER, fragmentSource]]) {
+    const shader = gl.createShader(type);
+    gl.shaderSource(shader, source);
+    gl.compileShader(shader);
+    gl.attachShader(program, shader);
+  }
+  gl.linkProgram(program);
+  return gl.getProgramParameter(program, gl.LINK_STATUS) ? program : null;
+}
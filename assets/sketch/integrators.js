@@ -0,0 +1,129 @@
+// Allocation-free ODE steppers for the continuous attractor sketches.
+//
+// `derivative(state, out)` writes dstate/dt into `out`. `step()` advances `state` in place
+// by exactly `dt`; the adaptive method takes as many internal Dormand-Prince 5(4) substeps
+// as its error tolerance needs, remembering the last accepted size between calls.
+
+const INTEGRATOR_EULER = "euler";
+const INTEGRATOR_RK4 = "rk4";
+const INTEGRATOR_RK45 = "rk45";
+
+const DOPRI_C = [0, 1 / 5, 3 / 10, 4 / 5, 8 / 9, 1, 1];
+const DOPRI_A = [
+  [],
+  [1 / 5],
+  [3 / 40, 9 / 40],
+  [44 / 45, -56 / 15, 32 / 9],
+  [19372 / 6561, -25360 / 2187, 64448 / 6561, -212 / 729],
+  [9017 / 3168, -355 / 33, 46732 / 5247, 49 / 176, -5103 / 18656],
+  [35 / 384, 0, 500 / 1113, 125 / 192, -2187 / 6784, 11 / 84],
+];
+const DOPRI_B = [35 / 384, 0, 500 / 1113, 125 / 192, -2187 / 6784, 11 / 84, 0];
+const DOPRI_B_STAR = [5179 / 57600, 0, 7571 / 16695, 393 / 640, -92097 / 339200, 187 / 2100, 1 / 40];
+
+class OdeStepper {
+  constructor(derivative, dimension, tolerance = 1e-7) {
+    this.derivative = derivative;
+    this.dimension = dimension;
+    this.tolerance = tolerance;
+    this.stages = Array.from({ length: 7 }, () => new Float64Array(dimension));
+    this.scratch = new Float64Array(dimension);
+    this.candidate = new Float64Array(dimension);
+    this.adaptiveStep = 0;
+  }
+
+  step(method, state, dt) {
+    if (method === INTEGRATOR_RK4) {
+      this.rk4(state, dt);
+    } else if (method === INTEGRATOR_RK45) {
+      this.rk45(state, dt);
+    } else {
+      this.euler(state, dt);
+    }
+  }
+
+  euler(state, dt) {
+    const k = this.stages[0];
+    this.derivative(state, k);
+    for (let i = 0; i < this.dimension; i++) {
+      state[i] += k[i] * dt;
+    }
+  }
+
+  rk4(state, dt) {
+    const [k1, k2, k3, k4] = this.stages;
+    const scratch = this.scratch;
+    const n = this.dimension;
+
+    this.derivative(state, k1);
+    for (let i = 0; i < n; i++) scratch[i] = state[i] + k1[i] * dt / 2;
+    this.derivative(scratch, k2);
+    for (let i = 0; i < n; i++) scratch[i] = state[i] + k2[i] * dt / 2;
+    this.derivative(scratch, k3);
+    for (let i = 0; i < n; i++) scratch[i] = state[i] + k3[i] * dt;
+    this.derivative(scratch, k4);
+    for (let i = 0; i < n; i++) {
+      state[i] += (k1[i] + 2 * k2[i] + 2 * k3[i] + k4[i]) * dt / 6;
+    }
+  }
+
+  rk45(state, dt) {
+    let remaining = dt;
+    let h = this.adaptiveStep > 0 ? this.adaptiveStep : dt;
+    const minimum = dt * 1e-6;
+
+    while (remaining > minimum) {
+      const step = Math.max(h, minimum);
+      const trial = Math.min(step, remaining);
+      const error = this.dormandPrince(state, trial);
+      if (!Number.isFinite(error)) {
+        // The flow has blown up; step sizes cannot recover, so finish like the fixed-step methods.
+        state.set(this.candidate);
+        h = 0;
+        break;
+      }
+      const accepted = error <= 1 || trial <= minimum;
+      if (accepted) {
+        state.set(this.candidate);
+        remaining -= trial;
+      }
+      const factor = error === 0 ? 5 : Math.min(5, Math.max(0.2, 0.9 * Math.pow(error, -0.2)));
+      // A step clipped to land exactly on `dt` says nothing about the size we can afford.
+      if (!accepted || trial === step) h = Math.max(trial * factor, minimum);
+    }
+    this.adaptiveStep = h;
+  }
+
+  // One Dormand-Prince step from `state` into `this.candidate`; returns the scaled error norm.
+  dormandPrince(state, h) {
+    const stages = this.stages;
+    const scratch = this.scratch;
+    const candidate = this.candidate;
+    const n = this.dimension;
+
+    this.derivative(state, stages[0]);
+    for (let s = 1; s < 7; s++) {
+      const row = DOPRI_A[s];
+      for (let i = 0; i < n; i++) {
+        let sum = 0;
+        for (let j = 0; j < s; j++) sum += row[j] * stages[j][i];
+        scratch[i] = state[i] + h * sum;
+      }
+      this.derivative(scratch, stages[s]);
+    }
+
+    let error = 0;
+    for (let i = 0; i < n; i++) {
+      let high = 0;
+      let low = 0;
+      for (let s = 0; s < 7; s++) {
+        high += DOPRI_B[s] * stages[s][i];
+        low += DOPRI_B_STAR[s] * stages[s][i];
+      }
+      candidate[i] = state[i] + h * high;
+      const scale = this.tolerance * (1 + Math.max(Math.abs(state[i]), Math.abs(candidate[i])));
+      error = Math.max(error, Math.abs(h * (high - low)) / scale);
+    }
+    return error;
+  }
+}
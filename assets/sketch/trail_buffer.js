@@ -0,0 +1,311 @@
+// Preallocated ring buffer of 3D trail points with per-vertex RGBA colors.
+//
+// Every slot is stored twice (at i and i + capacity), so the live window is always one
+// contiguous range: new points are uploaded with bufferSubData and the whole trail is
+// drawn as a single instanced call that expands each segment into a screen-space quad.
+// Canvases without WebGL2 fall back to p5 immediate mode over the newest points.
+// `breakLine()` ends the current strip: the joining segment is fully transparent.
+
+const TRAIL_MAX_CAPACITY = 1000000;
+const TRAIL_FALLBACK_LIMIT = 20000;
+
+const TRAIL_VERTEX_SHADER = `#version 300 es
+in vec2 aCorner;
+in vec3 aStart;
+in vec3 aEnd;
+in vec4 aStartColor;
+in vec4 aEndColor;
+
+uniform mat4 uModelView;
+uniform mat4 uProjection;
+uniform vec2 uViewport;
+uniform float uWeight;
+
+out vec4 vColor;
+
+void main() {
+  vec4 clipStart = uProjection * uModelView * vec4(aStart, 1.0);
+  vec4 clipEnd = uProjection * uModelView * vec4(aEnd, 1.0);
+  vec2 screenStart = clipStart.xy / clipStart.w * uViewport;
+  vec2 screenEnd = clipEnd.xy / clipEnd.w * uViewport;
+  vec2 direction = screenEnd - screenStart;
+  direction = length(direction) > 0.0 ? normalize(direction) : vec2(1.0, 0.0);
+  vec2 normal = vec2(-direction.y, direction.x);
+
+  vec4 clip = mix(clipStart, clipEnd, aCorner.x);
+  clip.xy += normal * aCorner.y * uWeight / uViewport * clip.w;
+  gl_Position = clip;
+  vColor = mix(aStartColor, aEndColor, aCorner.x);
+}
+`;
+
+const TRAIL_FRAGMENT_SHADER = `#version 300 es
+precision mediump float;
+in vec4 vColor;
+out vec4 fragColor;
+
+void main() {
+  if (vColor.a == 0.0) discard;
+  fragColor = vColor;
+}
+`;
+
+class TrailBuffer {
+  constructor(capacity) {
+    this.gpu = null;
+    this.allocate(capacity);
+  }
+
+  allocate(capacity) {
+    this.capacity = Math.max(2, Math.min(Math.floor(capacity), TRAIL_MAX_CAPACITY));
+    this.positions = new Float32Array(this.capacity * 2 * 3);
+    this.colors = new Uint8Array(this.capacity * 2 * 4);
+    this.head = 0;
+    this.count = 0;
+    this.pending = 0;
+    this.resumeHidden = false;
+    this.reallocated = true;
+  }
+
+  get length() {
+    return this.count;
+  }
+
+  clear() {
+    this.head = 0;
+    this.count = 0;
+    this.pending = 0;
+    this.resumeHidden = false;
+  }
+
+  resize(capacity) {
+    const previous = { positions: this.positions, colors: this.colors, capacity: this.capacity };
+    const start = this.start();
+    const count = this.count;
+    this.allocate(capacity);
+
+    const kept = Math.min(count, this.capacity);
+    const from = start + count - kept;
+    for (let i = 0; i < kept; i++) {
+      const source = (from + i) % previous.capacity;
+      this.write(
+        previous.positions[source * 3], previous.positions[source * 3 + 1], previous.positions[source * 3 + 2],
+        previous.colors[source * 4], previous.colors[source * 4 + 1], previous.colors[source * 4 + 2],
+        previous.colors[source * 4 + 3]
+      );
+    }
+  }
+
+  start() {
+    return (this.head - this.count + this.capacity) % this.capacity;
+  }
+
+  push(x, y, z, r, g, b, a = 255) {
+    if (this.resumeHidden) {
+      this.resumeHidden = false;
+      this.push(x, y, z, r, g, b, 0);
+    }
+    this.write(x, y, z, r, g, b, a);
+    this.pending = Math.min(this.pending + 1, this.capacity);
+  }
+
+  breakLine() {
+    if (this.count === 0 || this.resumeHidden) return;
+    const last = (this.head - 1 + this.capacity) % this.capacity;
+    const p = this.positions;
+    const c = this.colors;
+    this.push(p[last * 3], p[last * 3 + 1], p[last * 3 + 2], c[last * 4], c[last * 4 + 1], c[last * 4 + 2], 0);
+    this.resumeHidden = true;
+  }
+
+  write(x, y, z, r, g, b, a) {
+    const capacity = this.capacity;
+    const slot = this.head;
+    for (let index = slot; index < capacity * 2; index += capacity) {
+      this.positions[index * 3] = x;
+      this.positions[index * 3 + 1] = y;
+      this.positions[index * 3 + 2] = z;
+      this.colors[index * 4] = r;
+      this.colors[index * 4 + 1] = g;
+      this.colors[index * 4 + 2] = b;
+      this.colors[index * 4 + 3] = a;
+    }
+    this.head = slot + 1 === capacity ? 0 : slot + 1;
+    this.count = Math.min(this.count + 1, capacity);
+  }
+
+  draw(weight) {
+    if (this.count < 2) return;
+    if (webglVersion !== WEBGL2 || !this.ensureGpu()) {
+      this.drawFallback(weight);
+      return;
+    }
+
+    const gl = drawingContext;
+    const gpu = this.gpu;
+    const previousProgram = gl.getParameter(gl.CURRENT_PROGRAM);
+    const previousBuffer = gl.getParameter(gl.ARRAY_BUFFER_BINDING);
+
+    gl.useProgram(gpu.program);
+    gl.bindVertexArray(gpu.vao);
+    this.upload(gl);
+
+    const start = this.start();
+    const stride = 3 * 4;
+    gl.bindBuffer(gl.ARRAY_BUFFER, gpu.positionBuffer);
+    gl.vertexAttribPointer(gpu.attributes.aStart, 3, gl.FLOAT, false, stride, start * stride);
+    gl.vertexAttribPointer(gpu.attributes.aEnd, 3, gl.FLOAT, false, stride, (start + 1) * stride);
+    gl.bindBuffer(gl.ARRAY_BUFFER, gpu.colorBuffer);
+    gl.vertexAttribPointer(gpu.attributes.aStartColor, 4, gl.UNSIGNED_BYTE, true, 4, start * 4);
+    gl.vertexAttribPointer(gpu.attributes.aEndColor, 4, gl.UNSIGNED_BYTE, true, 4, (start + 1) * 4);
+
+    gl.uniformMatrix4fv(gpu.uniforms.uModelView, false, _renderer.uMVMatrix.mat4);
+    gl.uniformMatrix4fv(gpu.uniforms.uProjection, false, _renderer.uPMatrix.mat4);
+    gl.uniform2f(gpu.uniforms.uViewport, gl.drawingBufferWidth / 2, gl.drawingBufferHeight / 2);
+    gl.uniform1f(gpu.uniforms.uWeight, weight * pixelDensity());
+    gl.drawArraysInstanced(gl.TRIANGLE_STRIP, 0, 4, this.count - 1);
+
+    gl.bindVertexArray(null);
+    gl.bindBuffer(gl.ARRAY_BUFFER, previousBuffer);
+    gl.useProgram(previousProgram);
+  }
+
+  upload(gl) {
+    const gpu = this.gpu;
+    if (this.reallocated) {
+      gl.bindBuffer(gl.ARRAY_BUFFER, gpu.positionBuffer);
+      gl.bufferData(gl.ARRAY_BUFFER, this.positions, gl.DYNAMIC_DRAW);
+      gl.bindBuffer(gl.ARRAY_BUFFER, gpu.colorBuffer);
+      gl.bufferData(gl.ARRAY_BUFFER, this.colors, gl.DYNAMIC_DRAW);
+      this.reallocated = false;
+      this.pending = 0;
+      return;
+    }
+    if (this.pending === 0) return;
+
+    // The dirty slots are the `pending` ones ending at head; split them where they wrap
+    // and refresh both mirrored copies of each range.
+    const capacity = this.capacity;
+    const first = (this.head - this.pending + capacity) % capacity;
+    const ranges = first + this.pending <= capacity
+      ? [[first, this.pending]]
+      : [[first, capacity - first], [0, this.pending - (capacity - first)]];
+    for (const [offset, length] of ranges) {
+      for (const mirror of [offset, offset + capacity]) {
+        gl.bindBuffer(gl.ARRAY_BUFFER, gpu.positionBuffer);
+        gl.bufferSubData(gl.ARRAY_BUFFER, mirror * 12, this.positions, mirror * 3, length * 3);
+        gl.bindBuffer(gl.ARRAY_BUFFER, gpu.colorBuffer);
+        gl.bufferSubData(gl.ARRAY_BUFFER, mirror * 4, this.colors, mirror * 4, length * 4);
+      }
+    }
+    this.pending = 0;
+  }
+
+  ensureGpu() {
+    if (this.gpu) return this.gpu.ok;
+
+    const gl = drawingContext;
+    const program = linkTrailProgram(gl);
+    if (!program) {
+      this.gpu = { ok: false };
+      return false;
+    }
+
+    const previousBuffer = gl.getParameter(gl.ARRAY_BUFFER_BINDING);
+    const attributes = {};
+    for (const name of ["aCorner", "aStart", "aEnd", "aStartColor", "aEndColor"]) {
+      attributes[name] = gl.getAttribLocation(program, name);
+    }
+    const uniforms = {};
+    for (const name of ["uModelView", "uProjection", "uViewport", "uWeight"]) {
+      uniforms[name] = gl.getUniformLocation(program, name);
+    }
+
+    // A private vertex array keeps the instancing state away from p5's own attributes.
+    const vao = gl.createVertexArray();
+    gl.bindVertexArray(vao);
+
+    const cornerBuffer = gl.createBuffer();
+    gl.bindBuffer(gl.ARRAY_BUFFER, cornerBuffer);
+    gl.bufferData(gl.ARRAY_BUFFER, new Float32Array([0, -1, 0, 1, 1, -1, 1, 1]), gl.STATIC_DRAW);
+    gl.enableVertexAttribArray(attributes.aCorner);
+    gl.vertexAttribPointer(attributes.aCorner, 2, gl.FLOAT, false, 0, 0);
+
+    for (const name of ["aStart", "aEnd", "aStartColor", "aEndColor"]) {
+      gl.enableVertexAttribArray(attributes[name]);
+      gl.vertexAttribDivisor(attributes[name], 1);
+    }
+
+    gl.bindVertexArray(null);
+    gl.bindBuffer(gl.ARRAY_BUFFER, previousBuffer);
+
+    this.gpu = {
+      ok: true,
+      program,
+      vao,
+      attributes,
+      uniforms,
+      positionBuffer: gl.createBuffer(),
+      colorBuffer: gl.createBuffer(),
+    };
+    this.reallocated = true;
+    return true;
+  }
+
+  drawFallback(weight) {
+    const start = this.start();
+    const count = Math.min(this.count, TRAIL_FALLBACK_LIMIT);
+    const first = start + this.count - count;
+
+    push();
+    colorMode(RGB, 255);
+    noFill();
+    strokeWeight(weight);
+    beginShape();
+    for (let i = first; i < first + count; i++) {
+      stroke(this.colors[i * 4], this.colors[i * 4 + 1], this.colors[i * 4 + 2], this.colors[i * 4 + 3]);
+      vertex(this.positions[i * 3], this.positions[i * 3 + 1], this.positions[i * 3 + 2]);
+    }
+    endShape();
+    pop();
+  }
+}
+
+function linkTrailProgram(gl) {
+  const compile = (type, source) => {
+    const shader = gl.createShader(type);
+    gl.shaderSource(shader, source);
+    gl.compileShader(shader);
+    if (!gl.getShaderParameter(shader, gl.COMPILE_STATUS)) {
+      console.warn("TrailBuffer shader failed to compile:", gl.getShaderInfoLog(shader));
+      return null;
+    }
+    return shader;
+  };
+
+  const vertexShader = compile(gl.VERTEX_SHADER, TRAIL_VERTEX_SHADER);
+  const fragmentShader = compile(gl.FRAGMENT_SHADER, TRAIL_FRAGMENT_SHADER);
+  if (!vertexShader || !fragmentShader) return null;
+
+  const program = gl.createProgram();
+  gl.attachShader(program, vertexShader);
+  gl.attachShader(program, fragmentShader);
+  gl.linkProgram(program);
+  if (!gl.getProgramParameter(program, gl.LINK_STATUS)) {
+    console.warn("TrailBuffer program failed to link:", gl.getProgramInfoLog(program));
+    return null;
+  }
+  return program;
+}
+
+// Fetches a server-computed trajectory (runs x steps x dimension float32 values, see
+// visualizations/attractor_engine.py) and hands the whole buffer to `onLoad`.
+function fetchTrajectory(descriptor, onLoad) {
+  fetch(descriptor.url)
+    .then((response) => {
+      if (!response.ok) throw new Error(`HTTP ${response.status}`);
+      return response.arrayBuffer();
+    })
+    .then((buffer) => onLoad(new Float32Array(buffer)))
+    .catch((error) => console.warn("Could not load precomputed trajectory:", error));
+}
@@ -1,10 +1,42 @@
 from __future__ import annotations
 
 import importlib
+import json
+import shutil
+import subprocess
+import tempfile
 import unittest
+from pathlib import Path
+from unittest import mock
+
+import numpy as np
+from PIL import Image
 
 from visualizations.catalog import HOME_PAGE_KEY, PAGE_ORDER, PAGE_BY_KEY, VISUALIZATION_PAGES
-from visualizations.shared import P5_BUNDLE_PATH, load_project_text
+from visualizations import (
+    attractor_engine,
+    fourier_engine,
+    gray_scott_engine,
+    headless_render,
+    ifs_engine,
+    lsystem_engine,
+    path_import,
+    shared,
+    thumbnails,
+    turmite_engine,
+)
+from visualizations.shared import (
+    LIVE_PARAMS_MESSAGE_TYPE,
+    P5_BUNDLE_PATH,
+    P5_DELIVERY_INLINE,
+    P5_DELIVERY_STATIC,
+    file_digest,
+    build_p5_document,
+    load_project_text,
+    p5_document_cache_info,
+    p5_script_tag,
+    render_p5_iframe,
+)
 
 
 class ProjectStructureTests(unittest.TestCase):
@@ -28,5 +60,496 @@ class ProjectStructureTests(unittest.TestCase):
         self.assertTrue(P5_BUNDLE_PATH.exists())
 
 
+class P5DeliveryTests(unittest.TestCase):
+    def test_static_delivery_references_hashed_bundle_url(self) -> None:
+        tag = p5_script_tag(P5_DELIVERY_STATIC)
+        self.assertIn(f"{P5_BUNDLE_PATH.name}?v={file_digest(P5_BUNDLE_PATH)}", tag)
+        self.assertLess(len(tag), 512)
+
+    def test_inline_delivery_embeds_bundle(self) -> None:
+        tag = p5_script_tag(P5_DELIVERY_INLINE)
+        self.assertGreater(len(tag), P5_BUNDLE_PATH.stat().st_size // 2)
+
+    def test_unknown_delivery_mode_is_rejected(self) -> None:
+        with self.assertRaises(ValueError):
+            p5_script_tag("carrier-pigeon")
+
+
+class DocumentCacheTests(unittest.TestCase):
+    def setUp(self) -> None:
+        build_p5_document.cache_clear()
+
+    def test_identical_documents_are_served_from_cache(self) -> None:
+        first = build_p5_document("function draw() {}", canvas_css="border: 0;")
+        second = build_p5_document("function draw() {}", canvas_css="border: 0;")
+        build_p5_document("function draw() { clear(); }", canvas_css="border: 0;")
+
+        info = p5_document_cache_info()
+        self.assertIsInstance(info, shared.DocumentCacheInfo)
+        self.assertIs(first, second)
+        self.assertEqual((info.hits, info.misses), (1, 2))
+
+    def test_sketch_libraries_are_injected(self) -> None:
+        document = build_p5_document("function draw() {}", libraries=("trail_buffer",))
+        self.assertIn("class TrailBuffer", document)
+
+    def test_cache_is_bounded(self) -> None:
+        for index in range(shared.DOCUMENT_CACHE_SIZE + 5):
+            build_p5_document(f"let frame = {index};")
+        self.assertEqual(p5_document_cache_info().currsize, shared.DOCUMENT_CACHE_SIZE)
+
+
+class LiveParamsTests(unittest.TestCase):
+    def render_twice(self, first: dict, second: dict) -> list[str]:
+        documents: list[str] = []
+        with mock.patch.object(shared.st, "session_state", {}), mock.patch.object(
+            shared.components, "html", side_effect=lambda html, height: documents.append(html)
+        ):
+            render_p5_iframe("function draw() {}", sketch_id="demo", live_params=first)
+            render_p5_iframe("function draw() {}", sketch_id="demo", live_params=second)
+        return documents
+
+    def test_sketch_document_is_reused_across_parameter_changes(self) -> None:
+        sketch, first_message, reused_sketch, second_message = self.render_twice({"speed": 1}, {"speed": 2})
+        self.assertEqual(sketch, reused_sketch)
+        self.assertIn(LIVE_PARAMS_MESSAGE_TYPE, second_message)
+        self.assertIn('"speed": 2', second_message)
+        self.assertLess(len(second_message), 1024)
+
+    def test_live_params_require_a_sketch_id(self) -> None:
+        with self.assertRaises(ValueError):
+            render_p5_iframe("function draw() {}", live_params={"speed": 1})
+
+
+class AttractorEngineTests(unittest.TestCase):
+    LORENZ = {"sigma": 10.0, "rho": 28.0, "beta": 8 / 3}
+
+    def test_single_run_matches_scalar_euler(self) -> None:
+        trajectory = attractor_engine.integrate_flow("lorenz", self.LORENZ, points=3, dt=0.01, method="euler")
+        x, y, z = 0.01, 0.0, 0.0
+        for expected in trajectory[0]:
+            x, y, z = (
+                x + 10.0 * (y - x) * 0.01,
+                y + (x * (28.0 - z) - y) * 0.01,
+                z + (x * y - 8 / 3 * z) * 0.01,
+            )
+            np.testing.assert_allclose(expected, (x, y, z), rtol=1e-5)
+
+    def test_long_trajectories_are_split_into_runs(self) -> None:
+        trajectory = attractor_engine.integrate_flow("lorenz", self.LORENZ, points=20_000, dt=0.01)
+        runs, steps, dimension = trajectory.shape
+        self.assertGreater(runs, 1)
+        self.assertGreaterEqual(runs * steps, 20_000)
+        self.assertEqual(dimension, 3)
+        self.assertTrue(np.isfinite(trajectory).all())
+
+    def test_diverging_flows_raise_instead_of_hanging(self) -> None:
+        # Reachable from the Aizawa sliders; the adaptive stepper used to shrink its step forever.
+        params = {"a": 1.0, "b": 0.7, "c": 1.0, "d": 0.0, "e": 0.0, "f": 1.0}
+        for method in ("euler", "rk4", "rk45"):
+            with self.subTest(method=method), self.assertRaises(ValueError):
+                attractor_engine.integrate_flow("aizawa", params, points=2000, dt=0.01, method=method)
+
+    def test_adaptive_step_recovers_after_a_rejection_at_the_minimum(self) -> None:
+        # Nine rejected trials (dt, dt/5, ...) push the step below dt * 1e-6; after that the flow is
+        # smooth and the step must grow back instead of crawling through dt at the minimum size.
+        rng = np.random.default_rng(0)
+        calls = 0
+
+        def derivative(state: np.ndarray, params: dict[str, float]) -> np.ndarray:
+            nonlocal calls
+            calls += 1
+            if calls > 10_000:
+                raise AssertionError("the step size never recovered")
+            return rng.normal(scale=1e9, size=state.shape) if calls <= 9 * 7 else np.zeros_like(state)
+
+        state = attractor_engine.rk45_step(derivative, np.ones((3, 1)), {}, 0.01)
+        self.assertTrue(np.isfinite(state).all())
+        self.assertLess(calls, 9 * 7 + 20 * 7)
+
+    @unittest.skipUnless(shutil.which("node"), "node is not installed")
+    def test_sketch_adaptive_step_recovers_after_a_rejection_at_the_minimum(self) -> None:
+        # Same scenario for OdeStepper, which also carries the step over to the next frame.
+        script = """
+        let calls = 0;
+        const stepper = new OdeStepper((state, out) => {
+          calls++;
+          if (calls > 10000) throw new Error("the step size never recovered");
+          out.fill(calls <= 9 * 7 ? (calls % 2 ? 1e9 : -1e9) * calls : 0);
+        }, 3);
+        stepper.step(INTEGRATOR_RK45, new Float64Array([1, 1, 1]), 0.01);
+        console.log(JSON.stringify([calls, stepper.adaptiveStep]));
+        """
+        source = (Path(__file__).resolve().parents[1] / "assets" / "sketch" / "integrators.js").read_text()
+        output = subprocess.run(["node", "-e", source + script], capture_output=True, text=True, check=True).stdout
+        calls, step = json.loads(output)
+        self.assertLess(calls, 9 * 7 + 20 * 7)
+        self.assertGreaterEqual(step, 0.01)
+
+    def test_trajectories_are_cached_on_disk(self) -> None:
+        with tempfile.TemporaryDirectory() as directory, mock.patch.object(
+            attractor_engine, "TRAJECTORY_CACHE_DIR", Path(directory)
+        ):
+            attractor_engine._load_trajectory.cache_clear()
+            first = attractor_engine.load_trajectory("lorenz", self.LORENZ, points=500, dt=0.01)
+            attractor_engine._load_trajectory.cache_clear()
+            with mock.patch.object(attractor_engine, "integrate_flow", side_effect=AssertionError):
+                second = attractor_engine.load_trajectory("lorenz", self.LORENZ, points=500, dt=0.01)
+            # A memory hit writes the file back if it has been evicted since.
+            second.path.unlink()
+            with mock.patch.object(attractor_engine, "integrate_flow", side_effect=AssertionError):
+                third = attractor_engine.load_trajectory("lorenz", self.LORENZ, points=500, dt=0.01)
+            restored = np.fromfile(third.path, dtype="<f4").reshape(third.points.shape)
+            attractor_engine._load_trajectory.cache_clear()
+
+        self.assertEqual(first.key, second.key)
+        np.testing.assert_array_equal(first.points, second.points)
+        self.assertIs(third, second)
+        np.testing.assert_array_equal(restored, first.points)
+
+    def test_clifford_density_is_tone_mapped(self) -> None:
+        params = {"a": -1.4, "b": 1.6, "c": 1.0, "d": 0.7}
+        counts = attractor_engine.clifford_density(params, width=160, height=120, points=50_000)
+        self.assertEqual(counts.shape, (120, 160))
+        self.assertGreater(counts.sum(), 0)
+        runs = attractor_engine.DENSITY_RUNS
+        self.assertLessEqual(counts.sum(), -(-50_000 // runs) * runs)
+
+        image = attractor_engine.tone_map_density(counts)
+        self.assertEqual(image.shape, (120, 160, 3))
+        self.assertEqual(image.dtype, np.uint8)
+        np.testing.assert_array_equal(image[counts == 0][0], attractor_engine.DENSITY_BACKGROUND)
+        np.testing.assert_array_equal(image[counts == counts.max()][0], (255, 255, 255))
+
+
+class GrayScottEngineTests(unittest.TestCase):
+    def test_border_is_fixed_and_fields_are_clamped(self) -> None:
+        a, b = gray_scott_engine.seed_fields(64, seed=3)
+        result_a, result_b = gray_scott_engine.simulate(a, b, feed=0.055, kill=0.062, iterations=50)
+        for start, end in ((a, result_a), (b, result_b)):
+            np.testing.assert_array_equal(start[[0, -1], :], end[[0, -1], :])
+            np.testing.assert_array_equal(start[:, [0, -1]], end[:, [0, -1]])
+            self.assertTrue(((end >= 0) & (end <= 1)).all())
+        self.assertFalse(np.array_equal(b, result_b))
+
+    @unittest.skipUnless(shutil.which("node"), "node is not installed")
+    def test_matches_javascript_reference(self) -> None:
+        a, b = gray_scott_engine.seed_fields(48, seed=1)
+        expected_a, expected_b, _ = gray_scott_engine.run_js_reference(a, b, feed=0.035, kill=0.065, iterations=40)
+        result_a, result_b = gray_scott_engine.simulate(a, b, feed=0.035, kill=0.065, iterations=40)
+        np.testing.assert_allclose(result_a, expected_a, atol=1e-5)
+        np.testing.assert_allclose(result_b, expected_b, atol=1e-5)
+
+    def test_sweep_writes_one_file_per_pair(self) -> None:
+        with tempfile.TemporaryDirectory() as directory:
+            results = gray_scott_engine.sweep(
+                [(0.03, 0.06), (0.05, 0.065)], Path(directory), size=32, iterations=5, workers=1
+            )
+            self.assertEqual([(result.feed, result.kill) for result in results], [(0.03, 0.06), (0.05, 0.065)])
+            with np.load(results[1].path) as saved:
+                self.assertEqual(saved["b"].shape, (32, 32))
+                self.assertEqual(float(saved["kill"]), 0.065)
+
+            with self.assertRaises(ValueError):
+                gray_scott_engine.sweep([(0.03, 0.06)], Path(directory), image_format="tiff")
+
+            # Pairs closer than the old 4-decimal names get a file each.
+            close = [(0.05, 0.06), (0.05001, 0.06)]
+            paths = [result.path for result in gray_scott_engine.sweep(close, Path(directory), size=8, iterations=1)]
+            self.assertEqual(len(set(paths)), 2)
+            with self.assertRaises(ValueError):
+                gray_scott_engine.sweep([(0.03, 0.06), (0.03, 0.06)], Path(directory), size=8, iterations=1)
+
+    def test_small_grids_can_be_seeded(self) -> None:
+        for size in (4, 16, 20):
+            with self.subTest(size=size):
+                _, b = gray_scott_engine.seed_fields(size, seed=1)
+                self.assertGreater(b.sum(), 0)
+
+
+class FourierEngineTests(unittest.TestCase):
+    def test_spectrum_matches_direct_dft(self) -> None:
+        points = fourier_engine.sample_shape("Trefoil Knot", 64)
+        n = np.arange(64)
+        direct = np.exp(-2j * np.pi * np.outer(n, n) / 64) @ points / 64
+
+        result = fourier_engine.spectrum(points, limit=None)
+        np.testing.assert_allclose(result.amp, np.abs(direct[result.freq]), atol=1e-9)
+        self.assertTrue(np.all(np.diff(result.amp) <= 0))
+
+    def test_builtin_spectra_cover_every_shape(self) -> None:
+        spectra = json.loads(fourier_engine.builtin_spectra_json())
+        self.assertEqual(len(spectra), len(fourier_engine.SHAPES))
+        for entry in spectra:
+            self.assertEqual(entry["count"], fourier_engine.SAMPLE_COUNT)
+            self.assertEqual(len(entry["amp"]), fourier_engine.MAX_EPICYCLES)
+
+    def test_svg_paths_follow_arcs_and_transforms(self) -> None:
+        circle = path_import.path_points("M 10 0 A10 10 0 1 1 -10 0 a10 10 0 11 20 0z")
+        np.testing.assert_allclose(np.abs(circle), 10.0)
+
+        svg = b"""<svg xmlns="http://www.w3.org/2000/svg">
+            <g transform="translate(100 50) scale(2)"><polygon points="0,0 10,0 10,10"/></g>
+        </svg>"""
+        np.testing.assert_allclose(path_import.load_path(svg, "shape.svg"), [100 + 50j, 120 + 50j, 120 + 70j, 100 + 50j])
+
+    def test_custom_spectrum_is_cached_by_content(self) -> None:
+        square = b"x,y\n0,0\n100,0\n100,100\n0,100\n"
+        first = fourier_engine.custom_spectrum(square, "square.csv", samples=4096)
+        with mock.patch.object(fourier_engine, "load_path", side_effect=AssertionError):
+            second = fourier_engine.custom_spectrum(bytes(square), "renamed.csv", samples=4096)
+        self.assertIs(first, second)
+        self.assertEqual(first.sample_count, 4096)
+        self.assertEqual(len(first.amp), fourier_engine.MAX_EPICYCLES)
+
+        resampled = fourier_engine.resample_by_arc_length(np.array([0, 100, 100 + 100j, 100j]), 400)
+        np.testing.assert_allclose(np.abs(np.diff(resampled)), 1.0)
+
+
+class LSystemEngineTests(unittest.TestCase):
+    PLANT = lsystem_engine.PRESETS["Fractal Plant"].system
+
+    def test_streamed_expansion_matches_direct_rewriting(self) -> None:
+        rules = dict(self.PLANT.rules)
+        text = self.PLANT.axiom
+        for _ in range(4):
+            text = "".join(rules.get(symbol, symbol) for symbol in text)
+
+        chunks = list(lsystem_engine.expand(self.PLANT, 4, chunk=64))
+        self.assertGreater(len(chunks), 1)
+        self.assertEqual("".join(chunks), text)
+        self.assertEqual(lsystem_engine.symbol_count(self.PLANT, 4), len(text))
+        self.assertEqual(lsystem_engine.segment_count(self.PLANT, 4), text.count("F"))
+
+    def test_trace_matches_a_symbol_by_symbol_turtle(self) -> None:
+        segments, depths = lsystem_engine.trace(self.PLANT, 3)
+        x = y = heading = 0.0
+        stack, expected = [], []
+        delta = np.radians(self.PLANT.angle)
+        for symbol in "".join(lsystem_engine.expand(self.PLANT, 3)):
+            if symbol in "+-":
+                heading += -delta if symbol == "+" else delta
+            elif symbol == "[":
+                stack.append((x, y, heading))
+            elif symbol == "]":
+                x, y, heading = stack.pop()
+            elif symbol == "F":
+                expected.append((x, y, x + np.sin(heading), y - np.cos(heading), len(stack)))
+                x, y = expected[-1][2:4]
+        expected = np.array(expected)
+        np.testing.assert_allclose(segments, expected[:, :4], atol=1e-9)
+        np.testing.assert_array_equal(depths, expected[:, 4])
+
+    def test_geometry_is_cached_and_bounded(self) -> None:
+        with tempfile.TemporaryDirectory() as directory, mock.patch.object(
+            lsystem_engine, "LSYSTEM_CACHE_DIR", Path(directory)
+        ):
+            lsystem_engine._load_lsystem.cache_clear()
+            geometry = lsystem_engine.load_lsystem(self.PLANT, 4)
+            with mock.patch.object(lsystem_engine, "trace", side_effect=AssertionError):
+                geometry.path.unlink()
+                self.assertIs(lsystem_engine.load_lsystem(self.PLANT, 4), geometry)
+                stored = np.fromfile(geometry.path, dtype="<u2").reshape(-1, 4)
+                lsystem_engine._load_lsystem.cache_clear()
+                reloaded = lsystem_engine.load_lsystem(self.PLANT, 4)
+            lsystem_engine._load_lsystem.cache_clear()
+
+        np.testing.assert_array_equal(stored, geometry.vertices)
+        np.testing.assert_array_equal(reloaded.vertices, geometry.vertices)
+        self.assertEqual(reloaded.descriptor(), geometry.descriptor())
+        self.assertEqual(geometry.segments, lsystem_engine.segment_count(self.PLANT, 4))
+        self.assertEqual(geometry.band_offsets[-1], geometry.segments)
+        with self.assertRaises(ValueError):
+            lsystem_engine.load_lsystem(self.PLANT, 12)
+        with self.assertRaises(ValueError):
+            lsystem_engine.LSystem("F", lsystem_engine.parse_rules("F=F[+F"), 30.0)
+
+
+class IFSEngineTests(unittest.TestCase):
+    def test_vertex_restrictions_are_honoured(self) -> None:
+        game = ifs_engine.PRESETS["Square, Not the Next Vertex Clockwise"]
+        _, _, chosen = next(ifs_engine.iterate_ifs(game, ifs_engine.IFS_CHAINS * 16))
+        steps = chosen.reshape(16, ifs_engine.IFS_CHAINS)
+        self.assertFalse((steps[1:] == (steps[:-1] + 1) % 4).any())
+        self.assertTrue((steps[1:] == steps[:-1]).any())
+        with self.assertRaises(ValueError):
+            ifs_engine.polygon_chaos_game(3, 0.5, (0, 1, 2))
+
+    def test_density_covers_the_fern(self) -> None:
+        fern = ifs_engine.PRESETS["Barnsley Fern"]
+        counts = ifs_engine.ifs_density(fern, width=64, height=64, points=100_000)
+        self.assertEqual(int(counts.sum()), 100_000)
+        rows = np.nonzero(counts.sum(axis=1))[0]
+        columns = np.nonzero(counts.sum(axis=0))[0]
+        # Taller than wide, fitted to the full height of the image.
+        self.assertGreater(np.ptp(rows), 55)
+        self.assertLess(np.ptp(columns), np.ptp(rows))
+
+    def test_point_buffers_are_cached_per_definition(self) -> None:
+        fern = ifs_engine.PRESETS["Barnsley Fern"]
+        with tempfile.TemporaryDirectory() as directory, mock.patch.object(ifs_engine, "IFS_CACHE_DIR", Path(directory)):
+            ifs_engine._load_ifs_points.cache_clear()
+            points = ifs_engine.load_ifs_points(fern, 50_000)
+            ifs_engine._load_ifs_points.cache_clear()
+            with mock.patch.object(ifs_engine, "iterate_ifs", wraps=ifs_engine.iterate_ifs) as iterate:
+                reloaded = ifs_engine.load_ifs_points(fern, 50_000)
+                # A memory hit writes the file back if it has been evicted since.
+                reloaded.path.unlink()
+                self.assertIs(ifs_engine.load_ifs_points(fern, 50_000), reloaded)
+            restored = np.fromfile(reloaded.path, dtype="<u2").reshape(-1, 3)
+            ifs_engine._load_ifs_points.cache_clear()
+
+        self.assertEqual(iterate.call_count, 1)  # bounds only; the points come from disk
+        np.testing.assert_array_equal(restored, points.points)
+        np.testing.assert_array_equal(reloaded.points, points.points)
+        self.assertEqual(points.points.shape, (50_000, 3))
+        self.assertEqual(int(points.points[:, 2].max()), 3)
+        self.assertNotEqual(ifs_engine.ifs_key(fern, 50_000), ifs_engine.ifs_key(ifs_engine.PRESETS["Sierpinski Carpet"], 50_000))
+
+
+class TurmiteEngineTests(unittest.TestCase):
+    def test_rule_strings_and_turmite_tables_agree(self) -> None:
+        ant = turmite_engine.parse_rule("rl")
+        self.assertEqual(turmite_engine.parse_rule("{{{1, 2, 0}, {0, 8, 0}}}"), ant)
+        self.assertEqual(ant.turn, (1, 3))
+        with self.assertRaises(ValueError):
+            turmite_engine.parse_rule("RX")
+        with self.assertRaises(ValueError):
+            turmite_engine.parse_rule("{{{1, 2, 5}, {0, 8, 0}}}")
+
+    def test_fast_forward_matches_step_by_step_simulation(self) -> None:
+        rule = turmite_engine.parse_rule("RL")
+        direct = turmite_engine.TurmiteWorld(rule)
+        direct.run(40_000)
+        jumped = turmite_engine.TurmiteWorld(rule)
+        result = jumped.advance(40_000)
+
+        self.assertEqual(result.highway_period, 104)
+        self.assertGreater(result.skipped, 0)
+        self.assertEqual(result.simulated + result.skipped, 40_000)
+        self.assertEqual(
+            (jumped.x, jumped.y, jumped.direction, jumped.state), (direct.x, direct.y, direct.direction, direct.state)
+        )
+        left, top, right, bottom = direct.bounds()
+        self.assertEqual(jumped.bounds(), (left, top, right, bottom))
+        size = max(right - left, bottom - top) + 1
+        np.testing.assert_array_equal(jumped.window(left, top, size), direct.window(left, top, size))
+
+    def test_fast_forward_matches_brute_force_for_other_rules(self) -> None:
+        # LRRRRRLLR retraces its own pattern in period-4 runs that are not highways; RULR builds one.
+        for text, steps in (("LRRRRRLLR", 300_000), ("RRLLLRLLLRRR", 200_000), ("RULR", 60_000)):
+            with self.subTest(rule=text):
+                rule = turmite_engine.parse_rule(text)
+                cells: dict[tuple[int, int], int] = {}
+                x = y = direction = 0
+                for _ in range(steps):
+                    color = cells.get((x, y), 0)
+                    cells[(x, y)] = rule.write[color]
+                    direction = (direction + rule.turn[color]) % 4
+                    x += turmite_engine.DX[direction]
+                    y += turmite_engine.DY[direction]
+
+                world = turmite_engine.TurmiteWorld(rule)
+                result = world.advance(steps)
+                self.assertTrue(result.complete)
+                self.assertEqual((world.x, world.y, world.direction), (x, y, direction))
+                painted = {cell: color for cell, color in cells.items() if color}
+                left, top = min(cx for cx, _ in painted), min(cy for _, cy in painted)
+                size = max(max(cx for cx, _ in painted) - left, max(cy for _, cy in painted) - top) + 1
+                window = world.window(left, top, size)
+                rows, columns = np.nonzero(window)
+                found = {(int(cx) + left, int(cy) + top): int(window[cy, cx]) for cy, cx in zip(rows, columns)}
+                self.assertEqual(found, painted)
+                if text == "RULR":
+                    self.assertGreater(result.skipped, 0)
+
+    def test_a_billion_steps_render_to_a_bitmap(self) -> None:
+        world = turmite_engine.TurmiteWorld(turmite_engine.parse_rule("RL"))
+        result = world.advance(10**9)
+        self.assertTrue(result.complete)
+        self.assertEqual(world.steps, 10**9)
+        self.assertLess(result.simulated, 100_000)
+        image = turmite_engine.render_bitmap(world, 128)
+        self.assertEqual(image.shape, (128, 128, 3))
+        self.assertGreater(int((image != turmite_engine.BACKGROUND).any(axis=2).sum()), 128)
+
+
+class HeadlessRenderTests(unittest.TestCase):
+    def test_every_visualization_has_a_scene(self) -> None:
+        self.assertEqual(set(headless_render.SCENES), {page.key for page in VISUALIZATION_PAGES})
+        with self.assertRaises(ValueError):
+            headless_render.scene_params("lorenz", {"speed": 2})
+
+    def test_frames_are_streamed_to_disk(self) -> None:
+        with tempfile.TemporaryDirectory() as directory:
+            jobs = [
+                headless_render.RenderJob("fourier-epicycles", Path(directory), frames=3, scale=0.5),
+                headless_render.RenderJob("langtons-ant", Path(directory), params={"steps": 500}),
+            ]
+            frames, still = headless_render.render_batch(jobs, workers=2)
+            self.assertEqual([path.name for path in frames.paths], [f"fourier-epicycles_{index:05d}.png" for index in range(3)])
+            with Image.open(frames.paths[-1]) as image:
+                self.assertEqual(image.size, (400, 300))
+            with Image.open(still.paths[0]) as image:
+                self.assertEqual(image.size, (600, 600))
+                self.assertGreater(len(image.getcolors(1 << 16)), 1)
+
+    def test_frames_match_the_declared_size_with_overrides(self) -> None:
+        overrides = {
+            "lorenz": {"trail_length": 500},
+            "aizawa": {"trail_length": 500},
+            "double-pendulum": {"duration": 4},
+            "reaction-diffusion": {"grid_size": 128, "iterations": 20},
+            "boids": {"flock_size": 20, "duration": 4},
+            "langtons-ant": {"grid_res": 50, "steps": 200},
+            "fourier-epicycles": {"harmonics": 10},
+            "fractal-trees": {"depth": 6, "duration": 4},
+            "sierpinski-triangle": {"system": "Barnsley Fern", "points": 20_000},
+            "clifford-attractor": {"points": 20_000},
+        }
+        self.assertEqual(set(overrides), set(headless_render.SCENES))
+        for key, params in overrides.items():
+            with self.subTest(page=key):
+                size = headless_render.frame_size(key, 0.75)
+                frames = list(headless_render.render_frames(key, params, count=2, scale=0.75))
+                self.assertEqual([frame.size for frame in frames], [size, size])
+
+    def test_video_frames_are_even_sized(self) -> None:
+        with tempfile.TemporaryDirectory() as directory:
+            # Stands in for ffmpeg: copies the raw stream to the output path.
+            fake = Path(directory) / "ffmpeg"
+            fake.write_text('#!/bin/sh\nfor last; do :; done\ncat > "$last"\n')
+            fake.chmod(0o755)
+            job = headless_render.RenderJob(
+                "sierpinski-triangle", Path(directory), frames=2, scale=0.75, params={"points": 20_000}, video=True
+            )
+            with mock.patch.object(headless_render.shutil, "which", return_value=str(fake)):
+                result = headless_render._run_render_job(job)
+            self.assertEqual(headless_render.frame_size("sierpinski-triangle", 0.75), (525, 525))
+            self.assertEqual(result.paths[0].stat().st_size, 2 * 524 * 524 * 3)
+
+
+class ThumbnailTests(unittest.TestCase):
+    def test_missing_thumbnails_are_never_rendered_on_lookup(self) -> None:
+        with tempfile.TemporaryDirectory() as directory, mock.patch.object(
+            thumbnails, "THUMBNAIL_DIR", Path(directory)
+        ), mock.patch.object(thumbnails, "render_still") as render:
+            self.assertIsNone(thumbnails.thumbnail_url("lorenz"))
+            self.assertIsNone(thumbnails.thumbnail_url(HOME_PAGE_KEY))
+            render.assert_not_called()
+
+    def test_thumbnails_are_content_hashed_and_replace_stale_ones(self) -> None:
+        with tempfile.TemporaryDirectory() as directory, mock.patch.object(thumbnails, "THUMBNAIL_DIR", Path(directory)):
+            stale = Path(directory) / "fourier-epicycles-0000000000000000.jpg"
+            stale.write_bytes(b"old")
+            path = thumbnails.render_thumbnail("fourier-epicycles")
+            self.assertEqual(path.name, f"fourier-epicycles-{thumbnails.thumbnail_key('fourier-epicycles')}.jpg")
+            self.assertFalse(stale.exists())
+            with Image.open(path) as image:
+                self.assertEqual(image.size, (thumbnails.THUMBNAIL_WIDTH, thumbnails.THUMBNAIL_WIDTH * 3 // 4))
+            self.assertTrue(thumbnails.thumbnail_url("fourier-epicycles").endswith(path.name))
+            self.assertNotEqual(thumbnails.thumbnail_key("fourier-epicycles"), thumbnails.thumbnail_key("lorenz"))
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -1,6 +1,7 @@
 import streamlit as st
 
-from visualizations.shared import render_p5_iframe
+from visualizations.attractor_engine import load_trajectory
+from visualizations.shared import INTEGRATORS, render_p5_iframe
 
 def render():
     st.title("Aizawa Attractor Visualization")
@@ -17,68 +18,119 @@ def render():
     e = st.sidebar.slider("e", min_value=0.0, max_value=1.0, value=0.25, step=0.01)
     f = st.sidebar.slider("f", min_value=0.0, max_value=1.0, value=0.1, step=0.01)
     dt = st.sidebar.slider("Time Step ($dt$)", min_value=0.001, max_value=0.05, value=0.01, step=0.001)
+    integrator = st.sidebar.selectbox("Integrator", list(INTEGRATORS))
+    steps_per_frame = st.sidebar.slider("Steps Per Frame", min_value=1, max_value=500, value=5, step=1)
     thickness = st.sidebar.slider("Line Thickness", min_value=0.5, max_value=10.0, value=1.5, step=0.1)
+    trail_length = st.sidebar.slider("Trail Length (Points)", min_value=1000, max_value=1_000_000, value=5000, step=1000)
+    prefill = st.sidebar.checkbox("Prefill From Server Cache", value=True)
 
     st.markdown(f"**Current Parameters**: $a={a:.2f}$, $b={b:.2f}$, $c={c:.2f}$, $d={d:.2f}$, $e={e:.2f}$, $f={f:.2f}$, $dt={dt:.3f}$, `thickness={thickness}`")
 
-    script_body = f"""
-    const a = {a};
-    const b = {b};
-    const c = {c};
-    const d = {d};
-    const e = {e};
-    const f = {f};
-    const dt = {dt};
-    const strokeThickness = {thickness};
+    trajectory = None
+    if prefill:
+        with st.spinner("Integrating trajectory..."):
+            try:
+                trajectory = load_trajectory(
+                    "aizawa",
+                    {"a": a, "b": b, "c": c, "d": d, "e": e, "f": f},
+                    points=trail_length,
+                    dt=dt,
+                    method=INTEGRATORS[integrator],
+                ).descriptor()
+            except ValueError as error:
+                st.sidebar.error(str(error))
 
-    let x = 0.1;
-    let y = 0;
-    let z = 0;
+    script_body = """
+    const state = new Float64Array([0.1, 0, 0]);
+    const stepper = new OdeStepper(aizawa, 3);
 
-    let points = [];
+    let trail;
+    let trailColor;
 
-    function setup() {{
+    function setup() {
       createCanvas(800, 600, WEBGL);
       colorMode(HSB, 255);
-    }}
+      trailColor = color(140, 255, 255).levels;
+      trail = new TrailBuffer(params.trailLength);
+      loadTrajectory();
+    }
 
-    function draw() {{
-      background(10, 10, 15);
-      orbitControl();
+    function aizawa(s, out) {
+      const { a, b, c, d, e, f } = params;
+      const x = s[0];
+      const y = s[1];
+      const z = s[2];
+      out[0] = (z - b) * x - d * y;
+      out[1] = d * x + (z - b) * y;
+      out[2] = c + a * z - z * z * z / 3 - (x * x + y * y) * (1 + e * z) + f * z * x * x * x;
+    }
+
+    function paramsChanged(keys) {
+      if (keys.includes("trailLength")) {
+        trail.resize(params.trailLength);
+      }
+      if (keys.includes("trajectory")) {
+        loadTrajectory();
+      }
+    }
 
-      let dx = ((z - b) * x - d * y) * dt;
-      let dy = (d * x + (z - b) * y) * dt;
-      let dz = (c + a * z - z * z * z / 3 - (x * x + y * y) * (1 + e * z) + f * z * x * x * x) * dt;
+    function pushPoint(x, y, z) {
+      const brightness = constrain(map(z, -1, 2, 255, 50), 0, 255) / 255;
+      trail.push(x, y, z, trailColor[0] * brightness, trailColor[1] * brightness, trailColor[2] * brightness);
+    }
 
-      x += dx;
-      y += dy;
-      z += dz;
+    function loadTrajectory() {
+      const descriptor = params.trajectory;
+      if (!descriptor) return;
+      fetchTrajectory(descriptor, (data) => {
+        if (!params.trajectory || params.trajectory.url !== descriptor.url) return;
+        const { runs, steps } = descriptor;
+        trail.clear();
+        for (let run = 0; run < runs; run++) {
+          if (run > 0) trail.breakLine();
+          for (let i = (run * steps) * 3; i < (run + 1) * steps * 3; i += 3) {
+            pushPoint(data[i], data[i + 1], data[i + 2]);
+          }
+        }
+        state.set(data.subarray(data.length - 3));
+      });
+    }
 
-      points.push(createVector(x, y, z));
+    function draw() {
+      background(10, 10, 15);
+      orbitControl();
 
-      if (points.length > 5000) {{
-        points.shift();
-      }}
+      for (let i = 0; i < params.stepsPerFrame; i++) {
+        stepper.step(params.integrator, state, params.dt);
+        pushPoint(state[0], state[1], state[2]);
+      }
 
       scale(150);
       translate(0, 0, -0.5);
       rotateX(Math.PI / 2);
-      noFill();
-
-      beginShape();
-      for (let v of points) {{
-        let mappedBright = map(v.z, -1, 2, 255, 50);
-        stroke(140, 255, mappedBright);
-        strokeWeight(strokeThickness);
-        vertex(v.x, v.y, v.z);
-      }}
-      endShape();
-    }}
+      trail.draw(params.thickness);
+    }
     """
 
     render_p5_iframe(
         script_body,
         height=650,
+        libraries=("trail_buffer", "integrators"),
+        sketch_id="aizawa",
+        live_params={
+            "a": a,
+            "b": b,
+            "c": c,
+            "d": d,
+            "e": e,
+            "f": f,
+            "dt": dt,
+            "integrator": INTEGRATORS[integrator],
+            "stepsPerFrame": steps_per_frame,
+            "thickness": thickness,
+            "trailLength": trail_length,
+            "trajectory": trajectory,
+        },
         body_css="background-color: #0e1117;",
         canvas_css="""
         width: min(100%, 800px) !important;
@@ -0,0 +1,360 @@
+from __future__ import annotations
+
+import hashlib
+import io
+import json
+import os
+from collections.abc import Callable, Mapping
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+from PIL import Image
+
+from visualizations.shared import PROJECT_ROOT, served_file_url
+
+
+TRAJECTORY_CACHE_DIR = PROJECT_ROOT / ".cache" / "trajectories"
+TRAJECTORY_DISK_CACHE_FILES = 32
+TRAJECTORY_MEMORY_CACHE_SIZE = 8
+
+# Long trajectories are integrated as many independent runs advanced in lockstep, so each
+# NumPy operation covers a whole batch of points instead of one.
+POINTS_PER_RUN = 4096
+MAX_RUNS = 256
+WARMUP_TIME = 10.0
+SEED_SPREAD = 0.5
+
+# The Clifford sketch maps one attractor unit to 140 px on an 800 px wide canvas; stills
+# keep that framing at any resolution. The palette ramps from the page background through
+# the sketch tint to white, and is mirrored by the JavaScript tone mapper.
+CLIFFORD_VIEW_WIDTH = 800
+CLIFFORD_SCALE = 140.0
+DENSITY_RUNS = 4096
+DENSITY_CHUNK_STEPS = 256
+DENSITY_BACKGROUND = (11, 11, 11)
+DENSITY_TINT = (90, 180, 255)
+DENSITY_TINT_STOP = 0.75
+
+Derivative = Callable[[np.ndarray, Mapping[str, float]], np.ndarray]
+
+
+def lorenz_derivative(state: np.ndarray, params: Mapping[str, float]) -> np.ndarray:
+    x, y, z = state
+    return np.stack(
+        (
+            params["sigma"] * (y - x),
+            x * (params["rho"] - z) - y,
+            x * y - params["beta"] * z,
+        )
+    )
+
+
+def aizawa_derivative(state: np.ndarray, params: Mapping[str, float]) -> np.ndarray:
+    x, y, z = state
+    a, b, c, d, e, f = (params[name] for name in "abcdef")
+    return np.stack(
+        (
+            (z - b) * x - d * y,
+            d * x + (z - b) * y,
+            c + a * z - z**3 / 3 - (x * x + y * y) * (1 + e * z) + f * z * x**3,
+        )
+    )
+
+
+@dataclass(frozen=True)
+class FlowSystem:
+    derivative: Derivative
+    initial_state: tuple[float, float, float]
+
+
+FLOW_SYSTEMS = {
+    "lorenz": FlowSystem(lorenz_derivative, (0.01, 0.0, 0.0)),
+    "aizawa": FlowSystem(aizawa_derivative, (0.1, 0.0, 0.0)),
+}
+
+# Dormand-Prince 5(4) tableau, shared with assets/sketch/integrators.js.
+DOPRI_A = (
+    (),
+    (1 / 5,),
+    (3 / 40, 9 / 40),
+    (44 / 45, -56 / 15, 32 / 9),
+    (19372 / 6561, -25360 / 2187, 64448 / 6561, -212 / 729),
+    (9017 / 3168, -355 / 33, 46732 / 5247, 49 / 176, -5103 / 18656),
+    (35 / 384, 0, 500 / 1113, 125 / 192, -2187 / 6784, 11 / 84),
+)
+DOPRI_B = np.array((35 / 384, 0, 500 / 1113, 125 / 192, -2187 / 6784, 11 / 84, 0))
+DOPRI_B_STAR = np.array((5179 / 57600, 0, 7571 / 16695, 393 / 640, -92097 / 339200, 187 / 2100, 1 / 40))
+DOPRI_TOLERANCE = 1e-7
+FLOAT32_MAX = float(np.finfo(np.float32).max)
+DIVERGED_MESSAGE = "The trajectory diverged to infinity with these parameters; try a smaller dt or other values."
+
+
+def euler_step(derivative: Derivative, state: np.ndarray, params: Mapping[str, float], dt: float) -> np.ndarray:
+    return state + derivative(state, params) * dt
+
+
+def rk4_step(derivative: Derivative, state: np.ndarray, params: Mapping[str, float], dt: float) -> np.ndarray:
+    k1 = derivative(state, params)
+    k2 = derivative(state + k1 * (dt / 2), params)
+    k3 = derivative(state + k2 * (dt / 2), params)
+    k4 = derivative(state + k3 * dt, params)
+    return state + (k1 + 2 * k2 + 2 * k3 + k4) * (dt / 6)
+
+
+def rk45_step(derivative: Derivative, state: np.ndarray, params: Mapping[str, float], dt: float) -> np.ndarray:
+    # Adaptive substeps share one step size across the batch, driven by the worst run.
+    remaining = dt
+    h = dt
+    minimum = dt * 1e-6
+    while remaining > minimum:
+        step = max(h, minimum)
+        trial = min(step, remaining)
+        stages = [derivative(state, params)]
+        for row in DOPRI_A[1:]:
+            increment = sum(weight * stage for weight, stage in zip(row, stages))
+            stages.append(derivative(state + trial * increment, params))
+        stacked = np.stack(stages)
+        high = np.tensordot(DOPRI_B, stacked, axes=1)
+        low = np.tensordot(DOPRI_B_STAR, stacked, axes=1)
+        candidate = state + trial * high
+        scale = DOPRI_TOLERANCE * (1 + np.maximum(np.abs(state), np.abs(candidate)))
+        error = float(np.max(np.abs(trial * (high - low)) / scale))
+        if not np.isfinite(error) or not np.isfinite(candidate).all():
+            raise ValueError(DIVERGED_MESSAGE)
+        # As in the sketch, a step shrunk to the minimum is taken whatever its error.
+        accepted = error <= 1 or trial <= minimum
+        if accepted:
+            state = candidate
+            remaining -= trial
+        factor = min(5.0, max(0.2, 0.9 * error**-0.2 if error > 0 else 5.0))
+        # A step clipped to land exactly on `dt` says nothing about the size we can afford.
+        if not accepted or trial == step:
+            h = max(trial * factor, minimum)
+    return state
+
+
+STEPPERS = {
+    "euler": euler_step,
+    "rk4": rk4_step,
+    "rk45": rk45_step,
+}
+
+
+def plan_runs(points: int) -> tuple[int, int]:
+    runs = max(1, min(MAX_RUNS, points // POINTS_PER_RUN))
+    return runs, -(-points // runs)
+
+
+def integrate_flow(
+    system: str,
+    params: Mapping[str, float],
+    *,
+    points: int,
+    dt: float,
+    method: str = "rk4",
+    seed: int = 0,
+) -> np.ndarray:
+    flow = FLOW_SYSTEMS[system]
+    step = STEPPERS[method]
+    runs, steps = plan_runs(points)
+
+    # Overflow is expected when the flow diverges; it is reported once, as a ValueError. States
+    # must also fit the float32 trajectory buffer (NaN fails the comparison as well).
+    def advance(state: np.ndarray) -> np.ndarray:
+        with np.errstate(over="ignore", invalid="ignore"):
+            state = step(flow.derivative, state, params, dt)
+        if not (np.abs(state) <= FLOAT32_MAX).all():
+            raise ValueError(DIVERGED_MESSAGE)
+        return state
+
+    state = np.repeat(np.array(flow.initial_state, dtype=np.float64)[:, None], runs, axis=1)
+    if runs > 1:
+        # Spread the seeds and let the flow carry them onto the attractor before recording,
+        # so the runs cover different stretches of it instead of tracing the same transient.
+        rng = np.random.default_rng(seed)
+        state += rng.normal(scale=SEED_SPREAD, size=state.shape)
+        for _ in range(int(np.ceil(WARMUP_TIME / dt))):
+            state = advance(state)
+
+    trajectory = np.empty((steps, 3, runs), dtype=np.float32)
+    for index in range(steps):
+        trajectory[index] = state = advance(state)
+    return np.ascontiguousarray(trajectory.transpose(2, 0, 1))
+
+
+def clifford_density(
+    params: Mapping[str, float],
+    *,
+    width: int,
+    height: int,
+    points: int,
+    warmup: int = 100,
+    seed: int = 0,
+) -> np.ndarray:
+    a, b, c, d = (params[name] for name in "abcd")
+    rng = np.random.default_rng(seed)
+    x, y = rng.uniform(-1.0, 1.0, size=(2, DENSITY_RUNS))
+    for _ in range(warmup):
+        x, y = np.sin(a * y) + c * np.cos(a * x), np.sin(b * x) + d * np.cos(b * y)
+
+    scale = CLIFFORD_SCALE * width / CLIFFORD_VIEW_WIDTH
+    counts = np.zeros(width * height, dtype=np.uint32)
+    steps = -(-points // DENSITY_RUNS)
+    chunk = np.empty((DENSITY_CHUNK_STEPS, DENSITY_RUNS), dtype=np.int64)
+
+    # Pixel indices are buffered for a chunk of steps and binned with one bincount call.
+    for start in range(0, steps, DENSITY_CHUNK_STEPS):
+        filled = min(DENSITY_CHUNK_STEPS, steps - start)
+        for index in range(filled):
+            x, y = np.sin(a * y) + c * np.cos(a * x), np.sin(b * x) + d * np.cos(b * y)
+            column = np.floor(x * scale + width / 2).astype(np.int64)
+            row = np.floor(y * scale + height / 2).astype(np.int64)
+            inside = (column >= 0) & (column < width) & (row >= 0) & (row < height)
+            chunk[index] = np.where(inside, row * width + column, -1)
+        indices = chunk[:filled].ravel()
+        counts += np.bincount(indices[indices >= 0], minlength=width * height).astype(np.uint32)
+    return counts.reshape(height, width)
+
+
+def density_palette(levels: int = 256) -> np.ndarray:
+    t = np.linspace(0.0, 1.0, levels)[:, None]
+    background = np.array(DENSITY_BACKGROUND, dtype=np.float64)
+    tint = np.array(DENSITY_TINT, dtype=np.float64)
+    low = background + (tint - background) * np.clip(t / DENSITY_TINT_STOP, 0.0, 1.0)
+    high = tint + (255.0 - tint) * np.clip((t - DENSITY_TINT_STOP) / (1 - DENSITY_TINT_STOP), 0.0, 1.0)
+    return np.round(np.where(t <= DENSITY_TINT_STOP, low, high)).astype(np.uint8)
+
+
+def tone_map_density(counts: np.ndarray, gamma: float = 1.0) -> np.ndarray:
+    peak = float(counts.max())
+    if peak == 0:
+        return np.broadcast_to(np.array(DENSITY_BACKGROUND, dtype=np.uint8), (*counts.shape, 3)).copy()
+    level = (np.log1p(counts) / np.log1p(peak)) ** gamma
+    palette = density_palette()
+    return palette[np.minimum((level * 255).astype(np.int64), 255)]
+
+
+def encode_png(image: np.ndarray) -> bytes:
+    buffer = io.BytesIO()
+    Image.fromarray(image).save(buffer, format="PNG", optimize=True)
+    return buffer.getvalue()
+
+
+@lru_cache(maxsize=4)
+def render_clifford_still(
+    params: tuple[tuple[str, float], ...],
+    width: int,
+    height: int,
+    points: int,
+    gamma: float,
+) -> bytes:
+    counts = clifford_density(dict(params), width=width, height=height, points=points)
+    return encode_png(tone_map_density(counts, gamma))
+
+
+@dataclass(frozen=True)
+class Trajectory:
+    key: str
+    points: np.ndarray
+
+    @property
+    def path(self) -> Path:
+        return TRAJECTORY_CACHE_DIR / f"{self.key}.f32"
+
+    def descriptor(self) -> dict[str, Any]:
+        runs, steps, dimension = self.points.shape
+        return {
+            "url": served_file_url("trajectory_cache", self.path),
+            "runs": runs,
+            "steps": steps,
+            "dimension": dimension,
+        }
+
+
+def trajectory_key(system: str, params: Mapping[str, float], **options: Any) -> str:
+    payload = json.dumps({"system": system, "params": dict(params), **options}, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:24]
+
+
+def load_trajectory(
+    system: str,
+    params: Mapping[str, float],
+    *,
+    points: int,
+    dt: float,
+    method: str = "rk4",
+) -> Trajectory:
+    trajectory = _load_trajectory(system, tuple(sorted(params.items())), points, dt, method)
+    data = trajectory.points.astype("<f4", copy=False)
+    keep_cache_file(trajectory.path, data, TRAJECTORY_DISK_CACHE_FILES, pattern="*.f32")
+    return trajectory
+
+
+@lru_cache(maxsize=TRAJECTORY_MEMORY_CACHE_SIZE)
+def _load_trajectory(
+    system: str,
+    params: tuple[tuple[str, float], ...],
+    points: int,
+    dt: float,
+    method: str,
+) -> Trajectory:
+    values = dict(params)
+    key = trajectory_key(system, values, points=points, dt=dt, method=method)
+    runs, steps = plan_runs(points)
+    path = TRAJECTORY_CACHE_DIR / f"{key}.f32"
+
+    if path.exists():
+        return Trajectory(key, np.fromfile(path, dtype="<f4").reshape(runs, steps, 3))
+
+    data = integrate_flow(system, values, points=points, dt=dt, method=method)
+    store_cache_file(path, data.astype("<f4"), TRAJECTORY_DISK_CACHE_FILES, pattern="*.f32")
+    return Trajectory(key, data)
+
+
+def store_cache_file(
+    path: Path,
+    data: np.ndarray,
+    limit: int,
+    *,
+    pattern: str,
+    companions: tuple[str, ...] = (),
+) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    partial = path.with_suffix(".part")
+    data.tofile(partial)
+    partial.replace(path)
+    evict_disk_cache(limit, directory=path.parent, pattern=pattern, companions=companions)
+
+
+# Sketches fetch cached files by URL, so a memory hit must still leave its file on disk: it is
+# marked as recently used, or written back if other loads have evicted it in the meantime.
+def keep_cache_file(
+    path: Path,
+    data: np.ndarray,
+    limit: int,
+    *,
+    pattern: str,
+    companions: tuple[str, ...] = (),
+) -> None:
+    try:
+        os.utime(path)
+    except FileNotFoundError:
+        store_cache_file(path, data, limit, pattern=pattern, companions=companions)
+
+
+def evict_disk_cache(
+    limit: int = TRAJECTORY_DISK_CACHE_FILES,
+    *,
+    directory: Path = TRAJECTORY_CACHE_DIR,
+    pattern: str = "*.f32",
+    companions: tuple[str, ...] = (),
+) -> None:
+    cached = sorted(directory.glob(pattern), key=lambda path: path.stat().st_mtime, reverse=True)
+    for stale in cached[limit:]:
+        stale.unlink(missing_ok=True)
+        # Side files (e.g. metadata) named like the evicted file with another suffix.
+        for suffix in companions:
+            stale.with_suffix(suffix).unlink(missing_ok=True)
@@ -19,177 +19,284 @@ def render():
     
     st.sidebar.header("Boid Parameters")
     
+    flock_size = st.sidebar.slider("Flock Size", min_value=50, max_value=6000, value=150, step=50)
     separation = st.sidebar.slider("Separation ($w_1$)", min_value=0.0, max_value=3.0, value=1.5, step=0.1)
     alignment = st.sidebar.slider("Alignment ($w_2$)", min_value=0.0, max_value=3.0, value=1.0, step=0.1)
     cohesion = st.sidebar.slider("Cohesion ($w_3$)", min_value=0.0, max_value=3.0, value=1.0, step=0.1)
     max_speed = st.sidebar.slider("Max Speed", min_value=1.0, max_value=10.0, value=4.0, step=0.5)
 
-    script_body = f"""
-    const w1 = {separation};
-    const w2 = {alignment};
-    const w3 = {cohesion};
-    const maxSpd = {max_speed};
+    script_body = """
     const viewDist = 50;
+    const viewDistSq = viewDist * viewDist;
+    const separationDistSq = (viewDist / 2) * (viewDist / 2);
+    const maxForce = 0.2;
+    const maxFlockSize = 6000;
+    const trailLength = 8;
 
-    let flock = [];
+    // The flock lives in flat arrays indexed by boid; trails are per-boid rings of trailLength points.
+    const posX = new Float32Array(maxFlockSize);
+    const posY = new Float32Array(maxFlockSize);
+    const velX = new Float32Array(maxFlockSize);
+    const velY = new Float32Array(maxFlockSize);
+    const accX = new Float32Array(maxFlockSize);
+    const accY = new Float32Array(maxFlockSize);
+    const trailX = new Float32Array(maxFlockSize * trailLength);
+    const trailY = new Float32Array(maxFlockSize * trailLength);
+    const trailStart = new Uint8Array(maxFlockSize);
+    const trailCount = new Uint8Array(maxFlockSize);
 
-    function setup() {{
+    let flockSize = 0;
+    let grid;
+
+    function setup() {
       createCanvas(800, 600);
-      for (let i = 0; i < 150; i++) {{
-        flock.push(new Boid());
-      }}
-    }}
+      grid = new SpatialGrid(width, height, viewDist, maxFlockSize);
+      resizeFlock(params.flockSize);
+    }
+
+    function paramsChanged(keys) {
+      if (keys.includes("flockSize")) {
+        resizeFlock(params.flockSize);
+      }
+    }
+
+    function resizeFlock(size) {
+      size = Math.min(size, maxFlockSize);
+      for (let i = flockSize; i < size; i++) {
+        const heading = random(TWO_PI);
+        const speed = random(2, 4);
+        posX[i] = random(width);
+        posY[i] = random(height);
+        velX[i] = Math.cos(heading) * speed;
+        velY[i] = Math.sin(heading) * speed;
+        accX[i] = 0;
+        accY[i] = 0;
+        trailCount[i] = 0;
+      }
+      flockSize = size;
+    }
 
-    function draw() {{
+    function draw() {
       background(11, 11, 11, 60);
 
-      for (let boid of flock) {{
-        boid.edges();
-        boid.flock(flock);
-        boid.update();
-        boid.show();
-      }}
-    }}
-
-    class Boid {{
-      constructor() {{
-        this.position = createVector(random(width), random(height));
-        this.velocity = p5.Vector.random2D();
-        this.velocity.setMag(random(2, 4));
-        this.acceleration = createVector();
-        this.maxForce = 0.2;
-        this.maxSpeed = maxSpd;
-        this.history = [];
-      }}
-
-      edges() {{
+      wrapEdges();
+      grid.rebuild(flockSize);
+      for (let i = 0; i < flockSize; i++) {
+        flock(i);
+      }
+      update();
+      drawTrails();
+      drawBodies();
+    }
+
+    function wrapEdges() {
+      for (let i = 0; i < flockSize; i++) {
         let wrapped = false;
-        if (this.position.x > width) {{ this.position.x = 0; wrapped = true; }}
-        else if (this.position.x < 0) {{ this.position.x = width; wrapped = true; }}
-
-        if (this.position.y > height) {{ this.position.y = 0; wrapped = true; }}
-        else if (this.position.y < 0) {{ this.position.y = height; wrapped = true; }}
-
-        if (wrapped) {{
-          this.history = [];
-        }}
-      }}
-
-      align(boids) {{
-        let steering = createVector();
-        let total = 0;
-        for (let other of boids) {{
-          let d = dist(this.position.x, this.position.y, other.position.x, other.position.y);
-          if (other !== this && d < viewDist) {{
-            steering.add(other.velocity);
-            total++;
-          }}
-        }}
-        if (total > 0) {{
-          steering.div(total);
-          steering.setMag(this.maxSpeed);
-          steering.sub(this.velocity);
-          steering.limit(this.maxForce);
-        }}
-        return steering;
-      }}
-
-      cohesion(boids) {{
-        let steering = createVector();
-        let total = 0;
-        for (let other of boids) {{
-          let d = dist(this.position.x, this.position.y, other.position.x, other.position.y);
-          if (other !== this && d < viewDist) {{
-            steering.add(other.position);
-            total++;
-          }}
-        }}
-        if (total > 0) {{
-          steering.div(total);
-          steering.sub(this.position);
-          steering.setMag(this.maxSpeed);
-          steering.sub(this.velocity);
-          steering.limit(this.maxForce);
-        }}
-        return steering;
-      }}
-
-      separation(boids) {{
-        let steering = createVector();
-        let total = 0;
-        for (let other of boids) {{
-          let d = dist(this.position.x, this.position.y, other.position.x, other.position.y);
-          if (other !== this && d < viewDist / 2) {{
-            let diff = p5.Vector.sub(this.position, other.position);
-            diff.div(d * d);
-            steering.add(diff);
-            total++;
-          }}
-        }}
-        if (total > 0) {{
-          steering.div(total);
-          steering.setMag(this.maxSpeed);
-          steering.sub(this.velocity);
-          steering.limit(this.maxForce * 1.5);
-        }}
-        return steering;
-      }}
-
-      flock(boids) {{
-        let alignment = this.align(boids);
-        let cohesion = this.cohesion(boids);
-        let separation = this.separation(boids);
-
-        alignment.mult(w2);
-        cohesion.mult(w3);
-        separation.mult(w1);
-
-        this.acceleration.add(alignment);
-        this.acceleration.add(cohesion);
-        this.acceleration.add(separation);
-      }}
-
-      update() {{
-        this.position.add(this.velocity);
-        this.velocity.add(this.acceleration);
-        this.velocity.limit(this.maxSpeed);
-        this.acceleration.mult(0);
-
-        this.history.push(createVector(this.position.x, this.position.y));
-        if (this.history.length > 8) {{
-          this.history.shift();
-        }}
-      }}
-
-      show() {{
-        noFill();
-        beginShape();
-        for (let i = 0; i < this.history.length; i++) {{
-          strokeWeight(map(i, 0, this.history.length, 1, 3));
-          stroke(255, 255, 255, map(i, 0, this.history.length, 0, 150));
-          vertex(this.history[i].x, this.history[i].y);
-        }}
-        endShape();
-
-        let theta = this.velocity.heading() + radians(90);
-        fill(255, 255, 255);
-        noStroke();
-        push();
-        translate(this.position.x, this.position.y);
-        rotate(theta);
-        beginShape();
-        vertex(0, -5);
-        vertex(-3, 3);
-        vertex(3, 3);
-        endShape(CLOSE);
-        pop();
-      }}
-    }}
+        if (posX[i] > width) { posX[i] = 0; wrapped = true; }
+        else if (posX[i] < 0) { posX[i] = width; wrapped = true; }
+
+        if (posY[i] > height) { posY[i] = 0; wrapped = true; }
+        else if (posY[i] < 0) { posY[i] = height; wrapped = true; }
+
+        if (wrapped) {
+          trailCount[i] = 0;
+        }
+      }
+    }
+
+    // Uniform grid with cells as wide as the view distance, so every neighbour of a boid
+    // lies in the 3x3 block of cells around it. Rebuilt each frame with a counting sort.
+    class SpatialGrid {
+      constructor(w, h, cellSize, capacity) {
+        this.cellSize = cellSize;
+        this.cols = Math.ceil(w / cellSize);
+        this.rows = Math.ceil(h / cellSize);
+        this.cellStart = new Int32Array(this.cols * this.rows + 1);
+        this.cursor = new Int32Array(this.cols * this.rows);
+        this.cellOf = new Int32Array(capacity);
+        this.entries = new Int32Array(capacity);
+        this.x = new Float32Array(capacity);
+        this.y = new Float32Array(capacity);
+        this.vx = new Float32Array(capacity);
+        this.vy = new Float32Array(capacity);
+      }
+
+      column(x) {
+        return Math.min(this.cols - 1, Math.max(0, Math.floor(x / this.cellSize)));
+      }
+
+      row(y) {
+        return Math.min(this.rows - 1, Math.max(0, Math.floor(y / this.cellSize)));
+      }
+
+      rebuild(n) {
+        const start = this.cellStart;
+        start.fill(0);
+        for (let i = 0; i < n; i++) {
+          const cell = this.row(posY[i]) * this.cols + this.column(posX[i]);
+          this.cellOf[i] = cell;
+          start[cell + 1]++;
+        }
+        for (let cell = 1; cell < start.length; cell++) {
+          start[cell] += start[cell - 1];
+        }
+        // Positions and velocities are copied in cell order so neighbour scans read contiguous memory.
+        const cursor = this.cursor;
+        for (let cell = 0; cell < cursor.length; cell++) {
+          cursor[cell] = start[cell];
+        }
+        for (let i = 0; i < n; i++) {
+          const slot = cursor[this.cellOf[i]]++;
+          this.entries[slot] = i;
+          this.x[slot] = posX[i];
+          this.y[slot] = posY[i];
+          this.vx[slot] = velX[i];
+          this.vy[slot] = velY[i];
+        }
+      }
+    }
+
+    // Scales a desired direction to max speed, turns it into a steering force capped at
+    // `limit`, and adds it to boid i's acceleration with the given weight.
+    function steer(i, dx, dy, limit, weight) {
+      const magnitude = Math.hypot(dx, dy);
+      if (magnitude > 0) {
+        dx *= params.maxSpeed / magnitude;
+        dy *= params.maxSpeed / magnitude;
+      }
+      let fx = dx - velX[i];
+      let fy = dy - velY[i];
+      const force = Math.hypot(fx, fy);
+      if (force > limit) {
+        fx *= limit / force;
+        fy *= limit / force;
+      }
+      accX[i] += fx * weight;
+      accY[i] += fy * weight;
+    }
+
+    // Alignment, cohesion and separation gathered in a single pass over nearby cells.
+    function flock(i) {
+      const x = posX[i];
+      const y = posY[i];
+      const col = grid.column(x);
+      const row = grid.row(y);
+      let velocityX = 0, velocityY = 0, positionX = 0, positionY = 0, neighbours = 0;
+      let awayX = 0, awayY = 0, crowding = 0;
+
+      const gx = grid.x, gy = grid.y, gvx = grid.vx, gvy = grid.vy;
+      for (let r = Math.max(0, row - 1); r <= Math.min(grid.rows - 1, row + 1); r++) {
+        // Cells in a row are adjacent in the sorted arrays, so each row is one contiguous range.
+        const rowStart = r * grid.cols;
+        const first = grid.cellStart[rowStart + Math.max(0, col - 1)];
+        const last = grid.cellStart[rowStart + Math.min(grid.cols - 1, col + 1) + 1];
+        for (let k = first; k < last; k++) {
+          if (grid.entries[k] === i) continue;
+          const dx = x - gx[k];
+          const dy = y - gy[k];
+          const dSq = dx * dx + dy * dy;
+          if (dSq >= viewDistSq) continue;
+          velocityX += gvx[k];
+          velocityY += gvy[k];
+          positionX += gx[k];
+          positionY += gy[k];
+          neighbours++;
+          if (dSq < separationDistSq && dSq > 0) {
+            awayX += dx / dSq;
+            awayY += dy / dSq;
+            crowding++;
+          }
+        }
+      }
+
+      if (neighbours > 0) {
+        steer(i, velocityX, velocityY, maxForce, params.alignment);
+        steer(i, positionX / neighbours - x, positionY / neighbours - y, maxForce, params.cohesion);
+      }
+      if (crowding > 0) {
+        steer(i, awayX, awayY, maxForce * 1.5, params.separation);
+      }
+    }
+
+    function update() {
+      const maxSpeed = params.maxSpeed;
+      for (let i = 0; i < flockSize; i++) {
+        posX[i] += velX[i];
+        posY[i] += velY[i];
+        velX[i] += accX[i];
+        velY[i] += accY[i];
+        const speed = Math.hypot(velX[i], velY[i]);
+        if (speed > maxSpeed) {
+          velX[i] *= maxSpeed / speed;
+          velY[i] *= maxSpeed / speed;
+        }
+        accX[i] = 0;
+        accY[i] = 0;
+
+        const base = i * trailLength;
+        if (trailCount[i] < trailLength) {
+          const slot = (trailStart[i] + trailCount[i]) % trailLength;
+          trailX[base + slot] = posX[i];
+          trailY[base + slot] = posY[i];
+          trailCount[i]++;
+        } else {
+          trailX[base + trailStart[i]] = posX[i];
+          trailY[base + trailStart[i]] = posY[i];
+          trailStart[i] = (trailStart[i] + 1) % trailLength;
+        }
+      }
+    }
+
+    // Every trail shares one stroke style, so the whole flock goes out as a single path.
+    function drawTrails() {
+      const ctx = drawingContext;
+      ctx.beginPath();
+      for (let i = 0; i < flockSize; i++) {
+        const count = trailCount[i];
+        if (count < 2) continue;
+        const base = i * trailLength;
+        let slot = trailStart[i];
+        ctx.moveTo(trailX[base + slot], trailY[base + slot]);
+        for (let n = 1; n < count; n++) {
+          slot = slot + 1 === trailLength ? 0 : slot + 1;
+          ctx.lineTo(trailX[base + slot], trailY[base + slot]);
+        }
+      }
+      noFill();
+      strokeWeight(map(7, 0, 8, 1, 3));
+      stroke(255, 255, 255, map(7, 0, 8, 0, 150));
+      ctx.stroke();
+    }
+
+    function drawBodies() {
+      fill(255, 255, 255);
+      noStroke();
+      beginShape(TRIANGLES);
+      for (let i = 0; i < flockSize; i++) {
+        const theta = Math.atan2(velY[i], velX[i]) + HALF_PI;
+        const cos = Math.cos(theta);
+        const sin = Math.sin(theta);
+        const x = posX[i];
+        const y = posY[i];
+        vertex(x + 5 * sin, y - 5 * cos);
+        vertex(x - 3 * cos - 3 * sin, y - 3 * sin + 3 * cos);
+        vertex(x + 3 * cos - 3 * sin, y + 3 * sin + 3 * cos);
+      }
+      endShape();
+    }
     """
 
     render_p5_iframe(
         script_body,
         height=650,
+        sketch_id="boids",
+        live_params={
+            "flockSize": flock_size,
+            "separation": separation,
+            "alignment": alignment,
+            "cohesion": cohesion,
+            "maxSpeed": max_speed,
+        },
         canvas_css="""
         width: min(100%, 800px) !important;
         aspect-ratio: 4 / 3;
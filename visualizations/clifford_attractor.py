@@ -1,7 +1,20 @@
 import streamlit as st
 
+from visualizations.attractor_engine import render_clifford_still
 from visualizations.shared import render_p5_iframe
 
+RENDER_MODES = {
+    "Density (Histogram)": "density",
+    "Points (Legacy)": "points",
+}
+
+STILL_RESOLUTIONS = {
+    "1600 × 1200": (1600, 1200),
+    "2400 × 1800": (2400, 1800),
+    "3200 × 2400": (3200, 2400),
+}
+STILL_POINTS = 25_000_000
+
 def render():
     st.title("Clifford Attractor (Digital Silk)")
     st.markdown(r"""
@@ -32,45 +45,158 @@ def render():
         c = st.sidebar.slider("Parameter c", min_value=-3.0, max_value=3.0, value=1.0, step=0.01)
         d = st.sidebar.slider("Parameter d", min_value=-3.0, max_value=3.0, value=0.7, step=0.01)
 
-    points_per_frame = st.sidebar.slider("Rendering Speed (Points/Frame)", min_value=5000, max_value=150000, value=30000, step=5000)
+    render_mode = st.sidebar.selectbox("Render Mode", list(RENDER_MODES))
+    points_per_frame = st.sidebar.slider("Rendering Speed (Points/Frame)", min_value=5000, max_value=1_000_000, value=200_000, step=5000)
+    gamma = st.sidebar.slider("Tone Gamma", min_value=0.3, max_value=3.0, value=1.0, step=0.05)
 
-    script_body = f"""
-    const a = {a};
-    const b = {b};
-    const c = {c};
-    const d = {d};
-    const pointsPerFrame = {points_per_frame};
+    script_body = """
+    const VIEW_SCALE = 140;
+    const POINTS_MODE_LIMIT = 150000;
+    const TONE_LUT_SIZE = 4096;
 
     let x = 0;
     let y = 0;
+    let density;
+    let maxCount = 0;
+    let palette;
+    let toneLut;
+    let pixelView;
 
-    function setup() {{
+    function setup() {
       createCanvas(800, 600);
+      pixelDensity(1);
+      density = new Uint32Array(width * height);
+      palette = buildPalette();
+      toneLut = new Uint32Array(TONE_LUT_SIZE);
+      resetCanvas();
+    }
+
+    function paramsChanged(keys) {
+      if (keys.some((key) => ["a", "b", "c", "d", "mode"].includes(key))) {
+        resetCanvas();
+      }
+    }
+
+    function resetCanvas() {
+      x = 0;
+      y = 0;
+      density.fill(0);
+      maxCount = 0;
+      blendMode(BLEND);
       background(11, 11, 11);
-      blendMode(ADD);
-    }}
+      if (params.mode === "points") {
+        blendMode(ADD);
+      } else {
+        // The pixel array is written in full every frame, so it only has to be fetched once.
+        loadPixels();
+        pixelView = new Uint32Array(pixels.buffer);
+      }
+    }
+
+    // Mirrors density_palette() in visualizations/attractor_engine.py, packed as ABGR.
+    function buildPalette() {
+      const background = [11, 11, 11];
+      const tint = [90, 180, 255];
+      const tintStop = 0.75;
+      const colors = new Uint32Array(256);
+      for (let level = 0; level < 256; level++) {
+        const t = level / 255;
+        const rgb = [0, 1, 2].map((channel) => Math.round(t <= tintStop
+          ? background[channel] + (tint[channel] - background[channel]) * (t / tintStop)
+          : tint[channel] + (255 - tint[channel]) * ((t - tintStop) / (1 - tintStop))));
+        colors[level] = (255 << 24 | rgb[2] << 16 | rgb[1] << 8 | rgb[0]) >>> 0;
+      }
+      return colors;
+    }
+
+    function draw() {
+      if (params.mode === "points") {
+        drawPoints();
+      } else {
+        drawDensity();
+      }
+    }
 
-    function draw() {{
+    function drawPoints() {
       translate(width / 2, height / 2);
       stroke(90, 180, 255, 10);
       strokeWeight(0.5);
 
-      for (let i = 0; i < pointsPerFrame; i++) {{
+      const { a, b, c, d } = params;
+      const count = Math.min(params.pointsPerFrame, POINTS_MODE_LIMIT);
+      for (let i = 0; i < count; i++) {
         let nx = Math.sin(a * y) + c * Math.cos(a * x);
         let ny = Math.sin(b * x) + d * Math.cos(b * y);
-        let px = nx * 140;
-        let py = ny * 140;
+        let px = nx * VIEW_SCALE;
+        let py = ny * VIEW_SCALE;
 
         point(px, py);
         x = nx;
         y = ny;
-      }}
-    }}
+      }
+    }
+
+    function drawDensity() {
+      const { a, b, c, d, pointsPerFrame } = params;
+      const w = width;
+      const h = height;
+      const cx = w / 2;
+      const cy = h / 2;
+      let px = x;
+      let py = y;
+      let peak = maxCount;
+
+      for (let i = 0; i < pointsPerFrame; i++) {
+        const nx = Math.sin(a * py) + c * Math.cos(a * px);
+        const ny = Math.sin(b * px) + d * Math.cos(b * py);
+        px = nx;
+        py = ny;
+        const column = Math.floor(nx * VIEW_SCALE + cx);
+        const row = Math.floor(ny * VIEW_SCALE + cy);
+        if (column >= 0 && column < w && row >= 0 && row < h) {
+          const count = ++density[row * w + column];
+          if (count > peak) peak = count;
+        }
+      }
+
+      x = px;
+      y = py;
+      maxCount = peak;
+      toneMap();
+    }
+
+    function shade(count, inverseLogPeak) {
+      const level = Math.pow(Math.log1p(count) * inverseLogPeak, params.gamma);
+      return palette[Math.min(255, Math.floor(level * 255))];
+    }
+
+    function toneMap() {
+      const inverseLogPeak = maxCount > 0 ? 1 / Math.log1p(maxCount) : 0;
+      const lutSize = Math.min(TONE_LUT_SIZE, maxCount + 1);
+      for (let count = 0; count < lutSize; count++) {
+        toneLut[count] = shade(count, inverseLogPeak);
+      }
+      for (let i = 0; i < density.length; i++) {
+        const count = density[i];
+        pixelView[i] = count < lutSize ? toneLut[count] : shade(count, inverseLogPeak);
+      }
+      updatePixels();
+    }
     """
 
     render_p5_iframe(
         script_body,
         height=650,
+        sketch_id="clifford-attractor",
+        live_params={
+            "a": a,
+            "b": b,
+            "c": c,
+            "d": d,
+            "mode": RENDER_MODES[render_mode],
+            "pointsPerFrame": points_per_frame,
+            "gamma": gamma,
+        },
         canvas_css="""
         width: min(100%, 800px) !important;
         aspect-ratio: 4 / 3;
@@ -79,3 +205,13 @@ def render():
         border: 1px solid rgba(255, 255, 255, 0.05);
         """,
     )
+
+    st.subheader("High-Resolution Still")
+    st.caption(f"Rendered on the server from {STILL_POINTS:,} iterations with the same density tone mapping.")
+    resolution = st.selectbox("Resolution", list(STILL_RESOLUTIONS))
+    if st.button("Render Still"):
+        width, height = STILL_RESOLUTIONS[resolution]
+        with st.spinner("Accumulating density..."):
+            png = render_clifford_still((("a", a), ("b", b), ("c", c), ("d", d)), width, height, STILL_POINTS, gamma)
+        st.image(png, use_container_width=True)
+        st.download_button("Download PNG", png, file_name=f"clifford_{width}x{height}.png", mime="image/png")
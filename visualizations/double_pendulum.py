@@ -2,6 +2,21 @@ import streamlit as st
 
 from visualizations.shared import render_p5_iframe
 
+VIEWS = {
+    "Ten Pendulums (Trails)": "trails",
+    "Ensemble: Divergence Heatmap": "heatmap",
+    "Ensemble: Phase-Space Cloud": "cloud",
+}
+# Pendulums per side of the grid of starting angles; the heatmap steps a twin for every cell.
+ENSEMBLE_GRID_SIZES = [64, 128, 192, 256]
+DEFAULT_ENSEMBLE_GRID = 64
+# Steppers in assets/sketch/double_pendulum.js.
+PENDULUM_INTEGRATORS = {
+    "RK4": "rk4",
+    "Störmer-Verlet (symplectic)": "verlet",
+    "Semi-Implicit Euler": "euler",
+}
+
 def render():
     st.title("Double Pendulum Visualization")
     st.markdown(r"""
@@ -10,6 +25,12 @@ def render():
     Watch how quickly their paths diverge—a phenomenon known as sensitive dependence on initial conditions (the butterfly effect).
 
     Use the **Start** and **Stop** buttons in the visualization to pause the chaos and inspect the traces.
+    The simulation runs in fixed time steps, several per frame, so its speed does not depend on the frame rate;
+    the readout next to the buttons shows the largest energy error across all pendulums, relative to the depth of the potential.
+
+    The **ensemble** views start one pendulum from every cell of a grid of initial angles ($\theta_1$ across, $\theta_2$ up).
+    The divergence heatmap pairs each with a twin started $0.001$ radians away and colors the cell by how far apart the two have drifted;
+    the phase-space cloud plots where every pendulum currently is.
     """)
     
     st.sidebar.header("Pendulum Parameters")
@@ -18,6 +39,16 @@ def render():
     g = st.sidebar.slider("Gravity ($g$)", min_value=1.0, max_value=20.0, value=9.81, step=0.1)
     m1 = st.sidebar.slider("Mass 1 ($m_1$)", min_value=1.0, max_value=50.0, value=15.0, step=1.0)
     m2 = st.sidebar.slider("Mass 2 ($m_2$)", min_value=1.0, max_value=50.0, value=15.0, step=1.0)
+    integrator = st.sidebar.selectbox("Integrator", list(PENDULUM_INTEGRATORS))
+    substeps = st.sidebar.slider("Substeps Per Frame", min_value=1, max_value=32, value=4, step=1)
+    view = st.sidebar.selectbox("View", list(VIEWS))
+    grid_size = st.sidebar.select_slider(
+        "Ensemble Grid",
+        options=ENSEMBLE_GRID_SIZES,
+        value=DEFAULT_ENSEMBLE_GRID,
+        format_func=lambda size: f"{size} × {size}",
+        disabled=VIEWS[view] == "trails",
+    )
     
     # Let lengths be fixed for visual consistency, or we could add sliders. We'll fix them to 150px in p5.
     
@@ -28,80 +59,58 @@ def render():
     <div class="controls">
       <button onclick="startSim()">Start</button>
       <button onclick="stopSim()">Stop</button>
+      <span id="energy-readout"></span>
     </div>
     """
 
-    script_body = f"""
-    const g = {g} / 10;
-    const m1 = {m1};
-    const m2 = {m2};
+    script_body = """
     const r1 = 150;
     const r2 = 150;
+    const TRAIL_PENDULUMS = 10;
+    const TRAIL_LENGTH = 1000;
+    // Each heatmap cell has a twin started this much further along in θ1; the cell is colored by
+    // log(separation / ENSEMBLE_OFFSET), saturating once the pair is as far apart as it can get.
+    const ENSEMBLE_OFFSET = 0.001;
+    const MAX_SEPARATION = Math.SQRT2 * Math.PI;
+    const ENSEMBLE_VIEW_SIZE = 560;
+    const ENSEMBLE_BACKGROUND = 0xff0f0f0f;
+    // Simulated time advances with the wall clock at one unit per 60 Hz frame, in fixed steps of
+    // 1 / substeps. A slow frame may catch up by at most this many units before time slips.
+    const FRAME_MS = 1000 / 60;
+    const MAX_CATCH_UP = 2;
+    // Pendulum steps per frame, shared across the ensemble. Large grids hit this before the substep
+    // count and run in slow motion rather than stalling the page; 64 × 64 at 4 substeps stays under.
+    const STEP_BUDGET = 100000;
+    const ENERGY_READOUT_INTERVAL = 15;
 
     let cx, cy;
-
-    class DoublePendulum {{
-      constructor(a1, a2, colorStr) {{
-        this.a1 = a1;
-        this.a2 = a2;
-        this.a1_v = 0;
-        this.a2_v = 0;
-        this.a1_a = 0;
-        this.a2_a = 0;
-        this.colorStr = colorStr;
-        this.path = [];
-      }}
-
-      update() {{
-        let num1 = -g * (2 * m1 + m2) * Math.sin(this.a1);
-        let num2 = -m2 * g * Math.sin(this.a1 - 2 * this.a2);
-        let num3 = -2 * Math.sin(this.a1 - this.a2) * m2;
-        let num4 = this.a2_v * this.a2_v * r2 + this.a1_v * this.a1_v * r1 * Math.cos(this.a1 - this.a2);
-        let den = r1 * (2 * m1 + m2 - m2 * Math.cos(2 * this.a1 - 2 * this.a2));
-        this.a1_a = (num1 + num2 + num3 * num4) / den;
-
-        num1 = 2 * Math.sin(this.a1 - this.a2);
-        num2 = this.a1_v * this.a1_v * r1 * (m1 + m2);
-        num3 = g * (m1 + m2) * Math.cos(this.a1);
-        num4 = this.a2_v * this.a2_v * r2 * m2 * Math.cos(this.a1 - this.a2);
-        den = r2 * (2 * m1 + m2 - m2 * Math.cos(2 * this.a1 - 2 * this.a2));
-        this.a2_a = (num1 * (num2 + num3 + num4)) / den;
-
-        this.a1_v += this.a1_a;
-        this.a2_v += this.a2_a;
-        this.a1 += this.a1_v;
-        this.a2 += this.a2_v;
-      }}
-
-      getPositions() {{
-        let x1 = r1 * Math.sin(this.a1);
-        let y1 = r1 * Math.cos(this.a1);
-        let x2 = x1 + r2 * Math.sin(this.a2);
-        let y2 = y1 + r2 * Math.cos(this.a2);
-        return {{ x1, y1, x2, y2 }};
-      }}
-    }}
-
-    let pendulums = [];
+    let palette;
+    let pendulums;
+    let paths = [];
+    let ensemble;
+    let ensembleCanvas;
+    let ensembleContext;
+    let ensembleImage;
+    let ensemblePixels;
+    let ensembleColors;
+    let divergenceColors;
+    let simTime = 0;
+    let pendingTime = 0;
     let isPlaying = true;
 
-    function startSim() {{
+    function startSim() {
       isPlaying = true;
-    }}
+    }
 
-    function stopSim() {{
+    function stopSim() {
       isPlaying = false;
-    }}
+    }
 
-    function setup() {{
+    function setup() {
       createCanvas(800, 600);
       cx = width / 2;
       cy = height / 3;
-
-      let startAngle1 = PI / 2;
-      let startAngle2 = PI / 2;
-      let diff = 0.001;
-      let palette = [
+      palette = [
         color(0, 255, 255),
         color(0, 191, 255),
         color(50, 205, 50),
@@ -113,60 +122,234 @@ def render():
         color(191, 0, 255),
         color(138, 43, 226)
       ];
+      divergenceColors = buildDivergenceColors();
+      resetSimulation();
+    }
+
+    function paramsChanged(keys) {
+      if (keys.includes("view") || (keys.includes("gridSize") && params.view !== "trails")) {
+        resetSimulation();
+      } else if (keys.some((key) => ["g", "m1", "m2", "integrator", "substeps"].includes(key))) {
+        activeEnsemble().captureEnergy(params.g / 10, params.m1, params.m2, r1, r2);
+      }
+    }
+
+    function activeEnsemble() {
+      return params.view === "trails" ? pendulums : ensemble;
+    }
+
+    function resetSimulation() {
+      simTime = 0;
+      pendingTime = 0;
+      if (params.view === "trails") {
+        setupTrails();
+      } else {
+        setupEnsemble(params.gridSize);
+      }
+      activeEnsemble().captureEnergy(params.g / 10, params.m1, params.m2, r1, r2);
+    }
+
+    function setupTrails() {
+      let startAngle1 = PI / 2;
+      let startAngle2 = PI / 2;
+      let diff = 0.001;
+      pendulums = new PendulumEnsemble(TRAIL_PENDULUMS);
+      paths = [];
+      for (let i = 0; i < TRAIL_PENDULUMS; i++) {
+        pendulums.a1[i] = startAngle1 + diff * i;
+        pendulums.a2[i] = startAngle2 + diff * i;
+        paths.push([]);
+      }
+    }
+
+    // One pendulum per cell, θ1 increasing to the right and θ2 upwards, both over [-π, π).
+    function setupEnsemble(grid) {
+      const cells = grid * grid;
+      const heatmap = params.view === "heatmap";
+      ensemble = new PendulumEnsemble(heatmap ? 2 * cells : cells);
+      ensembleColors = new Uint32Array(cells);
+      for (let row = 0; row < grid; row++) {
+        for (let col = 0; col < grid; col++) {
+          const i = row * grid + col;
+          const u = (col + 0.5) / grid;
+          const v = 1 - (row + 0.5) / grid;
+          ensemble.a1[i] = -PI + u * TWO_PI;
+          ensemble.a2[i] = -PI + v * TWO_PI;
+          ensembleColors[i] = packColor(60 + 195 * u, 60 + 195 * v, 255 - 140 * u);
+        }
+      }
+      if (heatmap) {
+        for (let i = 0; i < cells; i++) {
+          ensemble.a1[cells + i] = ensemble.a1[i] + ENSEMBLE_OFFSET;
+          ensemble.a2[cells + i] = ensemble.a2[i];
+        }
+      }
+
+      const resolution = heatmap ? grid : ENSEMBLE_VIEW_SIZE;
+      ensembleCanvas = document.createElement("canvas");
+      ensembleCanvas.width = resolution;
+      ensembleCanvas.height = resolution;
+      ensembleContext = ensembleCanvas.getContext("2d");
+      ensembleImage = ensembleContext.createImageData(resolution, resolution);
+      ensemblePixels = new Uint32Array(ensembleImage.data.buffer);
+    }
+
+    function packColor(r, g, b) {
+      return (255 << 24 | Math.round(b) << 16 | Math.round(g) << 8 | Math.round(r)) >>> 0;
+    }
+
+    // Settled (dark) through cyan and magenta to white for pairs that have fully decorrelated.
+    function buildDivergenceColors() {
+      const stops = [[15, 15, 15], [0, 120, 200], [0, 255, 255], [255, 20, 147], [255, 255, 255]];
+      const colors = new Uint32Array(256);
+      for (let level = 0; level < 256; level++) {
+        const t = (level / 255) * (stops.length - 1);
+        const index = Math.min(stops.length - 2, Math.floor(t));
+        const f = t - index;
+        const [from, to] = [stops[index], stops[index + 1]];
+        colors[level] = packColor(
+          from[0] + (to[0] - from[0]) * f,
+          from[1] + (to[1] - from[1]) * f,
+          from[2] + (to[2] - from[2]) * f
+        );
+      }
+      return colors;
+    }
+
+    function draw() {
+      if (isPlaying) {
+        advance();
+      }
+      if (frameCount % ENERGY_READOUT_INTERVAL === 0) {
+        updateEnergyReadout();
+      }
+
+      if (params.view === "trails") {
+        drawTrails();
+      } else {
+        if (params.view === "heatmap") {
+          paintDivergence();
+        } else {
+          paintPhaseCloud();
+        }
+        drawEnsemble();
+      }
+    }
+
+    function advance() {
+      const dt = 1 / params.substeps;
+      pendingTime = Math.min(pendingTime + deltaTime / FRAME_MS, MAX_CATCH_UP);
+      const budget = Math.max(1, Math.floor(STEP_BUDGET / activeEnsemble().count));
+      const steps = Math.min(Math.floor(pendingTime / dt), budget);
+      if (steps > 0) {
+        activeEnsemble().step(params.integrator, dt, steps, params.g / 10, params.m1, params.m2, r1, r2);
+        pendingTime -= steps * dt;
+        simTime += steps * dt;
+      }
+    }
+
+    function updateEnergyReadout() {
+      const drift = activeEnsemble().maxEnergyDrift(params.g / 10, params.m1, params.m2, r1, r2);
+      document.getElementById('energy-readout').innerText =
+        `t = ${simTime.toFixed(0)} · energy drift ${drift.toExponential(1)}`;
+    }
+
+    function positions(i) {
+      let x1 = r1 * Math.sin(pendulums.a1[i]);
+      let y1 = r1 * Math.cos(pendulums.a1[i]);
+      let x2 = x1 + r2 * Math.sin(pendulums.a2[i]);
+      let y2 = y1 + r2 * Math.cos(pendulums.a2[i]);
+      return { x1, y1, x2, y2 };
+    }
+
+    function paintDivergence() {
+      const cells = params.gridSize * params.gridSize;
+      const { a1, a2 } = ensemble;
+      const scale = 255 / Math.log(MAX_SEPARATION / ENSEMBLE_OFFSET);
+      for (let i = 0; i < cells; i++) {
+        const d1 = wrapAngle(a1[cells + i] - a1[i]);
+        const d2 = wrapAngle(a2[cells + i] - a2[i]);
+        const separation = Math.max(Math.sqrt(d1 * d1 + d2 * d2), ENSEMBLE_OFFSET);
+        const level = Math.log(separation / ENSEMBLE_OFFSET) * scale;
+        ensemblePixels[i] = divergenceColors[level > 255 ? 255 : level | 0];
+      }
+    }
+
+    function paintPhaseCloud() {
+      const cells = params.gridSize * params.gridSize;
+      const size = ENSEMBLE_VIEW_SIZE;
+      const { a1, a2 } = ensemble;
+      ensemblePixels.fill(ENSEMBLE_BACKGROUND);
+      for (let i = 0; i < cells; i++) {
+        const px = Math.min(size - 1, ((wrapAngle(a1[i]) + PI) / TWO_PI * size) | 0);
+        const py = Math.min(size - 1, ((PI - wrapAngle(a2[i])) / TWO_PI * size) | 0);
+        ensemblePixels[py * size + px] = ensembleColors[i];
+      }
+    }
+
+    function drawEnsemble() {
+      background(15, 15, 15);
+      ensembleContext.putImageData(ensembleImage, 0, 0);
+      const left = (width - ENSEMBLE_VIEW_SIZE) / 2;
+      const top = (height - ENSEMBLE_VIEW_SIZE) / 2;
+      drawingContext.imageSmoothingEnabled = false;
+      drawingContext.drawImage(ensembleCanvas, left, top, ENSEMBLE_VIEW_SIZE, ENSEMBLE_VIEW_SIZE);
+      drawingContext.imageSmoothingEnabled = true;
+
+      const cells = params.gridSize * params.gridSize;
+      fill(255, 150);
+      noStroke();
+      textSize(10);
+      text("θ1 →", left + ENSEMBLE_VIEW_SIZE - 30, top + ENSEMBLE_VIEW_SIZE + 14);
+      text("θ2 ↑", left - 30, top + 10);
+      text(params.view === "heatmap" ? "Divergence of twin pendulums (log scale)" : "θ1 vs θ2 (Phase Space)", left, top - 6);
+      text(`${ensemble.count} pendulums`, left + ENSEMBLE_VIEW_SIZE - 80, top - 6);
+    }
 
-      for (let i = 0; i < 10; i++) {{
-        pendulums.push(new DoublePendulum(
-          startAngle1 + diff * i,
-          startAngle2 + diff * i,
-          palette[i]
-        ));
-      }}
-    }}
-
-    function draw() {{
+    function drawTrails() {
       background(15, 15, 15);
 
-      for (let p of pendulums) {{
-        if (isPlaying) {{
-          p.update();
-          let pos = p.getPositions();
-          p.path.push(createVector(pos.x2, pos.y2));
-          if (p.path.length > 1000) {{
-            p.path.shift();
-          }}
-        }}
-      }}
+      for (let i = 0; i < TRAIL_PENDULUMS; i++) {
+        if (isPlaying) {
+          let pos = positions(i);
+          paths[i].push(createVector(pos.x2, pos.y2));
+          if (paths[i].length > TRAIL_LENGTH) {
+            paths[i].shift();
+          }
+        }
+      }
 
       push();
       translate(cx, cy);
 
       blendMode(ADD);
-      for (let p of pendulums) {{
+      for (let p = 0; p < TRAIL_PENDULUMS; p++) {
+        const path = paths[p];
         noFill();
         beginShape();
-        for (let i = 0; i < p.path.length; i++) {{
-          let alpha = map(i, 0, p.path.length, 0, 30);
-          let strokeC = color(red(p.colorStr), green(p.colorStr), blue(p.colorStr), alpha);
+        for (let i = 0; i < path.length; i++) {
+          let alpha = map(i, 0, path.length, 0, 30);
+          let strokeC = color(red(palette[p]), green(palette[p]), blue(palette[p]), alpha);
           stroke(strokeC);
           strokeWeight(3);
-          vertex(p.path[i].x, p.path[i].y);
-        }}
+          vertex(path[i].x, path[i].y);
+        }
         endShape();
-      }}
+      }
       blendMode(BLEND);
 
-      for (let p of pendulums) {{
-        let pos = p.getPositions();
+      for (let p = 0; p < TRAIL_PENDULUMS; p++) {
+        let pos = positions(p);
         stroke(255, 100);
         strokeWeight(2);
         line(0, 0, pos.x1, pos.y1);
         line(pos.x1, pos.y1, pos.x2, pos.y2);
 
-        fill(p.colorStr);
+        fill(palette[p]);
         noStroke();
-        ellipse(pos.x1, pos.y1, m1 * 0.5, m1 * 0.5);
-        ellipse(pos.x2, pos.y2, m2 * 0.5, m2 * 0.5);
-      }}
+        ellipse(pos.x1, pos.y1, params.m1 * 0.5, params.m1 * 0.5);
+        ellipse(pos.x2, pos.y2, params.m2 * 0.5, params.m2 * 0.5);
+      }
 
       fill(255);
       ellipse(0, 0, 10, 10);
@@ -183,33 +366,32 @@ def render():
       line(0, -100, 0, 100);
       line(-100, 0, 100, 0);
 
-      for (let p of pendulums) {{
-        let theta1 = p.a1 % TWO_PI;
-        let theta2 = p.a2 % TWO_PI;
-        if (theta1 > PI) theta1 -= TWO_PI;
-        else if (theta1 < -PI) theta1 += TWO_PI;
-        if (theta2 > PI) theta2 -= TWO_PI;
-        else if (theta2 < -PI) theta2 += TWO_PI;
-
-        let px = map(theta1, -PI, PI, -90, 90);
-        let py = map(theta2, -PI, PI, -90, 90);
+      for (let p = 0; p < TRAIL_PENDULUMS; p++) {
+        let px = map(wrapAngle(pendulums.a1[p]), -PI, PI, -90, 90);
+        let py = map(wrapAngle(pendulums.a2[p]), -PI, PI, -90, 90);
 
-        fill(p.colorStr);
+        fill(palette[p]);
         noStroke();
         ellipse(px, py, 4, 4);
-      }}
+      }
 
       fill(255, 150);
       noStroke();
       textSize(10);
       text("θ1 vs θ2 (Phase Space)", -60, 90);
       pop();
-    }}
+    }
     """
 
     render_p5_iframe(
         script_body,
         height=650,
+        sketch_id="double-pendulum",
+        live_params={
+            "g": g, "m1": m1, "m2": m2, "view": VIEWS[view], "gridSize": grid_size,
+            "integrator": PENDULUM_INTEGRATORS[integrator], "substeps": substeps,
+        },
+        libraries=("double_pendulum",),
         body_html=controls_html,
         body_css="""
         background-color: #0f0f0f;
@@ -248,6 +430,13 @@ def render():
           border-color: rgba(255, 255, 255, 0.5);
         }
 
+        #energy-readout {
+          align-self: center;
+          color: rgba(255, 255, 255, 0.7);
+          font-family: sans-serif;
+          font-size: 12px;
+        }
+
         button:active {
           transform: scale(0.95);
         }
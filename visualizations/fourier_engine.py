@@ -0,0 +1,158 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from collections.abc import Callable
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any
+
+import numpy as np
+
+from visualizations.path_import import load_path
+
+
+SAMPLE_COUNT = 600
+# Epicycles are drawn largest first and the harmonics slider stops here, so a page never
+# needs more than this prefix of a spectrum.
+MAX_EPICYCLES = 300
+
+# Uploaded paths are centred and scaled to fit this box on the 800 x 600 canvas.
+PATH_FIT_WIDTH = 560
+PATH_FIT_HEIGHT = 440
+CUSTOM_SAMPLE_COUNTS = (600, 2048, 8192, 32768, 131072)
+CUSTOM_SPECTRUM_CACHE_SIZE = 16
+
+
+def _heart(t: np.ndarray) -> np.ndarray:
+    x = 16 * np.sin(t) ** 3
+    y = -(13 * np.cos(t) - 5 * np.cos(2 * t) - 2 * np.cos(3 * t) - np.cos(4 * t))
+    return 12 * (x + 1j * y)
+
+
+def _trefoil(t: np.ndarray) -> np.ndarray:
+    return 60 * ((np.sin(t) + 2 * np.sin(2 * t)) + 1j * (np.cos(t) - 2 * np.cos(2 * t)))
+
+
+def _lemniscate(t: np.ndarray) -> np.ndarray:
+    denominator = 1 + np.sin(t) ** 2
+    return 200 * (np.cos(t) + 1j * np.sin(t) * np.cos(t)) / denominator
+
+
+def _butterfly(t: np.ndarray) -> np.ndarray:
+    bt = 12 * t
+    radius = np.exp(np.cos(bt)) - 2 * np.cos(4 * bt) - np.sin(bt / 12) ** 5
+    return 50 * radius * (np.sin(bt) - 1j * np.cos(bt))
+
+
+def _hypotrochoid(t: np.ndarray) -> np.ndarray:
+    ht = 3 * t
+    big, small, offset = 5, 3, 5
+    x = (big - small) * np.cos(ht) + offset * np.cos((big - small) / small * ht)
+    y = (big - small) * np.sin(ht) - offset * np.sin((big - small) / small * ht)
+    return 25 * (x + 1j * y)
+
+
+def _lissajous(t: np.ndarray) -> np.ndarray:
+    return 200 * (np.sin(3 * t + np.pi / 2) + 1j * np.sin(2 * t))
+
+
+def _epicycloid(t: np.ndarray) -> np.ndarray:
+    et = 2 * t
+    big, small = 5, 2
+    x = (big + small) * np.cos(et) - small * np.cos((big + small) / small * et)
+    y = (big + small) * np.sin(et) - small * np.sin((big + small) / small * et)
+    return 25 * (x + 1j * y)
+
+
+SHAPES: dict[str, Callable[[np.ndarray], np.ndarray]] = {
+    "Heart": _heart,
+    "Trefoil Knot": _trefoil,
+    "Infinity (Lemniscate)": _lemniscate,
+    "Butterfly Curve": _butterfly,
+    "Spirograph (Hypotrochoid)": _hypotrochoid,
+    "Lissajous Knot": _lissajous,
+    "Star Epicycloid": _epicycloid,
+}
+
+
+def sample_shape(name: str, count: int = SAMPLE_COUNT) -> np.ndarray:
+    t = 2 * np.pi * np.arange(count) / count
+    return SHAPES[name](t)
+
+
+@dataclass(frozen=True)
+class Spectrum:
+    sample_count: int
+    freq: np.ndarray
+    amp: np.ndarray
+    phase: np.ndarray
+
+    def payload(self) -> dict[str, Any]:
+        return {
+            "count": self.sample_count,
+            "freq": self.freq.tolist(),
+            "amp": np.round(self.amp, 4).tolist(),
+            "phase": np.round(self.phase, 5).tolist(),
+        }
+
+
+# X[k] = sum(z[n] e^(-2 pi i k n / N)) / N, with epicycles ordered by decreasing amplitude. Frequencies
+# above N / 2 are reported as negative (k - N): identical at the samples, but the curve between them
+# is the smooth one, so the sketch can play any N back at the same number of steps per loop.
+def spectrum(points: np.ndarray, limit: int | None = MAX_EPICYCLES) -> Spectrum:
+    count = len(points)
+    coefficients = np.fft.fft(np.asarray(points, dtype=np.complex128)) / count
+    amp = np.abs(coefficients)
+    order = np.argsort(-amp, kind="stable")[:limit]
+    freq = np.where(order > count // 2, order - count, order)
+    return Spectrum(count, freq, amp[order], np.angle(coefficients[order]))
+
+
+def resample_by_arc_length(points: np.ndarray, count: int) -> np.ndarray:
+    closed = np.append(points, points[0])
+    lengths = np.abs(np.diff(closed))
+    keep = np.concatenate(([True], lengths > 0))
+    closed = closed[keep]
+    distance = np.concatenate(([0.0], np.cumsum(lengths[lengths > 0])))
+    if distance[-1] == 0:
+        raise ValueError("The path has zero length")
+    targets = np.arange(count) * (distance[-1] / count)
+    return np.interp(targets, distance, closed.real) + 1j * np.interp(targets, distance, closed.imag)
+
+
+def fit_to_canvas(points: np.ndarray) -> np.ndarray:
+    centered = points - points.mean()
+    width = np.ptp(centered.real)
+    height = np.ptp(centered.imag)
+    scale = min(PATH_FIT_WIDTH / width if width else np.inf, PATH_FIT_HEIGHT / height if height else np.inf)
+    return centered * (scale if np.isfinite(scale) else 1.0)
+
+
+_custom_spectra: OrderedDict[tuple[str, str, int, int], Spectrum] = OrderedDict()
+_custom_spectra_lock = threading.Lock()
+
+
+# Keyed by a hash of the uploaded bytes, so re-running the page with the same file skips parsing
+# and the transform entirely.
+def custom_spectrum(data: bytes, filename: str, *, samples: int, limit: int = MAX_EPICYCLES) -> Spectrum:
+    key = (hashlib.sha256(data).hexdigest(), filename.rsplit(".", 1)[-1].lower(), samples, limit)
+    with _custom_spectra_lock:
+        if key in _custom_spectra:
+            _custom_spectra.move_to_end(key)
+            return _custom_spectra[key]
+
+    points = fit_to_canvas(resample_by_arc_length(load_path(data, filename), samples))
+    result = spectrum(points, limit)
+    with _custom_spectra_lock:
+        _custom_spectra[key] = result
+        while len(_custom_spectra) > CUSTOM_SPECTRUM_CACHE_SIZE:
+            _custom_spectra.popitem(last=False)
+    return result
+
+
+@lru_cache(maxsize=1)
+def builtin_spectra_json() -> str:
+    return json.dumps([spectrum(sample_shape(name)).payload() for name in SHAPES], separators=(",", ":"))
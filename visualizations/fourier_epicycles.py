@@ -1,7 +1,17 @@
 import streamlit as st
 
+from visualizations.fourier_engine import (
+    CUSTOM_SAMPLE_COUNTS,
+    MAX_EPICYCLES,
+    SAMPLE_COUNT,
+    SHAPES,
+    builtin_spectra_json,
+    custom_spectrum,
+)
 from visualizations.shared import render_p5_iframe
 
+CUSTOM_SHAPE = "Custom Path (Upload)"
+
 def render():
     st.title("Fourier Series (Drawing with Epicycles)")
     st.markdown(r"""
@@ -14,181 +24,182 @@ def render():
     
     st.sidebar.header("Fourier Parameters")
     
-    shapes_list = [
-        "Heart", 
-        "Trefoil Knot", 
-        "Infinity (Lemniscate)", 
-        "Butterfly Curve", 
-        "Spirograph (Hypotrochoid)", 
-        "Lissajous Knot", 
-        "Star Epicycloid"
-    ]
+    shapes_list = [*SHAPES, CUSTOM_SHAPE]
     shape = st.sidebar.selectbox("Silhouette Shape", shapes_list)
     
     # Send shape as integer to JS
     shape_map = {k: v for v, k in enumerate(shapes_list)}
     shape_id = shape_map[shape]
+
+    custom = None
+    if shape == CUSTOM_SHAPE:
+        upload = st.sidebar.file_uploader(
+            "Path File (SVG or CSV)",
+            type=["svg", "csv", "txt"],
+            help="SVG paths, polygons and polylines, or one x,y point per line. Coordinates use SVG orientation (y down).",
+        )
+        samples = st.sidebar.select_slider("Path Samples", options=CUSTOM_SAMPLE_COUNTS, value=8192)
+        if upload is None:
+            st.sidebar.info("Upload a path to trace it with epicycles.")
+        else:
+            try:
+                custom = custom_spectrum(upload.getvalue(), upload.name, samples=samples).payload()
+            except ValueError as error:
+                st.sidebar.error(str(error))
     
     # The max number of harmonics is bounded by the number of points we sample
-    harmonics = st.sidebar.slider("Number of Epicycles (Harmonics)", min_value=1, max_value=300, value=50, step=1)
+    harmonics = st.sidebar.slider("Number of Epicycles (Harmonics)", min_value=1, max_value=MAX_EPICYCLES, value=50, step=1)
     
     speed = st.sidebar.slider("Drawing Speed", min_value=0.1, max_value=5.0, value=1.0, step=0.1)
 
-    script_body = f"""
-    const shapeId = {shape_id};
-    let maxHarmonics = {harmonics};
-    const speedMulti = {speed};
+    script_body = """
+    // Epicycles per built-in shape, computed on the server with an FFT and sorted by amplitude.
+    // Uploaded paths arrive the same way in params.custom. Every shape is traced in the same
+    // number of steps, however many samples its spectrum was computed from.
+    const SPECTRA = __SPECTRA__;
+    const CUSTOM_SHAPE_ID = SPECTRA.length;
+    const STEPS_PER_LOOP = __STEPS_PER_LOOP__;
 
-    let time = 0;
-    let path = [];
-    let fourierTarget = [];
-
-    function dft(x) {{
-      let X = [];
-      const N = x.length;
-      for (let k = 0; k < N; k++) {{
-        let re = 0;
-        let im = 0;
-        for (let n = 0; n < N; n++) {{
-          let phi = (TWO_PI * k * n) / N;
-          re += x[n].x * cos(phi) + x[n].y * sin(phi);
-          im += x[n].y * cos(phi) - x[n].x * sin(phi);
-        }}
-        re = re / N;
-        im = im / N;
-
-        let freq = k;
-        let amp = sqrt(re * re + im * im);
-        let phase = atan2(im, re);
-
-        X[k] = {{ re, im, freq, amp, phase }};
-      }}
-      return X;
-    }}
-
-    function setup() {{
-      createCanvas(800, 600);
+    // The trace is stroked one segment per frame onto its own layer and composited at this
+    // opacity. Circles (and their arms) with a radius under half a pixel, i.e. less than one
+    // pixel across, are summed but not drawn.
+    const TRACE_ALPHA = 60 / 255;
+    const MIN_DRAWN_RADIUS = 0.5;
 
-      const N = 600;
-      let rawPoints = [];
-      for (let i = 0; i < N; i++) {{
-        let t = map(i, 0, N, 0, TWO_PI);
-        let bx = 0;
-        let by = 0;
-
-        if (shapeId === 0) {{
-          bx = 16 * pow(sin(t), 3);
-          by = -(13 * cos(t) - 5 * cos(2 * t) - 2 * cos(3 * t) - cos(4 * t));
-          bx *= 12;
-          by *= 12;
-        }} else if (shapeId === 1) {{
-          bx = sin(t) + 2 * sin(2 * t);
-          by = cos(t) - 2 * cos(2 * t);
-          bx *= 60;
-          by *= 60;
-        }} else if (shapeId === 2) {{
-          let scale = 200;
-          bx = (scale * cos(t)) / (1 + pow(sin(t), 2));
-          by = (scale * sin(t) * cos(t)) / (1 + pow(sin(t), 2));
-        }} else if (shapeId === 3) {{
-          let bt = map(i, 0, N, 0, TWO_PI * 12);
-          bx = sin(bt) * (exp(cos(bt)) - 2 * cos(4 * bt) - pow(sin(bt / 12), 5));
-          by = -cos(bt) * (exp(cos(bt)) - 2 * cos(4 * bt) - pow(sin(bt / 12), 5));
-          bx *= 50;
-          by *= 50;
-        }} else if (shapeId === 4) {{
-          let ht = map(i, 0, N, 0, TWO_PI * 3);
-          let R = 5;
-          let r = 3;
-          let d = 5;
-          bx = (R - r) * cos(ht) + d * cos(((R - r) / r) * ht);
-          by = (R - r) * sin(ht) - d * sin(((R - r) / r) * ht);
-          bx *= 25;
-          by *= 25;
-        }} else if (shapeId === 5) {{
-          bx = sin(3 * t + PI / 2);
-          by = sin(2 * t);
-          bx *= 200;
-          by *= 200;
-        }} else if (shapeId === 6) {{
-          let et = map(i, 0, N, 0, TWO_PI * 2);
-          let R = 5;
-          let r = 2;
-          bx = (R + r) * cos(et) - r * cos(((R + r) / r) * et);
-          by = (R + r) * sin(et) - r * sin(((R + r) / r) * et);
-          bx *= 25;
-          by *= 25;
-        }}
-
-        rawPoints.push({{ x: bx, y: by }});
-      }}
-
-      fourierTarget = dft(rawPoints);
-      fourierTarget.sort((a, b) => b.amp - a.amp);
-    }}
-
-    function epicycles(x, y, rotation, fourier, maxCircs) {{
-      for (let i = 0; i < maxCircs; i++) {{
-        if (i >= fourier.length) break;
+    let time = 0;
+    let fourierTarget;
+    let traceLayer;
+    let traced = 0;
+    let tipX = 0;
+    let tipY = 0;
 
+    function setup() {
+      createCanvas(800, 600);
+      traceLayer = createGraphics(width, height);
+      buildFourierTarget(params.shapeId);
+      resetTrace();
+    }
+
+    function paramsChanged(keys) {
+      if (keys.includes("shapeId") || (keys.includes("custom") && params.shapeId === CUSTOM_SHAPE_ID)) {
+        buildFourierTarget(params.shapeId);
+        time = 0;
+        resetTrace();
+      } else if (keys.includes("harmonics")) {
+        resetTrace();
+      }
+    }
+
+    function buildFourierTarget(shapeId) {
+      if (shapeId !== CUSTOM_SHAPE_ID) {
+        fourierTarget = SPECTRA[shapeId];
+      } else if (params.custom) {
+        fourierTarget = params.custom;
+      } else if (!fourierTarget) {
+        fourierTarget = SPECTRA[0];
+      }
+    }
+
+    function resetTrace() {
+      traceLayer.clear();
+      traceLayer.noFill();
+      traceLayer.stroke(0, 255, 255);
+      traceLayer.strokeWeight(4.5);
+      traceLayer.drawingContext.lineJoin = "round";
+      traceLayer.drawingContext.lineCap = "round";
+      traceLayer.drawingContext.shadowBlur = 20;
+      traceLayer.drawingContext.shadowColor = '#00FFFF';
+      traced = 0;
+      tracePoint(time, params.harmonics);
+    }
+
+    function tracePoint(t, maxCircs) {
+      const fourier = fourierTarget;
+      const count = Math.min(maxCircs, fourier.amp.length);
+      let x = width / 2;
+      let y = height / 2;
+      for (let i = 0; i < count; i++) {
+        const angle = fourier.freq[i] * t + fourier.phase[i];
+        x += fourier.amp[i] * Math.cos(angle);
+        y += fourier.amp[i] * Math.sin(angle);
+      }
+      tipX = x;
+      tipY = y;
+    }
+
+    // The curve is periodic, so once a whole loop is on the layer every later segment would
+    // land on pixels that are already there. Fast speeds cover a long arc per frame; that arc
+    // is split so the trace stays a curve rather than a chain of chords.
+    function extendTrace(from, step) {
+      if (traced >= TWO_PI) {
+        return;
+      }
+      const substeps = Math.max(1, Math.ceil(params.speed));
+      const context = traceLayer.drawingContext;
+      context.beginPath();
+      context.moveTo(tipX, tipY);
+      for (let s = 1; s <= substeps; s++) {
+        tracePoint(from + (step * s) / substeps, params.harmonics);
+        context.lineTo(tipX, tipY);
+      }
+      context.stroke();
+      traced += step;
+    }
+
+    // Epicycles are sorted by amplitude, so the first one below the cutoff ends the drawing
+    // and the rest only move the tip.
+    function epicycles(x, y, rotation, fourier, maxCircs) {
+      const count = Math.min(maxCircs, fourier.amp.length);
+      let i = 0;
+      noFill();
+      for (; i < count && fourier.amp[i] >= MIN_DRAWN_RADIUS; i++) {
         let prevx = x;
         let prevy = y;
-        let freq = fourier[i].freq;
-        let radius = fourier[i].amp;
-        let phase = fourier[i].phase;
+        let freq = fourier.freq[i];
+        let radius = fourier.amp[i];
+        let phase = fourier.phase[i];
 
         x += radius * cos(freq * time + phase + rotation);
         y += radius * sin(freq * time + phase + rotation);
 
         stroke(255, 255, 255, 70);
-        noFill();
         strokeWeight(1.5);
         ellipse(prevx, prevy, radius * 2);
 
         stroke(150, 255, 255, 180);
         strokeWeight(2.5);
         line(prevx, prevy, x, y);
-      }}
-      return createVector(x, y);
-    }}
-
-    function draw() {{
+      }
+      for (; i < count; i++) {
+        const angle = fourier.freq[i] * time + fourier.phase[i] + rotation;
+        x += fourier.amp[i] * Math.cos(angle);
+        y += fourier.amp[i] * Math.sin(angle);
+      }
+    }
+
+    function draw() {
       background(11, 11, 11);
 
-      let vx = epicycles(width / 2, height / 2, 0, fourierTarget, maxHarmonics);
-      path.unshift(vx);
-
-      beginShape();
-      noFill();
-      drawingContext.shadowBlur = 20;
-      drawingContext.shadowColor = '#00FFFF';
-
-      for (let i = 0; i < path.length; i++) {{
-        strokeWeight(4.5);
-        stroke(0, 255, 255, map(i, 0, path.length, 255, 60));
-        vertex(path[i].x, path[i].y);
-      }}
-      endShape();
+      epicycles(width / 2, height / 2, 0, fourierTarget, params.harmonics);
 
-      drawingContext.shadowBlur = 0;
+      drawingContext.globalAlpha = TRACE_ALPHA;
+      drawingContext.drawImage(traceLayer.elt, 0, 0, width, height);
+      drawingContext.globalAlpha = 1;
 
-      let dt = TWO_PI / fourierTarget.length;
-      time += dt * speedMulti;
-
-      let maxPoints = Math.floor(TWO_PI / (dt * speedMulti)) + 2;
-      if (path.length > maxPoints) {{
-        path.pop();
-      }}
-
-      if (time > TWO_PI) {{
-        time = 0;
-      }}
-    }}
-    """
+      const step = (TWO_PI / STEPS_PER_LOOP) * params.speed;
+      extendTrace(time, step);
+      time += step;
+      if (time > TWO_PI) {
+        time -= TWO_PI;
+      }
+    }
+    """.replace("__SPECTRA__", builtin_spectra_json()).replace("__STEPS_PER_LOOP__", str(SAMPLE_COUNT))
 
     render_p5_iframe(
         script_body,
         height=650,
+        sketch_id="fourier-epicycles",
+        live_params={"shapeId": shape_id, "harmonics": harmonics, "speed": speed, "custom": custom},
         canvas_css="""
         width: min(100%, 800px) !important;
         aspect-ratio: 4 / 3;
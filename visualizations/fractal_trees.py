@@ -1,7 +1,11 @@
 import streamlit as st
 
+from visualizations.lsystem_engine import PRESETS, LSystem, expand, format_rules, load_lsystem, parse_rules
 from visualizations.shared import render_p5_iframe
 
+WIND_TREE = "Wind-Blown Binary Tree"
+PREVIEW_SYMBOLS = 240
+
 def render():
     st.title("Fractal Trees (L-Systems)")
     st.markdown(r"""
@@ -10,64 +14,214 @@ def render():
     The Emergence: You start with a single "stem" and a simple rule: *At every end, grow two smaller branches at an angle.* By repeating this simple instruction recursively, a beautifully complex Japanese Bonsai structure organically emerges.
     
     Adjust the sliders below to watch the stick physically bloom into a tree, and turn up the **Wind** to watch it gracefully sway!
+
+    Pick another **Grammar** to run a full L-system: an axiom is rewritten by the production rules for a number of iterations,
+    and the resulting string drives a turtle (`F`/`G` draw, `f` moves, `+`/`-` turn, `|` turns around, `[`/`]` branch).
     """, unsafe_allow_html=True)
     
     st.sidebar.header("Tree Parameters")
-    
-    depth = st.sidebar.slider("Recursion Depth (Growth)", min_value=1, max_value=13, value=10, step=1)
-    angle_deg = st.sidebar.slider("Branch Angle", min_value=10, max_value=90, value=25, step=1)
-    wind = st.sidebar.slider("Wind Intensity", min_value=0.0, max_value=3.0, value=1.0, step=0.1)
 
-    script_body = f"""
-    const maxDepth = {depth};
-    const baseAngle = {angle_deg} * (Math.PI / 180);
-    const windIntensity = {wind};
+    grammar = st.sidebar.selectbox("Grammar", [WIND_TREE, *PRESETS])
+    depth, angle_deg, wind = 10, 25, 1.0
+    geometry = None
+    if grammar == WIND_TREE:
+        depth = st.sidebar.slider("Recursion Depth (Growth)", min_value=1, max_value=18, value=10, step=1)
+        angle_deg = st.sidebar.slider("Branch Angle", min_value=10, max_value=90, value=25, step=1)
+        wind = st.sidebar.slider("Wind Intensity", min_value=0.0, max_value=3.0, value=1.0, step=0.1)
+    else:
+        preset = PRESETS[grammar]
+        axiom = st.sidebar.text_input("Axiom", value=preset.system.axiom, key=f"lsystem-axiom-{grammar}")
+        rules = st.sidebar.text_area("Rules", value=format_rules(preset.system.rules), key=f"lsystem-rules-{grammar}")
+        turn = st.sidebar.slider(
+            "Turn Angle", min_value=1.0, max_value=180.0, value=preset.system.angle, step=0.5, key=f"lsystem-angle-{grammar}"
+        )
+        iterations = st.sidebar.slider(
+            "Iterations", min_value=0, max_value=20, value=preset.iterations, step=1, key=f"lsystem-iterations-{grammar}"
+        )
+        try:
+            system = LSystem(axiom.strip(), parse_rules(rules), turn)
+            with st.spinner("Expanding L-system..."):
+                geometry = load_lsystem(system, iterations)
+        except ValueError as error:
+            st.sidebar.error(str(error))
+        else:
+            preview = next(expand(system, iterations, chunk=PREVIEW_SYMBOLS), "")[:PREVIEW_SYMBOLS]
+            st.markdown(f"**{geometry.symbols:,} symbols, {geometry.segments:,} segments**: `{preview}`…")
+
+    script_body = """
+    const TRUNK_LENGTH = 160;
+    const LENGTH_RATIO = 0.67;
 
     let time = 0;
+    let segmentCount = 0;
+    let depthOf, lengthOf, parentOf, sideOf;
+    let angle, startX, startY, endX, endY;
 
-    function setup() {{
+    function setup() {
       createCanvas(800, 600);
-    }}
+      buildTree(params.maxDepth);
+      loadLSystem();
+    }
+
+    // L-system drawings arrive as quantized segments (see visualizations/lsystem_engine.py).
+    const LSYSTEM_MARGIN = 20;
+
+    let lsystemVertices = null;
+    let lsystemDirty = false;
+
+    function paramsChanged(keys) {
+      if (keys.includes("maxDepth")) {
+        buildTree(params.maxDepth);
+      }
+      if (keys.includes("lsystem")) {
+        loadLSystem();
+      }
+    }
+
+    function loadLSystem() {
+      const descriptor = params.lsystem;
+      lsystemVertices = null;
+      if (!descriptor) return;
+      fetch(descriptor.url)
+        .then((response) => {
+          if (!response.ok) throw new Error(`HTTP ${response.status}`);
+          return response.arrayBuffer();
+        })
+        .then((buffer) => {
+          if (!params.lsystem || params.lsystem.url !== descriptor.url) return;
+          lsystemVertices = new Uint16Array(buffer);
+          lsystemDirty = true;
+        })
+        .catch((error) => console.warn("Could not load L-system geometry:", error));
+    }
+
+    // Branches in breadth-first order: node k grows children 2k + 1 (rotated +angle) and 2k + 2
+    // (rotated -angle), so parents always come first and each depth is one contiguous range.
+    // Only the angles change from frame to frame; the topology is rebuilt when the depth does.
+    function buildTree(maxDepth) {
+      segmentCount = 2 ** maxDepth - 1;
+      depthOf = new Uint8Array(segmentCount);
+      lengthOf = new Float32Array(segmentCount);
+      parentOf = new Int32Array(segmentCount);
+      sideOf = new Int8Array(segmentCount);
+      angle = new Float32Array(segmentCount);
+      startX = new Float32Array(segmentCount);
+      startY = new Float32Array(segmentCount);
+      endX = new Float32Array(segmentCount);
+      endY = new Float32Array(segmentCount);
 
-    function draw() {{
+      lengthOf[0] = TRUNK_LENGTH;
+      parentOf[0] = -1;
+      for (let k = 1; k < segmentCount; k++) {
+        const parent = (k - 1) >> 1;
+        parentOf[k] = parent;
+        depthOf[k] = depthOf[parent] + 1;
+        lengthOf[k] = lengthOf[parent] * LENGTH_RATIO;
+        sideOf[k] = k & 1 ? 1 : -1;
+      }
+    }
+
+    function draw() {
+      if (params.lsystem) {
+        if (lsystemVertices && lsystemDirty) {
+          drawLSystem(params.lsystem);
+          lsystemDirty = false;
+        }
+        return;
+      }
       background(11, 11, 11);
       time += 0.02;
-      let currentWind = sin(time * windIntensity * 2) * (0.08 * windIntensity);
-      translate(width / 2, height);
-      branch(160, 0, currentWind);
-    }}
-
-    function branch(len, depth, windOffset) {{
-      strokeWeight(map(len, 5, 160, 0.5, 6));
-
-      if (depth >= maxDepth - 2 && maxDepth > 4) {{
-        stroke(150, 255, 180, 220);
-      }} else {{
-        stroke(220, 220, 230, map(depth, 0, 10, 255, 150));
-      }}
-
-      line(0, 0, 0, -len);
-      translate(0, -len);
-
-      if (depth < maxDepth - 1) {{
-        let windPhysics = windOffset * (depth * 0.3);
-
-        push();
-        rotate(baseAngle + windPhysics);
-        branch(len * 0.67, depth + 1, windOffset);
-        pop();
-
-        push();
-        rotate(-baseAngle + windPhysics);
-        branch(len * 0.67, depth + 1, windOffset);
-        pop();
-      }}
-    }}
+      let currentWind = sin(time * params.windIntensity * 2) * (0.08 * params.windIntensity);
+      layoutTree(currentWind);
+      drawTree();
+    }
+
+    // A branch's angle is its parent's plus the split angle and a wind term that grows with depth.
+    function layoutTree(windOffset) {
+      const baseAngle = params.angleDeg * (Math.PI / 180);
+      angle[0] = 0;
+      startX[0] = width / 2;
+      startY[0] = height;
+      endX[0] = width / 2;
+      endY[0] = height - lengthOf[0];
+      for (let k = 1; k < segmentCount; k++) {
+        const parent = parentOf[k];
+        const a = angle[parent] + sideOf[k] * baseAngle + windOffset * (depthOf[parent] * 0.3);
+        const x = endX[parent];
+        const y = endY[parent];
+        angle[k] = a;
+        startX[k] = x;
+        startY[k] = y;
+        endX[k] = x + lengthOf[k] * Math.sin(a);
+        endY[k] = y - lengthOf[k] * Math.cos(a);
+      }
+    }
+
+    // The drawing is static, so it is painted once per load. Segments come grouped by band
+    // (bracket depth for plants, position along the curve otherwise) and each band is one path.
+    function drawLSystem(descriptor) {
+      background(11, 11, 11);
+      const scale = Math.min(
+        (width - 2 * LSYSTEM_MARGIN) / Math.max(descriptor.width, 1e-6),
+        (height - 2 * LSYSTEM_MARGIN) / Math.max(descriptor.height, 1e-6)
+      ) / 65535;
+      const left = (width - descriptor.width * 65535 * scale) / 2;
+      const top = (height - descriptor.height * 65535 * scale) / 2;
+      const bands = descriptor.bands;
+      const lastBand = Math.max(1, bands.length - 2);
+
+      for (let band = 0; band < bands.length - 1; band++) {
+        const t = band / lastBand;
+        if (descriptor.branching) {
+          strokeWeight(lerp(3, 0.6, t));
+          stroke(lerp(220, 150, t), lerp(220, 255, t), lerp(230, 180, t), lerp(255, 200, t));
+        } else {
+          strokeWeight(1.2);
+          stroke(lerp(0, 255, t), lerp(255, 20, t), lerp(255, 147, t), 230);
+        }
+        drawingContext.beginPath();
+        for (let i = bands[band] * 4; i < bands[band + 1] * 4; i += 4) {
+          drawingContext.moveTo(left + lsystemVertices[i] * scale, top + lsystemVertices[i + 1] * scale);
+          drawingContext.lineTo(left + lsystemVertices[i + 2] * scale, top + lsystemVertices[i + 3] * scale);
+        }
+        drawingContext.stroke();
+      }
+    }
+
+    // Stroke weight and color depend only on depth, so each level is a single path.
+    function drawTree() {
+      const maxDepth = params.maxDepth;
+      for (let depth = 0; depth < maxDepth; depth++) {
+        const first = 2 ** depth - 1;
+        const last = Math.min(2 ** (depth + 1) - 1, segmentCount);
+
+        strokeWeight(map(lengthOf[first], 5, 160, 0.5, 6));
+        if (depth >= maxDepth - 2 && maxDepth > 4) {
+          stroke(150, 255, 180, 220);
+        } else {
+          stroke(220, 220, 230, map(depth, 0, 10, 255, 150));
+        }
+
+        drawingContext.beginPath();
+        for (let k = first; k < last; k++) {
+          drawingContext.moveTo(startX[k], startY[k]);
+          drawingContext.lineTo(endX[k], endY[k]);
+        }
+        drawingContext.stroke();
+      }
+    }
     """
 
     render_p5_iframe(
         script_body,
         height=650,
+        sketch_id="fractal-trees",
+        live_params={
+            "maxDepth": depth,
+            "angleDeg": angle_deg,
+            "windIntensity": wind,
+            "lsystem": geometry.descriptor() if geometry else None,
+        },
         canvas_css="""
         width: min(100%, 800px) !important;
         aspect-ratio: 4 / 3;
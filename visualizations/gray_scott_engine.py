@@ -0,0 +1,303 @@
+from __future__ import annotations
+
+import argparse
+import itertools
+import shutil
+import subprocess
+import tempfile
+import time
+from collections.abc import Iterable, Sequence
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+
+from visualizations.attractor_engine import encode_png
+from visualizations.shared import SKETCH_LIBRARY_DIR
+
+
+# Same model as assets/sketch/gray_scott.js: a 9-point Laplacian, border cells held fixed,
+# and both concentrations clamped to [0, 1] after every step.
+DIFFUSION_A = 1.0
+DIFFUSION_B = 0.5
+LAPLACIAN_EDGE = 0.2
+LAPLACIAN_CORNER = 0.05
+SEED_SQUARE = 15
+SEED_MARGIN = 10
+SEED_SQUARES_PER_CELL = 20 / 40_000
+
+SWEEP_FORMATS = ("npz", "png")
+JS_REFERENCE_PATH = SKETCH_LIBRARY_DIR / "gray_scott.js"
+JS_REFERENCE_DRIVER = """
+const fs = require("fs");
+const [dir, size, feed, kill, iterations] = process.argv.slice(2);
+const read = (name) => new Float32Array(new Uint8Array(fs.readFileSync(`${dir}/${name}`)).buffer);
+const simulation = new GrayScottCpu(Number(size));
+simulation.load(read("a.f32"), read("b.f32"));
+const start = process.hrtime.bigint();
+simulation.step(Number(iterations), Number(feed), Number(kill));
+const seconds = Number(process.hrtime.bigint() - start) / 1e9;
+fs.writeFileSync(`${dir}/a.out`, Buffer.from(simulation.a.buffer));
+fs.writeFileSync(`${dir}/b.out`, Buffer.from(simulation.b.buffer));
+console.log(seconds);
+"""
+
+
+def seed_fields(size: int, *, seed: int = 0) -> tuple[np.ndarray, np.ndarray]:
+    rng = np.random.default_rng(seed)
+    a = np.ones((size, size), dtype=np.float32)
+    b = np.zeros((size, size), dtype=np.float32)
+    squares = max(1, round(SEED_SQUARES_PER_CELL * size * size))
+    # Small grids keep a quarter of the side clear instead, so there is always room to seed.
+    margin = min(SEED_MARGIN, size // 4)
+    for x, y in rng.integers(margin, size - margin, size=(squares, 2)):
+        b[y : min(size - 1, y + SEED_SQUARE), x : min(size - 1, x + SEED_SQUARE)] = 1.0
+    return a, b
+
+
+def simulate(
+    a: np.ndarray,
+    b: np.ndarray,
+    *,
+    feed: float,
+    kill: float,
+    iterations: int,
+) -> tuple[np.ndarray, np.ndarray]:
+    a = np.array(a, dtype=np.float32)
+    b = np.array(b, dtype=np.float32)
+    next_a = a.copy()
+    next_b = b.copy()
+    interior = (slice(1, -1), slice(1, -1))
+    shape = (a.shape[0] - 2, a.shape[1] - 2)
+    lap_a, lap_b, reaction, corners = (np.empty(shape, dtype=np.float32) for _ in range(4))
+    feed32, kill32 = np.float32(feed), np.float32(kill)
+
+    for _ in range(iterations):
+        _laplacian(a, lap_a, corners)
+        _laplacian(b, lap_b, corners)
+        center_a, center_b = a[interior], b[interior]
+        np.multiply(center_b, center_b, out=reaction)
+        reaction *= center_a
+
+        out = next_a[interior]
+        np.subtract(1.0, center_a, out=out)
+        out *= feed32
+        out -= reaction
+        lap_a *= np.float32(DIFFUSION_A)
+        out += lap_a
+        out += center_a
+        np.clip(out, 0.0, 1.0, out=out)
+
+        out = next_b[interior]
+        np.multiply(center_b, -(kill32 + feed32), out=out)
+        out += reaction
+        lap_b *= np.float32(DIFFUSION_B)
+        out += lap_b
+        out += center_b
+        np.clip(out, 0.0, 1.0, out=out)
+
+        a, next_a = next_a, a
+        b, next_b = next_b, b
+    return a, b
+
+
+def _laplacian(field: np.ndarray, out: np.ndarray, corners: np.ndarray) -> None:
+    np.add(field[:-2, 1:-1], field[2:, 1:-1], out=out)
+    out += field[1:-1, :-2]
+    out += field[1:-1, 2:]
+    out *= np.float32(LAPLACIAN_EDGE)
+    np.add(field[:-2, :-2], field[:-2, 2:], out=corners)
+    corners += field[2:, :-2]
+    corners += field[2:, 2:]
+    corners *= np.float32(LAPLACIAN_CORNER)
+    out += corners
+    out -= field[1:-1, 1:-1]
+
+
+# Same palette as grayScottColor() in the sketch library.
+def colorize(b: np.ndarray) -> np.ndarray:
+    b = np.clip(b, 0.0, 1.0)
+    rgb = np.stack(
+        (
+            11 + b * 30,
+            11 + np.where(b > 0.2, b * 255, b * 120),
+            11 + np.where(b > 0.1, b * 382.5, b * 150),
+        ),
+        axis=-1,
+    )
+    return np.clip(np.round(rgb), 0, 255).astype(np.uint8)
+
+
+@dataclass(frozen=True)
+class SweepJob:
+    feed: float
+    kill: float
+    size: int
+    iterations: int
+    seed: int
+    path: Path
+    image_format: str
+
+
+@dataclass(frozen=True)
+class SweepResult:
+    feed: float
+    kill: float
+    path: Path
+    seconds: float
+
+
+def sweep(
+    pairs: Iterable[tuple[float, float]],
+    output_dir: Path,
+    *,
+    size: int = 256,
+    iterations: int = 5000,
+    seed: int = 0,
+    image_format: str = "npz",
+    workers: int | None = None,
+) -> list[SweepResult]:
+    if image_format not in SWEEP_FORMATS:
+        raise ValueError(f"Unknown sweep format {image_format!r}; expected one of {SWEEP_FORMATS}")
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    jobs = [
+        SweepJob(
+            feed,
+            kill,
+            size,
+            iterations,
+            seed,
+            # Full repr precision, so pairs on a fine grid never share (and overwrite) a file.
+            output_dir / f"gray_scott_f{float(feed)!r}_k{float(kill)!r}.{image_format}",
+            image_format,
+        )
+        for feed, kill in pairs
+    ]
+    if len({job.path for job in jobs}) < len(jobs):
+        raise ValueError("Each (feed, kill) pair may appear only once in a sweep")
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(_run_sweep_job, jobs))
+
+
+def _run_sweep_job(job: SweepJob) -> SweepResult:
+    start = time.perf_counter()
+    a, b = simulate(*seed_fields(job.size, seed=job.seed), feed=job.feed, kill=job.kill, iterations=job.iterations)
+    if job.image_format == "png":
+        job.path.write_bytes(encode_png(colorize(b)))
+    else:
+        np.savez_compressed(job.path, a=a, b=b, feed=job.feed, kill=job.kill, iterations=job.iterations)
+    return SweepResult(job.feed, job.kill, job.path, time.perf_counter() - start)
+
+
+def run_js_reference(
+    a: np.ndarray,
+    b: np.ndarray,
+    *,
+    feed: float,
+    kill: float,
+    iterations: int,
+) -> tuple[np.ndarray, np.ndarray, float]:
+    node = shutil.which("node")
+    if node is None:
+        raise RuntimeError("Node.js is required to run the JavaScript reference")
+    script = JS_REFERENCE_PATH.read_text(encoding="utf-8") + JS_REFERENCE_DRIVER
+    size = a.shape[0]
+    with tempfile.TemporaryDirectory() as directory:
+        folder = Path(directory)
+        np.asarray(a, dtype="<f4").tofile(folder / "a.f32")
+        np.asarray(b, dtype="<f4").tofile(folder / "b.f32")
+        completed = subprocess.run(
+            [node, "-", directory, str(size), repr(feed), repr(kill), str(iterations)],
+            input=script,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        result_a = np.fromfile(folder / "a.out", dtype="<f4").reshape(size, size)
+        result_b = np.fromfile(folder / "b.out", dtype="<f4").reshape(size, size)
+    return result_a, result_b, float(completed.stdout.strip())
+
+
+@dataclass(frozen=True)
+class BenchmarkResult:
+    size: int
+    iterations: int
+    numpy_cells_per_second: float
+    js_cells_per_second: float | None
+    max_difference: float | None
+
+
+def benchmark(
+    size: int = 256,
+    iterations: int = 200,
+    *,
+    feed: float = 0.055,
+    kill: float = 0.062,
+    compare_js: bool = True,
+) -> BenchmarkResult:
+    a, b = seed_fields(size)
+    cells = (size - 2) ** 2 * iterations
+    start = time.perf_counter()
+    result_a, result_b = simulate(a, b, feed=feed, kill=kill, iterations=iterations)
+    numpy_rate = cells / (time.perf_counter() - start)
+
+    js_rate = difference = None
+    if compare_js and shutil.which("node"):
+        js_a, js_b, seconds = run_js_reference(a, b, feed=feed, kill=kill, iterations=iterations)
+        js_rate = cells / seconds
+        difference = float(max(np.abs(js_a - result_a).max(), np.abs(js_b - result_b).max()))
+    return BenchmarkResult(size, iterations, numpy_rate, js_rate, difference)
+
+
+def _parse_range(text: str) -> list[float]:
+    start, stop, count = text.split(":")
+    # Rounded past any meaningful precision so sweep file names read 0.058, not 0.057999999999999996.
+    return [round(float(value), 12) for value in np.linspace(float(start), float(stop), int(count))]
+
+
+def main(argv: Sequence[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Headless Gray-Scott reaction-diffusion runs.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    bench = commands.add_parser("benchmark", help="Measure cells updated per second against the JS reference.")
+    bench.add_argument("--size", type=int, default=256)
+    bench.add_argument("--iterations", type=int, default=200)
+
+    sweep_parser = commands.add_parser("sweep", help="Run a grid of (feed, kill) pairs in a process pool.")
+    sweep_parser.add_argument("--feed", type=_parse_range, required=True, help="start:stop:count")
+    sweep_parser.add_argument("--kill", type=_parse_range, required=True, help="start:stop:count")
+    sweep_parser.add_argument("--output", type=Path, required=True)
+    sweep_parser.add_argument("--size", type=int, default=256)
+    sweep_parser.add_argument("--iterations", type=int, default=5000)
+    sweep_parser.add_argument("--seed", type=int, default=0)
+    sweep_parser.add_argument("--format", choices=SWEEP_FORMATS, default="npz")
+    sweep_parser.add_argument("--workers", type=int, default=None)
+
+    args = parser.parse_args(argv)
+    if args.command == "benchmark":
+        result = benchmark(args.size, args.iterations)
+        print(f"NumPy: {result.numpy_cells_per_second / 1e6:.1f}M cells/s on {result.size}x{result.size}")
+        if result.js_cells_per_second is None:
+            print("JavaScript reference skipped (node not found)")
+        else:
+            print(f"JavaScript reference: {result.js_cells_per_second / 1e6:.1f}M cells/s")
+            print(f"Max difference after {result.iterations} iterations: {result.max_difference:.2e}")
+        return
+
+    results = sweep(
+        itertools.product(args.feed, args.kill),
+        args.output,
+        size=args.size,
+        iterations=args.iterations,
+        seed=args.seed,
+        image_format=args.format,
+        workers=args.workers,
+    )
+    for result in results:
+        print(f"f={result.feed:.4f} k={result.kill:.4f} -> {result.path} ({result.seconds:.1f}s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,646 @@
+from __future__ import annotations
+
+import argparse
+import colorsys
+import json
+import math
+import shutil
+import subprocess
+import time
+from collections.abc import Callable, Iterable, Iterator, Mapping, Sequence
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+from PIL import Image, ImageChops, ImageDraw
+
+from visualizations import attractor_engine, fourier_engine, gray_scott_engine, ifs_engine, lsystem_engine, turmite_engine
+from visualizations.catalog import PAGE_BY_KEY
+
+
+# Python reimplementations of the sketches, drawn with Pillow at the sketch's canvas size times
+# `scale`. A scene renders `count` frames that sample one run evenly, and the last frame always
+# shows the finished state, so a single frame is the still.
+BACKGROUND = (11, 11, 11)
+VIDEO_FPS = 30
+
+Frames = Iterator[Image.Image]
+
+
+@dataclass(frozen=True)
+class Scene:
+    size: tuple[int, int]
+    defaults: Mapping[str, Any]
+    frames: Callable[[dict[str, Any], int, float], Frames]
+
+
+def _blank(size: tuple[int, int], scale: float, color: tuple[int, int, int] = BACKGROUND) -> Image.Image:
+    return Image.new("RGB", (round(size[0] * scale), round(size[1] * scale)), color)
+
+
+def _marks(total: int, count: int) -> list[int]:
+    return [max(1, round(total * (k + 1) / count)) for k in range(count)]
+
+
+def _hsb(hue: float, saturation: float = 1.0, brightness: float = 1.0) -> tuple[int, int, int]:
+    return tuple(round(channel * 255) for channel in colorsys.hsv_to_rgb(hue % 1.0, saturation, brightness))
+
+
+# Consecutive points sharing a color level are drawn as one polyline.
+def _polylines(draw: ImageDraw.ImageDraw, xs: np.ndarray, ys: np.ndarray, levels: np.ndarray, colors: Sequence, width: int) -> None:
+    if len(xs) < 2:
+        return
+    breaks = np.flatnonzero(np.diff(levels[:-1])) + 1
+    for start, stop in zip(np.concatenate(([0], breaks)), np.concatenate((breaks, [len(xs) - 1]))):
+        points = list(zip(xs[start : stop + 1].tolist(), ys[start : stop + 1].tolist()))
+        draw.line(points, fill=colors[levels[start]], width=width)
+
+
+@dataclass(frozen=True)
+class _FlowView:
+    parameters: tuple[str, ...]
+    zoom: float
+    to_world: Callable[[np.ndarray], np.ndarray]
+    # map(z, near, far, 255, 50) in the sketch's trail colors.
+    brightness: tuple[float, float]
+
+
+FLOW_VIEWS = {
+    "lorenz": _FlowView(
+        ("sigma", "rho", "beta"),
+        5.0,
+        lambda p: np.stack((p[..., 0], p[..., 1], p[..., 2] - 30), axis=-1),
+        (0.0, 50.0),
+    ),
+    "aizawa": _FlowView(
+        ("a", "b", "c", "d", "e", "f"),
+        150.0,
+        lambda p: np.stack((p[..., 0], -p[..., 2], p[..., 1] - 0.5), axis=-1),
+        (-1.0, 2.0),
+    ),
+}
+FLOW_SHADES = 32
+
+
+def _flow_frames(system: str) -> Callable[[dict[str, Any], int, float], Frames]:
+    view = FLOW_VIEWS[system]
+
+    def frames(params: dict[str, Any], count: int, scale: float) -> Frames:
+        trajectory = attractor_engine.integrate_flow(
+            system,
+            {name: float(params[name]) for name in view.parameters},
+            points=int(params["trail_length"]),
+            dt=float(params["dt"]),
+            method=params["integrator"],
+        )
+        near, far = view.brightness
+        brightness = np.clip(255 + (trajectory[..., 2] - near) * (50 - 255) / (far - near), 0, 255) / 255
+        levels = np.minimum((brightness * FLOW_SHADES).astype(np.int64), FLOW_SHADES - 1)
+        base = _hsb(140 / 255)
+        colors = [tuple(round(channel * (level + 0.5) / FLOW_SHADES) for channel in base) for level in range(FLOW_SHADES)]
+        world = view.to_world(trajectory) * view.zoom
+        width, height = 800, 600
+        # p5's default WEBGL camera: 60 degree field of view, looking down -z at the origin.
+        distance = (height / 2) / math.tan(math.pi / 6)
+        line_width = max(1, round(float(params["thickness"]) * scale))
+        steps = trajectory.shape[1]
+
+        for index, shown in enumerate(_marks(steps, count)):
+            angle = math.radians(float(params["orbit"])) * index
+            x = world[..., 0] * math.cos(angle) + world[..., 2] * math.sin(angle)
+            z = -world[..., 0] * math.sin(angle) + world[..., 2] * math.cos(angle)
+            perspective = distance / (distance - z)
+            sx = (width / 2 + x * perspective) * scale
+            sy = (height / 2 + world[..., 1] * perspective) * scale
+            image = _blank((width, height), scale, (10, 10, 15))
+            draw = ImageDraw.Draw(image)
+            for run in range(trajectory.shape[0]):
+                _polylines(draw, sx[run, :shown], sy[run, :shown], levels[run, :shown], colors, line_width)
+            yield image
+
+    return frames
+
+
+PENDULUM_ARM = 150
+PENDULUM_COUNT = 10
+PENDULUM_TRAIL = 1000
+PENDULUM_PALETTE = (
+    (0, 255, 255), (0, 191, 255), (50, 205, 50), (173, 255, 47), (255, 255, 0),
+    (255, 140, 0), (255, 69, 0), (255, 20, 147), (191, 0, 255), (138, 43, 226),
+)
+
+
+# Same equations as pendulumAcceleration() in assets/sketch/double_pendulum.js.
+def _pendulum_acceleration(t1, t2, w1, w2, g, m1, m2, r1, r2):
+    total = 2 * m1 + m2
+    delta = t1 - t2
+    den = total - m2 * np.cos(2 * delta)
+    a1 = (
+        -g * total * np.sin(t1) - m2 * g * np.sin(t1 - 2 * t2)
+        - 2 * np.sin(delta) * m2 * (w2 * w2 * r2 + w1 * w1 * r1 * np.cos(delta))
+    ) / (r1 * den)
+    a2 = (
+        2 * np.sin(delta) * (w1 * w1 * r1 * (m1 + m2) + g * (m1 + m2) * np.cos(t1) + w2 * w2 * r2 * m2 * np.cos(delta))
+    ) / (r2 * den)
+    return a1, a2
+
+
+def _pendulum_frames(params: dict[str, Any], count: int, scale: float) -> Frames:
+    g, m1, m2 = float(params["g"]) / 10, float(params["m1"]), float(params["m2"])
+    r = PENDULUM_ARM
+    state = np.zeros((4, PENDULUM_COUNT))
+    state[0] = state[1] = math.pi / 2 + 0.001 * np.arange(PENDULUM_COUNT)
+    dt = 1 / int(params["substeps"])
+
+    def derivative(s: np.ndarray) -> np.ndarray:
+        return np.stack((s[2], s[3], *_pendulum_acceleration(s[0], s[1], s[2], s[3], g, m1, m2, r, r)))
+
+    trail = np.empty((0, PENDULUM_COUNT, 2))
+    marks = set(_marks(int(params["duration"]), count))
+    for frame in range(1, max(marks) + 1):
+        for _ in range(int(params["substeps"])):
+            k1 = derivative(state)
+            k2 = derivative(state + k1 * dt / 2)
+            k3 = derivative(state + k2 * dt / 2)
+            k4 = derivative(state + k3 * dt)
+            state = state + (k1 + 2 * k2 + 2 * k3 + k4) * dt / 6
+        x1, y1 = r * np.sin(state[0]), r * np.cos(state[0])
+        x2, y2 = x1 + r * np.sin(state[1]), y1 + r * np.cos(state[1])
+        trail = np.concatenate((trail, np.stack((x2, y2), axis=-1)[None]))[-PENDULUM_TRAIL:]
+        if frame not in marks:
+            continue
+
+        image = _blank((800, 600), scale, (15, 15, 15))
+        cx, cy = 400, 200
+
+        def at(x: float, y: float) -> tuple[float, float]:
+            return ((cx + x) * scale, (cy + y) * scale)
+
+        # The 2D renderer strokes each trail shape with its last vertex's color (alpha ~30 of 255),
+        # added onto the canvas with blendMode(ADD).
+        for p in range(PENDULUM_COUNT):
+            layer = Image.new("RGB", image.size)
+            color = tuple(round(channel * 30 / 255) for channel in PENDULUM_PALETTE[p])
+            points = list(zip(((cx + trail[:, p, 0]) * scale).tolist(), ((cy + trail[:, p, 1]) * scale).tolist()))
+            ImageDraw.Draw(layer).line(points, fill=color, width=max(1, round(3 * scale)), joint="curve")
+            image = ImageChops.add(image, layer)
+
+        draw = ImageDraw.Draw(image, "RGBA")
+        for p in range(PENDULUM_COUNT):
+            draw.line([at(0, 0), at(x1[p], y1[p]), at(x2[p], y2[p])], fill=(255, 255, 255, 100), width=max(1, round(2 * scale)))
+            for x, y, mass in ((x1[p], y1[p], m1), (x2[p], y2[p], m2)):
+                radius = mass * 0.25 * scale
+                px, py = at(x, y)
+                draw.ellipse((px - radius, py - radius, px + radius, py + radius), fill=PENDULUM_PALETTE[p])
+        px, py = at(0, 0)
+        draw.ellipse((px - 5 * scale, py - 5 * scale, px + 5 * scale, py + 5 * scale), fill=(255, 255, 255))
+
+        # Phase-space inset: (theta1, theta2) wrapped to [-pi, pi).
+        ix, iy = 680, 480
+        draw.rounded_rectangle(((ix - 100) * scale, (iy - 100) * scale, (ix + 100) * scale, (iy + 100) * scale), 10 * scale, fill=(30, 30, 30))
+        draw.line([(ix * scale, (iy - 100) * scale), (ix * scale, (iy + 100) * scale)], fill=(60, 60, 60), width=max(1, round(scale)))
+        draw.line([((ix - 100) * scale, iy * scale), ((ix + 100) * scale, iy * scale)], fill=(60, 60, 60), width=max(1, round(scale)))
+        wrapped = (state[:2] + math.pi) % (2 * math.pi) - math.pi
+        for p in range(PENDULUM_COUNT):
+            px, py = (ix + wrapped[0, p] * 90 / math.pi) * scale, (iy + wrapped[1, p] * 90 / math.pi) * scale
+            draw.ellipse((px - 2 * scale, py - 2 * scale, px + 2 * scale, py + 2 * scale), fill=PENDULUM_PALETTE[p])
+        yield image
+
+
+def _reaction_diffusion_frames(params: dict[str, Any], count: int, scale: float) -> Frames:
+    size = int(params["grid_size"])
+    a, b = gray_scott_engine.seed_fields(size, seed=int(params["seed"]))
+    done = 0
+    for mark in _marks(int(params["iterations"]), count):
+        a, b = gray_scott_engine.simulate(a, b, feed=float(params["feed"]), kill=float(params["kill"]), iterations=mark - done)
+        done = mark
+        # Any grid size fills the scene's canvas, so every frame has the size frame_size() declares.
+        image = Image.fromarray(gray_scott_engine.colorize(b))
+        yield image.resize(frame_size("reaction-diffusion", scale), Image.Resampling.BILINEAR)
+
+
+BOID_VIEW = 50
+BOID_MAX_FORCE = 0.2
+BOID_TRAIL = 8
+BOID_CHUNK = 1024
+BOID_FADE = 60 / 255
+
+
+def _limit(x: np.ndarray, y: np.ndarray, limit: float) -> tuple[np.ndarray, np.ndarray]:
+    length = np.hypot(x, y)
+    factor = np.where(length > limit, limit / np.maximum(length, 1e-12), 1.0)
+    return x * factor, y * factor
+
+
+def _boids_frames(params: dict[str, Any], count: int, scale: float) -> Frames:
+    width, height = 800, 600
+    n = int(params["flock_size"])
+    max_speed = float(params["max_speed"])
+    rng = np.random.default_rng(int(params["seed"]))
+    heading = rng.uniform(0, 2 * math.pi, n)
+    speed = rng.uniform(2, 4, n)
+    pos = np.stack((rng.uniform(0, width, n), rng.uniform(0, height, n)), axis=1)
+    vel = np.stack((np.cos(heading), np.sin(heading)), axis=1) * speed[:, None]
+    trail = np.repeat(pos[None], BOID_TRAIL, axis=0)
+    trail_count = np.zeros(n, dtype=np.int64)
+    canvas = np.array(_blank((width, height), scale), dtype=np.float32)
+    marks = set(_marks(int(params["duration"]), count))
+
+    def steer(acc: np.ndarray, mask: np.ndarray, desired: np.ndarray, limit: float, weight: float) -> None:
+        dx, dy = desired[:, 0], desired[:, 1]
+        magnitude = np.hypot(dx, dy)
+        factor = np.where(magnitude > 0, max_speed / np.maximum(magnitude, 1e-12), 1.0)
+        fx, fy = _limit(dx * factor - vel[:, 0], dy * factor - vel[:, 1], limit)
+        acc[mask] += np.stack((fx, fy), axis=1)[mask] * weight
+
+    for frame in range(1, max(marks) + 1):
+        wrapped = (pos[:, 0] > width) | (pos[:, 0] < 0) | (pos[:, 1] > height) | (pos[:, 1] < 0)
+        pos[:, 0] = np.where(pos[:, 0] > width, 0, np.where(pos[:, 0] < 0, width, pos[:, 0]))
+        pos[:, 1] = np.where(pos[:, 1] > height, 0, np.where(pos[:, 1] < 0, height, pos[:, 1]))
+        trail_count[wrapped] = 0
+
+        acc = np.zeros_like(vel)
+        sums = np.zeros((n, 4))
+        away = np.zeros((n, 2))
+        neighbours = np.zeros(n)
+        crowding = np.zeros(n)
+        for start in range(0, n, BOID_CHUNK):
+            rows = slice(start, start + BOID_CHUNK)
+            offset = pos[rows, None, :] - pos[None, :, :]
+            distance = (offset**2).sum(axis=-1)
+            near = distance < BOID_VIEW**2
+            near[np.arange(near.shape[0]), np.arange(start, start + near.shape[0])] = False
+            sums[rows] = near @ np.hstack((vel, pos))
+            neighbours[rows] = near.sum(axis=1)
+            close = near & (distance < (BOID_VIEW / 2) ** 2) & (distance > 0)
+            away[rows] = (offset * (close / np.where(close, distance, 1.0))[..., None]).sum(axis=1)
+            crowding[rows] = close.sum(axis=1)
+        flocking = neighbours > 0
+        centre = sums[:, 2:] / np.maximum(neighbours, 1)[:, None] - pos
+        steer(acc, flocking, sums[:, :2], BOID_MAX_FORCE, float(params["alignment"]))
+        steer(acc, flocking, centre, BOID_MAX_FORCE, float(params["cohesion"]))
+        steer(acc, crowding > 0, away, BOID_MAX_FORCE * 1.5, float(params["separation"]))
+
+        pos = pos + vel
+        vel = np.stack(_limit(*(vel + acc).T, max_speed), axis=1)
+        trail = np.concatenate((trail[1:], pos[None]))
+        trail_count = np.minimum(trail_count + 1, BOID_TRAIL)
+
+        # background(11, 11, 11, 60) every frame leaves fading copies of earlier frames.
+        canvas += (np.array(BACKGROUND, dtype=np.float32) - canvas) * BOID_FADE
+        image = Image.fromarray(np.round(canvas).astype(np.uint8))
+        draw = ImageDraw.Draw(image, "RGBA")
+        for i in np.flatnonzero(trail_count >= 2):
+            points = trail[BOID_TRAIL - trail_count[i] :, i] * scale
+            draw.line([tuple(point) for point in points.tolist()], fill=(255, 255, 255, 131), width=max(1, round(2.75 * scale)))
+        theta = np.arctan2(vel[:, 1], vel[:, 0]) + math.pi / 2
+        cos, sin = np.cos(theta), np.sin(theta)
+        x, y = pos[:, 0], pos[:, 1]
+        corners = np.stack(
+            (
+                np.stack((x + 5 * sin, y - 5 * cos), axis=1),
+                np.stack((x - 3 * cos - 3 * sin, y - 3 * sin + 3 * cos), axis=1),
+                np.stack((x + 3 * cos - 3 * sin, y + 3 * sin + 3 * cos), axis=1),
+            ),
+            axis=1,
+        ) * scale
+        for triangle in corners.tolist():
+            draw.polygon([tuple(corner) for corner in triangle], fill=(255, 255, 255))
+        canvas = np.asarray(image, dtype=np.float32)
+        if frame in marks:
+            yield image
+
+
+def _langtons_ant_frames(params: dict[str, Any], count: int, scale: float) -> Frames:
+    rule = turmite_engine.parse_rule(str(params["rule"]))
+    world = turmite_engine.TurmiteWorld(rule)
+    grid = int(params["grid_res"])
+    palette = turmite_engine.palette(rule.colors)
+    pixels = round(600 * scale)
+    for mark in _marks(int(params["steps"]), count):
+        world.run(mark - world.steps)
+        cells = palette[world.window(-(grid // 2), -(grid // 2), grid)]
+        yield Image.fromarray(cells).resize((pixels, pixels), Image.Resampling.NEAREST)
+
+
+# Circles with a radius under half a pixel (under one pixel across) are summed but not drawn, as in the sketch.
+FOURIER_MIN_RADIUS = 0.5
+FOURIER_TRACE = (0, 255, 255, 60)
+
+
+def _fourier_frames(params: dict[str, Any], count: int, scale: float) -> Frames:
+    spectrum = fourier_engine.spectrum(fourier_engine.sample_shape(params["shape"]))
+    harmonics = min(int(params["harmonics"]), len(spectrum.amp))
+    freq, amp, phase = spectrum.freq[:harmonics], spectrum.amp[:harmonics], spectrum.phase[:harmonics]
+    samples = fourier_engine.SAMPLE_COUNT
+
+    def tip(t: np.ndarray) -> np.ndarray:
+        return complex(400, 300) + (amp * np.exp(1j * (np.outer(t, freq) + phase))).sum(axis=1)
+
+    for mark in _marks(samples, count):
+        now = 2 * math.pi * mark / samples
+        image = _blank((800, 600), scale)
+        draw = ImageDraw.Draw(image, "RGBA")
+        centre = complex(400, 300)
+        for radius, term in zip(amp, amp * np.exp(1j * (freq * now + phase))):
+            if radius < FOURIER_MIN_RADIUS:
+                break
+            box = ((centre.real - radius) * scale, (centre.imag - radius) * scale, (centre.real + radius) * scale, (centre.imag + radius) * scale)
+            draw.ellipse(box, outline=(255, 255, 255, 70), width=max(1, round(1.5 * scale)))
+            draw.line([(centre.real * scale, centre.imag * scale), ((centre + term).real * scale, (centre + term).imag * scale)], fill=(150, 255, 255, 180), width=max(1, round(2.5 * scale)))
+            centre += term
+        path = tip(np.linspace(0.0, now, mark + 1))
+        draw.line(list(zip((path.real * scale).tolist(), (path.imag * scale).tolist())), fill=FOURIER_TRACE, width=max(1, round(4.5 * scale)), joint="curve")
+        yield image
+
+
+TREE_TRUNK = 160
+TREE_RATIO = 0.67
+LSYSTEM_MARGIN = 20
+
+
+def _lerp(a: float, b: float, t: float) -> float:
+    return a + (b - a) * t
+
+
+def _tree_frames(params: dict[str, Any], count: int, scale: float) -> Frames:
+    if params["grammar"] in lsystem_engine.PRESETS:
+        yield from _lsystem_frames(lsystem_engine.PRESETS[params["grammar"]], count, scale)
+        return
+
+    depth = int(params["depth"])
+    base = math.radians(float(params["angle"]))
+    wind = float(params["wind"])
+    for frame in _marks(int(params["duration"]), count):
+        sway = math.sin(0.02 * frame * wind * 2) * (0.08 * wind)
+        image = _blank((800, 600), scale)
+        draw = ImageDraw.Draw(image, "RGBA")
+        angles = np.zeros(1)
+        ends = np.array([[400.0, 600.0 - TREE_TRUNK]])
+        starts = np.array([[400.0, 600.0]])
+        length = float(TREE_TRUNK)
+        for level in range(depth):
+            width = max(1, round((0.5 + (length - 5) * 5.5 / 155) * scale))
+            if level >= depth - 2 and depth > 4:
+                color = (150, 255, 180, 220)
+            else:
+                color = (220, 220, 230, round(_lerp(255, 150, level / 10)))
+            for (x0, y0), (x1, y1) in zip(starts.tolist(), ends.tolist()):
+                draw.line([(x0 * scale, y0 * scale), (x1 * scale, y1 * scale)], fill=color, width=width)
+            # Children of branch k are 2k + 1 (turned +angle) and 2k + 2 (turned -angle).
+            angles = (angles[:, None] + np.array([base, -base]) + sway * level * 0.3).ravel()
+            starts = np.repeat(ends, 2, axis=0)
+            length *= TREE_RATIO
+            ends = starts + length * np.stack((np.sin(angles), -np.cos(angles)), axis=1)
+        yield image
+
+
+def _lsystem_frames(preset: lsystem_engine.LSystemPreset, count: int, scale: float) -> Frames:
+    geometry = lsystem_engine.load_lsystem(preset.system, preset.iterations)
+    width, height = 800, 600
+    fit = min(
+        (width - 2 * LSYSTEM_MARGIN) / max(geometry.width, 1e-6),
+        (height - 2 * LSYSTEM_MARGIN) / max(geometry.height, 1e-6),
+    ) / 65535
+    left = (width - geometry.width * 65535 * fit) / 2
+    top = (height - geometry.height * 65535 * fit) / 2
+    segments = (geometry.vertices * fit + np.array([left, top, left, top])) * scale
+    bands = geometry.band_offsets
+    last_band = max(1, len(bands) - 2)
+    for shown in _marks(geometry.segments, count):
+        image = _blank((width, height), scale)
+        draw = ImageDraw.Draw(image, "RGBA")
+        for band in range(len(bands) - 1):
+            t = band / last_band
+            if geometry.branching:
+                color = tuple(round(_lerp(a, b, t)) for a, b in zip((220, 220, 230, 255), (150, 255, 180, 200)))
+                line_width = _lerp(3, 0.6, t)
+            else:
+                color = tuple(round(_lerp(a, b, t)) for a, b in zip((0, 255, 255), (255, 20, 147))) + (230,)
+                line_width = 1.2
+            for x0, y0, x1, y1 in segments[bands[band] : min(bands[band + 1], shown)].tolist():
+                draw.line([(x0, y0), (x1, y1)], fill=color, width=max(1, round(line_width * scale)))
+        yield image
+
+
+def _ifs_system(params: dict[str, Any]) -> ifs_engine.IFS:
+    if params["system"] in ifs_engine.PRESETS:
+        return ifs_engine.PRESETS[params["system"]]
+    return ifs_engine.polygon_chaos_game(3, float(params["jump_ratio"]))
+
+
+def _density_frames(
+    accumulate: Callable[[int, int, int, int], np.ndarray], size: tuple[int, int], params: dict[str, Any], count: int, scale: float
+) -> Frames:
+    width, height = round(size[0] * scale), round(size[1] * scale)
+    counts = np.zeros((height, width), dtype=np.uint32)
+    done = 0
+    for index, mark in enumerate(_marks(int(params["points"]), count)):
+        counts += accumulate(width, height, mark - done, index)
+        done = mark
+        yield Image.fromarray(attractor_engine.tone_map_density(counts, float(params["gamma"])))
+
+
+def _sierpinski_frames(params: dict[str, Any], count: int, scale: float) -> Frames:
+    system = _ifs_system(params)
+    bounds = ifs_engine.attractor_bounds(system)
+
+    def accumulate(width: int, height: int, points: int, seed: int) -> np.ndarray:
+        return ifs_engine.ifs_density(system, width=width, height=height, points=points, seed=seed, bounds=bounds)
+
+    return _density_frames(accumulate, (700, 700), params, count, scale)
+
+
+def _clifford_frames(params: dict[str, Any], count: int, scale: float) -> Frames:
+    values = {name: float(params[name]) for name in "abcd"}
+
+    def accumulate(width: int, height: int, points: int, seed: int) -> np.ndarray:
+        return attractor_engine.clifford_density(values, width=width, height=height, points=points, seed=seed)
+
+    return _density_frames(accumulate, (800, 600), params, count, scale)
+
+
+_FLOW_DEFAULTS = {"dt": 0.01, "integrator": "rk4", "trail_length": 5000, "thickness": 1.5, "orbit": 0.0}
+
+SCENES: dict[str, Scene] = {
+    "lorenz": Scene((800, 600), {"sigma": 10.0, "rho": 28.0, "beta": 2.667, **_FLOW_DEFAULTS}, _flow_frames("lorenz")),
+    "aizawa": Scene(
+        (800, 600),
+        {"a": 0.95, "b": 0.7, "c": 0.6, "d": 3.5, "e": 0.25, "f": 0.1, **_FLOW_DEFAULTS},
+        _flow_frames("aizawa"),
+    ),
+    "double-pendulum": Scene((800, 600), {"g": 9.81, "m1": 15.0, "m2": 15.0, "substeps": 4, "duration": 600}, _pendulum_frames),
+    "reaction-diffusion": Scene(
+        (256, 256),
+        {"grid_size": 256, "feed": 0.055, "kill": 0.062, "iterations": 4000, "seed": 0},
+        _reaction_diffusion_frames,
+    ),
+    "boids": Scene(
+        (800, 600),
+        {"flock_size": 150, "separation": 1.5, "alignment": 1.0, "cohesion": 1.0, "max_speed": 4.0, "duration": 300, "seed": 0},
+        _boids_frames,
+    ),
+    "langtons-ant": Scene((600, 600), {"rule": "RL", "grid_res": 200, "steps": 12_000}, _langtons_ant_frames),
+    "fourier-epicycles": Scene((800, 600), {"shape": "Heart", "harmonics": 50}, _fourier_frames),
+    "fractal-trees": Scene(
+        (800, 600),
+        {"grammar": "Wind-Blown Binary Tree", "depth": 10, "angle": 25.0, "wind": 1.0, "duration": 60},
+        _tree_frames,
+    ),
+    "sierpinski-triangle": Scene(
+        (700, 700),
+        {"system": "Triangle (Live Chaos Game)", "jump_ratio": 0.5, "points": 2_000_000, "gamma": 1.0},
+        _sierpinski_frames,
+    ),
+    "clifford-attractor": Scene(
+        (800, 600),
+        {"a": -1.4, "b": 1.6, "c": 1.0, "d": 0.7, "points": 4_000_000, "gamma": 1.0},
+        _clifford_frames,
+    ),
+}
+
+
+def scene_params(key: str, overrides: Mapping[str, Any] | None = None) -> dict[str, Any]:
+    if key not in SCENES:
+        raise ValueError(f"No headless renderer for page {key!r}; expected one of {sorted(SCENES)}")
+    params = dict(SCENES[key].defaults)
+    for name, value in (overrides or {}).items():
+        if name not in params:
+            raise ValueError(f"Unknown parameter {name!r} for {key}; expected one of {sorted(params)}")
+        params[name] = value
+    return params
+
+
+def frame_size(key: str, scale: float = 1.0) -> tuple[int, int]:
+    width, height = SCENES[key].size
+    return round(width * scale), round(height * scale)
+
+
+def render_frames(key: str, params: Mapping[str, Any] | None = None, *, count: int, scale: float = 1.0) -> Frames:
+    return SCENES[key].frames(scene_params(key, params), count, scale)
+
+
+def render_still(key: str, params: Mapping[str, Any] | None = None, *, scale: float = 1.0) -> Image.Image:
+    return next(render_frames(key, params, count=1, scale=scale))
+
+
+@dataclass(frozen=True)
+class RenderJob:
+    key: str
+    output_dir: Path
+    frames: int = 1
+    scale: float = 1.0
+    params: Mapping[str, Any] = field(default_factory=dict)
+    video: bool = False
+
+
+@dataclass(frozen=True)
+class RenderResult:
+    key: str
+    paths: tuple[Path, ...]
+    seconds: float
+
+
+# Frames are encoded and written as they are produced, so a long render never holds more than
+# one frame in memory. With `video`, raw frames are piped straight into ffmpeg as well.
+def _run_render_job(job: RenderJob) -> RenderResult:
+    start = time.perf_counter()
+    output_dir = Path(job.output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    encoder = None
+    paths: list[Path] = []
+    if job.video:
+        ffmpeg = shutil.which("ffmpeg")
+        if ffmpeg is None:
+            raise RuntimeError("Video output needs ffmpeg on the PATH")
+        # libx264 with yuv420p needs even dimensions; odd frames lose their last row or column.
+        width, height = (side - side % 2 for side in frame_size(job.key, job.scale))
+        video_path = output_dir / f"{job.key}.mp4"
+        encoder = subprocess.Popen(
+            [
+                ffmpeg, "-y", "-loglevel", "error", "-f", "rawvideo", "-pix_fmt", "rgb24",
+                "-s", f"{width}x{height}", "-r", str(VIDEO_FPS), "-i", "-",
+                "-c:v", "libx264", "-pix_fmt", "yuv420p", str(video_path),
+            ],
+            stdin=subprocess.PIPE,
+        )
+        paths.append(video_path)
+    try:
+        for index, image in enumerate(render_frames(job.key, job.params, count=job.frames, scale=job.scale)):
+            if encoder is not None:
+                if image.size != (width, height):
+                    image = image.crop((0, 0, width, height))
+                encoder.stdin.write(image.tobytes())
+            else:
+                path = output_dir / (f"{job.key}.png" if job.frames == 1 else f"{job.key}_{index:05d}.png")
+                image.save(path, optimize=job.frames == 1)
+                paths.append(path)
+    finally:
+        if encoder is not None:
+            encoder.stdin.close()
+            if encoder.wait() != 0:
+                raise RuntimeError(f"ffmpeg failed while encoding {job.key}")
+    return RenderResult(job.key, tuple(paths), time.perf_counter() - start)
+
+
+def render_batch(jobs: Iterable[RenderJob], *, workers: int | None = None) -> list[RenderResult]:
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(_run_render_job, jobs))
+
+
+def _parse_assignment(text: str) -> tuple[str, Any]:
+    name, found, value = text.partition("=")
+    if not found:
+        raise argparse.ArgumentTypeError(f"Expected name=value, got {text!r}")
+    try:
+        return name.strip(), json.loads(value)
+    except json.JSONDecodeError:
+        return name.strip(), value
+
+
+def main(argv: Sequence[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Render visualization pages without a browser.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    stills = commands.add_parser("still", help="Render the finished state of one or more pages as PNG.")
+    frames = commands.add_parser("frames", help="Render an evenly sampled frame sequence (PNG files or MP4).")
+    for command in (stills, frames):
+        command.add_argument("pages", nargs="*", help="Page keys from visualizations/catalog.py (default: all)")
+        command.add_argument("--output", type=Path, required=True)
+        command.add_argument("--scale", type=float, default=1.0, help="Multiple of the sketch's canvas size")
+        command.add_argument("--set", dest="params", type=_parse_assignment, action="append", default=[], metavar="NAME=VALUE")
+        command.add_argument("--workers", type=int, default=None)
+    frames.add_argument("--frames", type=int, default=60)
+    frames.add_argument("--video", action="store_true", help=f"Encode {VIDEO_FPS} fps MP4 with ffmpeg instead of PNGs")
+
+    args = parser.parse_args(argv)
+    pages = args.pages or list(SCENES)
+    for page in pages:
+        if page not in PAGE_BY_KEY or page not in SCENES:
+            parser.error(f"Unknown page {page!r}; expected one of {', '.join(SCENES)}")
+    if args.command == "frames" and args.video and shutil.which("ffmpeg") is None:
+        parser.error("--video needs ffmpeg on the PATH")
+    params = dict(args.params)
+    if params and len(pages) > 1:
+        parser.error("--set applies to a single page")
+
+    jobs = [
+        RenderJob(
+            page,
+            args.output,
+            frames=args.frames if args.command == "frames" else 1,
+            scale=args.scale,
+            params=params,
+            video=args.command == "frames" and args.video,
+        )
+        for page in pages
+    ]
+    for result in render_batch(jobs, workers=args.workers):
+        target = result.paths[0] if len(result.paths) == 1 else f"{len(result.paths)} frames in {result.paths[0].parent}"
+        print(f"{result.key} -> {target} ({result.seconds:.1f}s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,229 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import math
+from collections.abc import Iterator
+from dataclasses import asdict, dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+from visualizations.attractor_engine import encode_png, keep_cache_file, store_cache_file, tone_map_density
+from visualizations.shared import PROJECT_ROOT, served_file_url
+
+
+IFS_CACHE_DIR = PROJECT_ROOT / ".cache" / "ifs"
+IFS_DISK_CACHE_FILES = 32
+IFS_MEMORY_CACHE_SIZE = 8
+IFS_CHAINS = 4096
+IFS_CHUNK_STEPS = 256
+IFS_WARMUP_STEPS = 64
+BOUNDS_SAMPLE_STEPS = 64
+BOUNDS_PADDING = 0.02
+
+
+# (x, y) -> (a x + b y + e, c x + d y + f), chosen with relative weight `probability`.
+@dataclass(frozen=True)
+class AffineMap:
+    a: float
+    b: float
+    c: float
+    d: float
+    e: float
+    f: float
+    probability: float = 1.0
+
+
+@dataclass(frozen=True)
+class IFS:
+    maps: tuple[AffineMap, ...]
+    # Chaos-game restrictions: map (previous + offset) mod n may not follow the previous map.
+    forbidden: tuple[int, ...] = ()
+
+    def __post_init__(self) -> None:
+        if not self.maps:
+            raise ValueError("An IFS needs at least one map")
+        if any(m.probability < 0 for m in self.maps) or sum(m.probability for m in self.maps) <= 0:
+            raise ValueError("Map probabilities must be non-negative and not all zero")
+        if len({offset % len(self.maps) for offset in self.forbidden}) >= len(self.maps):
+            raise ValueError("The restrictions forbid every map")
+
+    # Row p holds the cumulative probabilities of the next map after map p.
+    def transitions(self) -> np.ndarray:
+        count = len(self.maps)
+        weights = np.tile(np.array([m.probability for m in self.maps], dtype=np.float64), (count, 1))
+        for offset in self.forbidden:
+            weights[np.arange(count), (np.arange(count) + offset) % count] = 0.0
+        if (weights.sum(axis=1) <= 0).any():
+            raise ValueError("The restrictions leave some map without a successor")
+        return np.cumsum(weights / weights.sum(axis=1, keepdims=True), axis=1)
+
+
+# Chaos game on a regular polygon with a flat bottom edge: jump `ratio` of the way to a vertex,
+# numbered clockwise from the top.
+def polygon_chaos_game(sides: int, ratio: float, forbidden: tuple[int, ...] = ()) -> IFS:
+    maps = []
+    turn = 0.5 if sides % 2 == 0 else 0.0
+    for k in range(sides):
+        angle = math.pi / 2 - 2 * math.pi * (k + turn) / sides
+        vx, vy = math.cos(angle), math.sin(angle)
+        maps.append(AffineMap(1 - ratio, 0.0, 0.0, 1 - ratio, ratio * vx, ratio * vy))
+    return IFS(tuple(maps), forbidden)
+
+
+def _carpet() -> IFS:
+    third = 1 / 3
+    return IFS(
+        tuple(
+            AffineMap(third, 0.0, 0.0, third, column * third, row * third)
+            for row in range(3)
+            for column in range(3)
+            if (row, column) != (1, 1)
+        )
+    )
+
+
+PRESETS = {
+    "Barnsley Fern": IFS(
+        (
+            AffineMap(0.0, 0.0, 0.0, 0.16, 0.0, 0.0, 0.01),
+            AffineMap(0.85, 0.04, -0.04, 0.85, 0.0, 1.6, 0.85),
+            AffineMap(0.2, -0.26, 0.23, 0.22, 0.0, 1.6, 0.07),
+            AffineMap(-0.15, 0.28, 0.26, 0.24, 0.0, 0.44, 0.07),
+        )
+    ),
+    "Sierpinski Carpet": _carpet(),
+    "Square, No Repeated Vertex": polygon_chaos_game(4, 0.5, (0,)),
+    "Square, Not the Next Vertex Clockwise": polygon_chaos_game(4, 0.5, (1,)),
+    "Pentagon, No Repeated Vertex": polygon_chaos_game(5, 0.5, (0,)),
+    "Sierpinski Hexagon": polygon_chaos_game(6, 2 / 3),
+}
+
+
+# Yields (x, y, map) batches, IFS_CHAINS independent chains advanced together per step, after a
+# warmup that lets every chain settle onto the attractor.
+def iterate_ifs(ifs: IFS, points: int, *, seed: int = 0) -> Iterator[tuple[np.ndarray, np.ndarray, np.ndarray]]:
+    rng = np.random.default_rng(seed)
+    coefficients = np.array([[m.a, m.b, m.c, m.d, m.e, m.f] for m in ifs.maps]).T
+    a, b, c, d, e, f = coefficients
+    cumulative = ifs.transitions()
+    last = len(ifs.maps) - 1
+    x, y = rng.uniform(-1.0, 1.0, size=(2, IFS_CHAINS))
+    previous = rng.integers(len(ifs.maps), size=IFS_CHAINS)
+
+    def step() -> None:
+        nonlocal x, y, previous
+        draws = rng.random(IFS_CHAINS)
+        if ifs.forbidden:
+            chosen = (draws[:, None] >= cumulative[previous]).sum(axis=1)
+        else:
+            chosen = np.searchsorted(cumulative[0], draws, side="right")
+        chosen = np.minimum(chosen, last)
+        x, y = a[chosen] * x + b[chosen] * y + e[chosen], c[chosen] * x + d[chosen] * y + f[chosen]
+        previous = chosen
+
+    for _ in range(IFS_WARMUP_STEPS):
+        step()
+    steps = -(-points // IFS_CHAINS)
+    buffers = np.empty((3, IFS_CHUNK_STEPS, IFS_CHAINS))
+    for start in range(0, steps, IFS_CHUNK_STEPS):
+        filled = min(IFS_CHUNK_STEPS, steps - start)
+        for index in range(filled):
+            step()
+            buffers[:, index] = x, y, previous
+        remaining = points - start * IFS_CHAINS
+        yield tuple(buffer[:filled].ravel()[:remaining] for buffer in buffers)
+
+
+def attractor_bounds(ifs: IFS, *, seed: int = 0) -> tuple[float, float, float, float]:
+    x, y, _ = next(iterate_ifs(ifs, BOUNDS_SAMPLE_STEPS * IFS_CHAINS, seed=seed + 1))
+    left, right, bottom, top = x.min(), x.max(), y.min(), y.max()
+    pad = BOUNDS_PADDING * max(right - left, top - bottom, 1e-9)
+    return float(left - pad), float(bottom - pad), float(right + pad), float(top + pad)
+
+
+# Hit counts on a width x height grid fitted to the attractor, rows running top to bottom.
+def ifs_density(
+    ifs: IFS,
+    *,
+    width: int,
+    height: int,
+    points: int,
+    seed: int = 0,
+    bounds: tuple[float, float, float, float] | None = None,
+) -> np.ndarray:
+    left, bottom, right, top = bounds or attractor_bounds(ifs, seed=seed)
+    scale = min(width / (right - left), height / (top - bottom))
+    offset_x = (width - (right - left) * scale) / 2
+    offset_y = (height - (top - bottom) * scale) / 2
+    counts = np.zeros(width * height, dtype=np.uint32)
+    for x, y, _ in iterate_ifs(ifs, points, seed=seed):
+        column = np.floor((x - left) * scale + offset_x).astype(np.int64)
+        row = np.floor((top - y) * scale + offset_y).astype(np.int64)
+        inside = (column >= 0) & (column < width) & (row >= 0) & (row < height)
+        counts += np.bincount(row[inside] * width + column[inside], minlength=width * height).astype(np.uint32)
+    return counts.reshape(height, width)
+
+
+@lru_cache(maxsize=4)
+def render_ifs_still(ifs: IFS, size: int, points: int, gamma: float) -> bytes:
+    return encode_png(tone_map_density(ifs_density(ifs, width=size, height=size, points=points), gamma))
+
+
+@dataclass(frozen=True)
+class IFSPoints:
+    key: str
+    # Quantized (x, y, map) per point, y running down the screen, in the order generated.
+    points: np.ndarray
+    width: float
+    height: float
+    maps: int
+
+    @property
+    def path(self) -> Path:
+        return IFS_CACHE_DIR / f"{self.key}.u16"
+
+    def descriptor(self) -> dict[str, Any]:
+        return {
+            "url": served_file_url("ifs_cache", self.path),
+            "count": len(self.points),
+            "width": self.width,
+            "height": self.height,
+            "maps": self.maps,
+        }
+
+
+def ifs_key(ifs: IFS, points: int) -> str:
+    payload = json.dumps({"ifs": asdict(ifs), "points": points}, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:24]
+
+
+def load_ifs_points(ifs: IFS, points: int) -> IFSPoints:
+    cloud = _load_ifs_points(ifs, points)
+    keep_cache_file(cloud.path, cloud.points, IFS_DISK_CACHE_FILES, pattern="*.u16")
+    return cloud
+
+
+@lru_cache(maxsize=IFS_MEMORY_CACHE_SIZE)
+def _load_ifs_points(ifs: IFS, points: int) -> IFSPoints:
+    key = ifs_key(ifs, points)
+    path = IFS_CACHE_DIR / f"{key}.u16"
+    left, bottom, right, top = attractor_bounds(ifs)
+    span = max(right - left, top - bottom)
+
+    if path.exists():
+        data = np.fromfile(path, dtype="<u2").reshape(-1, 3)
+    else:
+        data = np.empty((points, 3), dtype="<u2")
+        filled = 0
+        for x, y, chosen in iterate_ifs(ifs, points):
+            count = len(x)
+            data[filled : filled + count, 0] = np.round(np.clip((x - left) / span, 0.0, 1.0) * 65535)
+            data[filled : filled + count, 1] = np.round(np.clip((top - y) / span, 0.0, 1.0) * 65535)
+            data[filled : filled + count, 2] = chosen
+            filled += count
+        store_cache_file(path, data, IFS_DISK_CACHE_FILES, pattern="*.u16")
+    return IFSPoints(key, data, (right - left) / span, (top - bottom) / span, len(ifs.maps))
@@ -1,6 +1,10 @@
 import streamlit as st
 
 from visualizations.shared import render_p5_iframe
+from visualizations.turmite_engine import MAX_SIMULATED_STEPS, fast_forward_png, parse_rule
+
+STEPS_PER_FRAME = [10, 50, 250, 1_000, 5_000, 20_000, 100_000, 500_000, 1_000_000, 2_000_000, 5_000_000]
+FAST_FORWARD_STEPS = [10_000, 100_000, 1_000_000, 10_000_000, 100_000_000, 1_000_000_000]
 
 def render():
     st.title("Langton's Ant")
@@ -13,83 +17,153 @@ def render():
     The Emergence: Despite completely deterministic and symmetrical rules, the ant behaves chaotically for the first ~10,000 steps, seemingly drawing pseudo-random garbage. Then, inexplicably, it "finds" a pattern and builds a permanent, diagonal "highway" out to infinity.
     
     Adjust **Simulation Speed** to instantly jump to the emergence of the highway!
+
+    The **Rule** generalizes the ant: letter *k* is the turn taken on color *k* (`L`, `R`, `N` for none, `U` for a U-turn), so `RL` is Langton's ant and `LLRR` grows a symmetric pattern. Multi-state turmites use Golly's `{{{write, turn, next}, ...}}` table.
     """, unsafe_allow_html=True)
     
     st.sidebar.header("Langton's Ant Parameters")
+
+    rule_text = st.sidebar.text_input("Rule", value="RL", help="An ant rule such as RL, LLRR or LRRRRRLLR, or a turmite table such as {{{1, 2, 0}, {0, 8, 0}}}")
+    try:
+        rule = parse_rule(rule_text)
+    except ValueError as error:
+        st.sidebar.error(str(error))
+        rule_text = "RL"
+        rule = parse_rule(rule_text)
     
-    speed = st.sidebar.slider("Simulation Speed (Steps/Frame)", min_value=10, max_value=2000, value=250, step=10)
-    grid_res = st.sidebar.slider("Grid Resolution", min_value=100, max_value=400, value=200, step=10)
+    speed = st.sidebar.select_slider(
+        "Simulation Speed (Steps/Frame)",
+        options=STEPS_PER_FRAME,
+        value=250,
+        format_func=lambda steps: f"{steps:,}",
+    )
+    grid_res = st.sidebar.slider("Grid Resolution", min_value=100, max_value=2000, value=200, step=10)
 
-    script_body = f"""
-    const stepsPerFrame = {speed};
-    const gridWidth = {grid_res};
-    const gridHeight = {grid_res};
+    script_body = """
+    // One pixel per cell in an offscreen ImageData, scaled up with smoothing off. Each step
+    // writes only the cell it flips, and only the rectangle the ant visited is uploaded.
+    const BACKGROUND = 0xff0b0b0b;
 
+    let gridWidth;
+    let gridHeight;
     let grid;
     let x, y;
     let dir;
+    let state;
+    let steps = 0;
+    let cellCanvas;
+    let cellContext;
+    let cellImage;
+    let cellPixels;
 
     const UP = 0;
     const RIGHT = 1;
     const DOWN = 2;
     const LEFT = 3;
 
-    function setup() {{
+    function setup() {
       createCanvas(600, 600);
       pixelDensity(1);
+      noStroke();
+      resetGrid();
+    }
 
-      grid = new Array(gridWidth);
-      for (let i = 0; i < gridWidth; i++) {{
-        grid[i] = new Array(gridHeight).fill(0);
-      }}
+    function paramsChanged(keys) {
+      if (keys.includes("gridRes") || keys.includes("rule")) {
+        resetGrid();
+      }
+    }
+
+    function resetGrid() {
+      gridWidth = params.gridRes;
+      gridHeight = params.gridRes;
+      grid = new Uint8Array(gridWidth * gridHeight);
 
       x = Math.floor(gridWidth / 2);
       y = Math.floor(gridHeight / 2);
       dir = UP;
-
-      background(11, 11, 11);
-      noStroke();
-    }}
-
-    function draw() {{
-      let hueVal = (frameCount * 0.2) % 360;
+      state = 0;
+      steps = 0;
+
+      cellCanvas = document.createElement("canvas");
+      cellCanvas.width = gridWidth;
+      cellCanvas.height = gridHeight;
+      cellContext = cellCanvas.getContext("2d");
+      cellImage = cellContext.createImageData(gridWidth, gridHeight);
+      cellPixels = new Uint32Array(cellImage.data.buffer);
+      cellPixels.fill(BACKGROUND);
+      cellContext.putImageData(cellImage, 0, 0);
+    }
+
+    // Color 0 is the background; the others are spread around a hue that drifts over time.
+    function frameColors() {
+      const { colors } = params.rule;
+      const table = new Uint32Array(colors);
+      table[0] = BACKGROUND;
       colorMode(HSB, 360, 100, 100);
-      let cellSize = width / gridWidth;
-
-      for (let n = 0; n < stepsPerFrame; n++) {{
-        let state = grid[x][y];
-
-        if (state === 0) {{
-          dir = (dir + 1) % 4;
-          grid[x][y] = 1;
-          fill(hueVal, 90, 100);
-        }} else {{
-          dir = (dir + 3) % 4;
-          grid[x][y] = 0;
-          fill(11, 11, 11);
-        }}
-
-        rect(x * cellSize, y * cellSize, cellSize, cellSize);
+      for (let c = 1; c < colors; c++) {
+        const [r, g, b] = color((frameCount * 0.2 + (c - 1) * 360 / (colors - 1)) % 360, 90, 100).levels;
+        table[c] = (255 << 24 | b << 16 | g << 8 | r) >>> 0;
+      }
+      colorMode(RGB);
+      return table;
+    }
+
+    function draw() {
+      const cellColors = frameColors();
+      const { colors, write, turn, next } = params.rule;
+      let minX = x;
+      let maxX = x;
+      let minY = y;
+      let maxY = y;
+
+      for (let n = 0; n < params.stepsPerFrame; n++) {
+        const index = y * gridWidth + x;
+        const k = state * colors + grid[index];
+
+        grid[index] = write[k];
+        cellPixels[index] = cellColors[write[k]];
+        dir = (dir + turn[k]) & 3;
+        state = next[k];
 
         if (dir === UP) y--;
         else if (dir === RIGHT) x++;
         else if (dir === DOWN) y++;
-        else if (dir === LEFT) x--;
+        else x--;
 
         if (x > gridWidth - 1) x = 0;
         else if (x < 0) x = gridWidth - 1;
         if (y > gridHeight - 1) y = 0;
         else if (y < 0) y = gridHeight - 1;
-      }}
 
+        if (x < minX) minX = x;
+        else if (x > maxX) maxX = x;
+        if (y < minY) minY = y;
+        else if (y > maxY) maxY = y;
+      }
+      steps += params.stepsPerFrame;
+
+      cellContext.putImageData(cellImage, 0, 0, minX, minY, maxX - minX + 1, maxY - minY + 1);
+      drawingContext.imageSmoothingEnabled = false;
+      drawingContext.drawImage(cellCanvas, 0, 0, width, height);
+
+      let cellSize = width / gridWidth;
       fill(255);
-      rect(x * cellSize, y * cellSize, cellSize, cellSize);
-    }}
+      rect(x * cellSize, y * cellSize, Math.max(cellSize, 1), Math.max(cellSize, 1));
+
+      fill(0, 160);
+      rect(8, height - 26, 150, 18, 4);
+      fill(255, 200);
+      textSize(11);
+      text(`${steps.toLocaleString()} steps`, 14, height - 13);
+    }
     """
 
     render_p5_iframe(
         script_body,
         height=650,
+        sketch_id="langtons-ant",
+        live_params={"stepsPerFrame": speed, "gridRes": grid_res, "rule": rule.payload()},
         canvas_css="""
         width: min(100%, 600px) !important;
         aspect-ratio: 1 / 1;
@@ -99,3 +173,25 @@ def render():
         image-rendering: pixelated;
         """,
     )
+
+    st.subheader("Fast-Forward on the Server")
+    st.caption(
+        "Simulated in Python until the ant settles into a periodic highway, which is then extended "
+        "analytically; only the final bitmap is sent to the browser."
+    )
+    target = st.select_slider("Steps", options=FAST_FORWARD_STEPS, value=1_000_000_000, format_func=lambda steps: f"{steps:,}")
+    if st.button("Fast-Forward"):
+        with st.spinner("Running the ant..."):
+            png, result = fast_forward_png(rule_text, target)
+        st.image(png, use_container_width=True)
+        if result.highway_period:
+            st.caption(
+                f"{result.simulated:,} steps simulated, then a highway with period {result.highway_period} "
+                f"extended over {result.skipped:,} more."
+            )
+        if not result.complete:
+            st.warning(
+                f"No highway appeared within {MAX_SIMULATED_STEPS:,} simulated steps; "
+                f"showing the pattern after {result.steps:,} steps."
+            )
+        st.download_button("Download PNG", png, file_name=f"turmite_{result.steps}.png", mime="image/png")
@@ -1,6 +1,7 @@
 import streamlit as st
 
-from visualizations.shared import render_p5_iframe
+from visualizations.attractor_engine import load_trajectory
+from visualizations.shared import INTEGRATORS, render_p5_iframe
 
 def render():
     st.title("Lorenz Attractor Visualization")
@@ -14,66 +15,114 @@ def render():
     rho = st.sidebar.slider(r"$\rho$ (Rho)", min_value=0.0, max_value=100.0, value=28.0, step=0.1)
     beta = st.sidebar.slider(r"$\beta$ (Beta)", min_value=0.0, max_value=10.0, value=2.667, step=0.01) # 8/3 approx
     dt = st.sidebar.slider("Time Step ($dt$)", min_value=0.001, max_value=0.05, value=0.01, step=0.001)
+    integrator = st.sidebar.selectbox("Integrator", list(INTEGRATORS))
+    steps_per_frame = st.sidebar.slider("Steps Per Frame", min_value=1, max_value=500, value=5, step=1)
     thickness = st.sidebar.slider("Line Thickness", min_value=0.5, max_value=5.0, value=1.5, step=0.1)
+    trail_length = st.sidebar.slider("Trail Length (Points)", min_value=1000, max_value=1_000_000, value=5000, step=1000)
+    prefill = st.sidebar.checkbox("Prefill From Server Cache", value=True)
 
     st.markdown(
         fr"**Current Parameters**: $\sigma={sigma:.2f}$, $\rho={rho:.2f}$, $\beta={beta:.3f}$, $dt={dt:.3f}$, `thickness={thickness}`"
     )
 
-    script_body = f"""
-    const sigma = {sigma};
-    const rho = {rho};
-    const beta = {beta};
-    const dt = {dt};
-    const strokeThickness = {thickness};
+    trajectory = None
+    if prefill:
+        with st.spinner("Integrating trajectory..."):
+            try:
+                trajectory = load_trajectory(
+                    "lorenz",
+                    {"sigma": sigma, "rho": rho, "beta": beta},
+                    points=trail_length,
+                    dt=dt,
+                    method=INTEGRATORS[integrator],
+                ).descriptor()
+            except ValueError as error:
+                st.sidebar.error(str(error))
 
-    let x = 0.01;
-    let y = 0;
-    let z = 0;
+    script_body = """
+    const state = new Float64Array([0.01, 0, 0]);
+    const stepper = new OdeStepper(lorenz, 3);
 
-    let points = [];
+    let trail;
+    let trailColor;
 
-    function setup() {{
+    function setup() {
       createCanvas(800, 600, WEBGL);
       colorMode(HSB, 255);
-    }}
+      trailColor = color(140, 255, 255).levels;
+      trail = new TrailBuffer(params.trailLength);
+      loadTrajectory();
+    }
 
-    function draw() {{
-      background(10, 10, 15);
-      orbitControl();
+    function lorenz(s, out) {
+      const { sigma, rho, beta } = params;
+      out[0] = sigma * (s[1] - s[0]);
+      out[1] = s[0] * (rho - s[2]) - s[1];
+      out[2] = s[0] * s[1] - beta * s[2];
+    }
+
+    function paramsChanged(keys) {
+      if (keys.includes("trailLength")) {
+        trail.resize(params.trailLength);
+      }
+      if (keys.includes("trajectory")) {
+        loadTrajectory();
+      }
+    }
 
-      let dx = (sigma * (y - x)) * dt;
-      let dy = (x * (rho - z) - y) * dt;
-      let dz = (x * y - beta * z) * dt;
+    function pushPoint(x, y, z) {
+      const brightness = constrain(map(z, 0, 50, 255, 50), 0, 255) / 255;
+      trail.push(x, y, z, trailColor[0] * brightness, trailColor[1] * brightness, trailColor[2] * brightness);
+    }
 
-      x += dx;
-      y += dy;
-      z += dz;
+    function loadTrajectory() {
+      const descriptor = params.trajectory;
+      if (!descriptor) return;
+      fetchTrajectory(descriptor, (data) => {
+        if (!params.trajectory || params.trajectory.url !== descriptor.url) return;
+        const { runs, steps } = descriptor;
+        trail.clear();
+        for (let run = 0; run < runs; run++) {
+          if (run > 0) trail.breakLine();
+          for (let i = (run * steps) * 3; i < (run + 1) * steps * 3; i += 3) {
+            pushPoint(data[i], data[i + 1], data[i + 2]);
+          }
+        }
+        state.set(data.subarray(data.length - 3));
+      });
+    }
 
-      points.push(createVector(x, y, z));
+    function draw() {
+      background(10, 10, 15);
+      orbitControl();
 
-      if (points.length > 5000) {{
-        points.shift();
-      }}
+      for (let i = 0; i < params.stepsPerFrame; i++) {
+        stepper.step(params.integrator, state, params.dt);
+        pushPoint(state[0], state[1], state[2]);
+      }
 
       scale(5);
       translate(0, 0, -30);
-      noFill();
-
-      beginShape();
-      for (let v of points) {{
-        let mappedBright = map(v.z, 0, 50, 255, 50);
-        stroke(140, 255, mappedBright);
-        strokeWeight(strokeThickness);
-        vertex(v.x, v.y, v.z);
-      }}
-      endShape();
-    }}
+      trail.draw(params.thickness);
+    }
     """
 
     render_p5_iframe(
         script_body,
         height=650,
+        libraries=("trail_buffer", "integrators"),
+        sketch_id="lorenz",
+        live_params={
+            "sigma": sigma,
+            "rho": rho,
+            "beta": beta,
+            "dt": dt,
+            "integrator": INTEGRATORS[integrator],
+            "stepsPerFrame": steps_per_frame,
+            "thickness": thickness,
+            "trailLength": trail_length,
+            "trajectory": trajectory,
+        },
         body_css="background-color: #0e1117;",
         canvas_css="""
         width: min(100%, 800px) !important;
@@ -0,0 +1,334 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import math
+from collections.abc import Iterator
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+from visualizations.attractor_engine import keep_cache_file, store_cache_file
+from visualizations.shared import PROJECT_ROOT, served_file_url
+
+
+LSYSTEM_CACHE_DIR = PROJECT_ROOT / ".cache" / "lsystems"
+LSYSTEM_DISK_CACHE_FILES = 32
+LSYSTEM_MEMORY_CACHE_SIZE = 8
+MAX_SEGMENTS = 2_000_000
+EXPANSION_CHUNK = 1 << 16
+
+# Turtle alphabet: F and G draw one unit forward, f moves without drawing, + and - turn by the
+# system's angle, | turns around, and [ ] save and restore the turtle. Every other symbol is a
+# variable that only takes part in rewriting.
+DRAW_SYMBOLS = frozenset("FG")
+MOVE_SYMBOLS = frozenset("f")
+TURTLE_COMMANDS = frozenset("+-|[]")
+
+# Curves without branches are split into this many bands along their length for coloring.
+CURVE_BANDS = 16
+
+
+@dataclass(frozen=True)
+class LSystem:
+    axiom: str
+    rules: tuple[tuple[str, str], ...]
+    angle: float
+
+    def __post_init__(self) -> None:
+        if not self.axiom:
+            raise ValueError("The axiom is empty")
+        for symbol, body in self.rules:
+            if len(symbol) != 1 or symbol in TURTLE_COMMANDS or symbol.isspace():
+                raise ValueError(f"Rules rewrite single non-command symbols, not {symbol!r}")
+        for text in (self.axiom, *(body for _, body in self.rules)):
+            depth = 0
+            for symbol in text:
+                depth += (symbol == "[") - (symbol == "]")
+                if depth < 0:
+                    break
+            if depth != 0:
+                raise ValueError(f"Unbalanced brackets in {text!r}")
+
+    @property
+    def branching(self) -> bool:
+        return "[" in self.axiom or any("[" in body for _, body in self.rules)
+
+
+@dataclass(frozen=True)
+class LSystemPreset:
+    system: LSystem
+    iterations: int
+
+
+PRESETS = {
+    "Fractal Plant": LSystemPreset(LSystem("X", (("X", "F+[[X]-X]-F[-FX]+X"), ("F", "FF")), 25.0), 6),
+    "Bushy Tree": LSystemPreset(LSystem("F", (("F", "FF+[+F-F-F]-[-F+F+F]"),), 22.5), 4),
+    "Koch Snowflake": LSystemPreset(LSystem("F--F--F", (("F", "F+F--F+F"),), 60.0), 5),
+    "Dragon Curve": LSystemPreset(LSystem("FX", (("X", "X+YF+"), ("Y", "-FX-Y")), 90.0), 14),
+    "Sierpinski Arrowhead": LSystemPreset(LSystem("YF", (("X", "YF+XF+Y"), ("Y", "XF-YF-X")), 60.0), 8),
+    "Hilbert Curve": LSystemPreset(LSystem("A", (("A", "+BF-AFA-FB+"), ("B", "-AF+BFB+FA-")), 90.0), 6),
+}
+
+
+# One "symbol=replacement" (or "symbol->replacement") per line; blank lines are ignored.
+def parse_rules(text: str) -> tuple[tuple[str, str], ...]:
+    rules: dict[str, str] = {}
+    for line in text.splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        separator = "->" if "->" in line else "="
+        symbol, found, body = line.partition(separator)
+        if not found:
+            raise ValueError(f"Rule {line!r} needs the form X=replacement")
+        rules[symbol.strip()] = "".join(body.split())
+    return tuple(rules.items())
+
+
+def format_rules(rules: tuple[tuple[str, str], ...]) -> str:
+    return "\n".join(f"{symbol}={body}" for symbol, body in rules)
+
+
+def _rule_table(system: LSystem) -> dict[str, str]:
+    return dict(system.rules)
+
+
+def symbol_count(system: LSystem, iterations: int) -> int:
+    rules = _rule_table(system)
+    lengths = dict.fromkeys(set(system.axiom).union(*rules.values(), rules), 1)
+    for _ in range(iterations):
+        lengths = {
+            symbol: sum(lengths[child] for child in rules[symbol]) if symbol in rules else 1 for symbol in lengths
+        }
+    return sum(lengths[symbol] for symbol in system.axiom)
+
+
+def segment_count(system: LSystem, iterations: int) -> int:
+    rules = _rule_table(system)
+    alphabet = set(system.axiom).union(*rules.values(), rules)
+    counts = {symbol: int(symbol in DRAW_SYMBOLS) for symbol in alphabet}
+    for _ in range(iterations):
+        counts = {
+            symbol: sum(counts[child] for child in rules[symbol]) if symbol in rules else counts[symbol]
+            for symbol in counts
+        }
+    return sum(counts[symbol] for symbol in system.axiom)
+
+
+# Yields the expanded string left to right in pieces, so a 10^8-symbol expansion never has to
+# exist in memory. Expansions no longer than `chunk` are memoized per (symbol, depth) and
+# emitted whole; only the few levels above them are walked symbol by symbol.
+def expand(system: LSystem, iterations: int, *, chunk: int = EXPANSION_CHUNK) -> Iterator[str]:
+    rules = _rule_table(system)
+    alphabet = set(system.axiom).union(*rules.values(), rules)
+    lengths = [dict.fromkeys(alphabet, 1)]
+    for _ in range(iterations):
+        previous = lengths[-1]
+        lengths.append(
+            {symbol: sum(previous[child] for child in rules[symbol]) if symbol in rules else 1 for symbol in alphabet}
+        )
+
+    @lru_cache(maxsize=None)
+    def small(symbol: str, depth: int) -> str:
+        if depth == 0 or symbol not in rules:
+            return symbol
+        return "".join(small(child, depth - 1) for child in rules[symbol])
+
+    pending: list[str] = []
+    pending_size = 0
+    stack: list[tuple[Iterator[str], int]] = [(iter(system.axiom), iterations)]
+    while stack:
+        symbols, depth = stack[-1]
+        symbol = next(symbols, None)
+        if symbol is None:
+            stack.pop()
+            continue
+        if lengths[depth][symbol] <= chunk:
+            piece = small(symbol, depth)
+            pending.append(piece)
+            pending_size += len(piece)
+            if pending_size >= chunk:
+                yield "".join(pending)
+                pending, pending_size = [], 0
+        else:
+            stack.append((iter(rules[symbol]), depth - 1))
+    if pending:
+        yield "".join(pending)
+
+
+@dataclass(frozen=True)
+class _Piece:
+    # Segments (x0, y0, x1, y1) drawn by one symbol's expansion from a turtle at the origin
+    # heading up the screen, their bracket depths, and where the turtle ends up.
+    segments: np.ndarray
+    depths: np.ndarray
+    dx: float
+    dy: float
+    turn: float
+
+
+_EMPTY = _Piece(np.empty((0, 4)), np.empty(0, dtype=np.int32), 0.0, 0.0, 0.0)
+_STEP = _Piece(np.array([[0.0, 0.0, 0.0, -1.0]]), np.zeros(1, dtype=np.int32), 0.0, -1.0, 0.0)
+_MOVE = _Piece(_EMPTY.segments, _EMPTY.depths, 0.0, -1.0, 0.0)
+
+
+# The turtle is rotation- and translation-invariant, so every expansion of a symbol at a given
+# depth draws the same shape, only moved and turned. Each (symbol, depth) is traced once from
+# the origin and its parents place rotated copies of it with NumPy, which keeps Python-level
+# work proportional to the size of the rules rather than of the expanded string.
+def trace(system: LSystem, iterations: int) -> tuple[np.ndarray, np.ndarray]:
+    rules = _rule_table(system)
+    delta = math.radians(system.angle)
+    pieces: dict[tuple[str, int], _Piece] = {}
+
+    def piece(symbol: str, depth: int) -> _Piece:
+        if depth == 0 or symbol not in rules:
+            if symbol in DRAW_SYMBOLS:
+                return _STEP
+            return _MOVE if symbol in MOVE_SYMBOLS else _EMPTY
+        key = (symbol, depth)
+        if key not in pieces:
+            pieces[key] = walk(rules[symbol], depth - 1)
+        return pieces[key]
+
+    def walk(body: str, depth: int) -> _Piece:
+        x = y = heading = 0.0
+        level = 0
+        stack: list[tuple[float, float, float]] = []
+        segments: list[np.ndarray] = []
+        depths: list[np.ndarray] = []
+        for symbol in body:
+            if symbol == "+":
+                heading -= delta
+            elif symbol == "-":
+                heading += delta
+            elif symbol == "|":
+                heading += math.pi
+            elif symbol == "[":
+                stack.append((x, y, heading))
+                level += 1
+            elif symbol == "]":
+                x, y, heading = stack.pop()
+                level -= 1
+            else:
+                child = piece(symbol, depth)
+                cos, sin = math.cos(heading), math.sin(heading)
+                if len(child.segments):
+                    placed = np.empty_like(child.segments)
+                    for column in (0, 2):
+                        px, py = child.segments[:, column], child.segments[:, column + 1]
+                        placed[:, column] = x + cos * px - sin * py
+                        placed[:, column + 1] = y + sin * px + cos * py
+                    segments.append(placed)
+                    depths.append(child.depths + level)
+                x, y = x + cos * child.dx - sin * child.dy, y + sin * child.dx + cos * child.dy
+                heading += child.turn
+        if not segments:
+            return _Piece(_EMPTY.segments, _EMPTY.depths, x, y, heading)
+        return _Piece(np.concatenate(segments), np.concatenate(depths), x, y, heading)
+
+    result = walk(system.axiom, iterations)
+    return result.segments, result.depths
+
+
+@dataclass(frozen=True)
+class LSystemGeometry:
+    key: str
+    # Quantized (x0, y0, x1, y1) per segment, grouped by band: bracket depth for branching
+    # systems, position along the curve otherwise.
+    vertices: np.ndarray
+    band_offsets: tuple[int, ...]
+    width: float
+    height: float
+    branching: bool
+    symbols: int
+
+    @property
+    def path(self) -> Path:
+        return LSYSTEM_CACHE_DIR / f"{self.key}.u16"
+
+    @property
+    def segments(self) -> int:
+        return len(self.vertices)
+
+    def descriptor(self) -> dict[str, Any]:
+        return {
+            "url": served_file_url("lsystem_cache", self.path),
+            "segments": self.segments,
+            "bands": list(self.band_offsets),
+            "width": self.width,
+            "height": self.height,
+            "branching": self.branching,
+        }
+
+
+def lsystem_key(system: LSystem, iterations: int) -> str:
+    payload = json.dumps(
+        {"axiom": system.axiom, "rules": system.rules, "angle": system.angle, "iterations": iterations},
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:24]
+
+
+def load_lsystem(system: LSystem, iterations: int) -> LSystemGeometry:
+    geometry = _load_lsystem(system, iterations)
+    keep_cache_file(geometry.path, geometry.vertices, LSYSTEM_DISK_CACHE_FILES, pattern="*.u16", companions=(".json",))
+    return geometry
+
+
+# The sketch fetches the .u16 vertex file; the .json beside it holds the rest of the geometry so
+# that a later process can load both without tracing the system again.
+@lru_cache(maxsize=LSYSTEM_MEMORY_CACHE_SIZE)
+def _load_lsystem(system: LSystem, iterations: int) -> LSystemGeometry:
+    count = segment_count(system, iterations)
+    if count > MAX_SEGMENTS:
+        raise ValueError(f"{iterations} iterations would draw {count:,} segments; the limit is {MAX_SEGMENTS:,}")
+
+    key = lsystem_key(system, iterations)
+    path = LSYSTEM_CACHE_DIR / f"{key}.u16"
+    metadata = path.with_suffix(".json")
+    if path.exists() and metadata.exists():
+        layout = json.loads(metadata.read_text(encoding="utf-8"))
+        return LSystemGeometry(
+            key,
+            np.fromfile(path, dtype="<u2").reshape(-1, 4),
+            tuple(layout["bands"]),
+            layout["width"],
+            layout["height"],
+            system.branching,
+            symbol_count(system, iterations),
+        )
+
+    segments, depths = trace(system, iterations)
+    if system.branching:
+        bands = depths
+    else:
+        bands = np.arange(len(segments)) * CURVE_BANDS // max(1, len(segments))
+    order = np.argsort(bands, kind="stable")
+    segments = segments[order]
+    offsets = np.searchsorted(bands[order], np.arange(int(bands.max(initial=0)) + 2))
+
+    points = segments.reshape(-1, 2)
+    low = points.min(axis=0) if len(points) else np.zeros(2)
+    extent = points.max(axis=0) - low if len(points) else np.zeros(2)
+    scale = float(extent.max()) or 1.0
+    vertices = np.round((segments.reshape(-1, 2) - low) / scale * 65535).astype("<u2").reshape(-1, 4)
+
+    geometry = LSystemGeometry(
+        key,
+        vertices,
+        tuple(int(offset) for offset in offsets),
+        float(extent[0] / scale),
+        float(extent[1] / scale),
+        system.branching,
+        symbol_count(system, iterations),
+    )
+    LSYSTEM_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    layout = {"bands": list(geometry.band_offsets), "width": geometry.width, "height": geometry.height}
+    metadata.write_text(json.dumps(layout), encoding="utf-8")
+    store_cache_file(path, vertices, LSYSTEM_DISK_CACHE_FILES, pattern="*.u16", companions=(".json",))
+    return geometry
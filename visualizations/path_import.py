@@ -0,0 +1,269 @@
+from __future__ import annotations
+
+import math
+import re
+import xml.etree.ElementTree as ElementTree
+from collections.abc import Callable
+from pathlib import PurePath
+
+import numpy as np
+
+
+# Points per curved segment before arc-length resampling evens the spacing out.
+CURVE_SAMPLES = 32
+
+NUMBER_PATTERN = r"[-+]?(?:\d*\.\d+|\d+\.?)(?:[eE][-+]?\d+)?"
+PATH_TOKEN = re.compile(rf"[MmLlHhVvCcSsQqTtAaZz]|{NUMBER_PATTERN}")
+NUMBER = re.compile(NUMBER_PATTERN)
+TRANSFORM = re.compile(r"(matrix|translate|scale|rotate|skewX|skewY)\s*\(([^)]*)\)")
+
+Affine = tuple[float, float, float, float, float, float]
+IDENTITY: Affine = (1.0, 0.0, 0.0, 1.0, 0.0, 0.0)
+
+
+def load_path(data: bytes, filename: str) -> np.ndarray:
+    text = data.decode("utf-8-sig", errors="replace")
+    if PurePath(filename).suffix.lower() == ".svg":
+        points = svg_points(text)
+    else:
+        points = csv_points(text)
+    if len(points) < 3:
+        raise ValueError(f"{filename} does not contain a drawable path (need at least 3 points)")
+    return points
+
+
+# One point per line; the first two numbers on each line are x and y, so headers are skipped.
+def csv_points(text: str) -> np.ndarray:
+    rows = [NUMBER.findall(line) for line in text.splitlines()]
+    pairs = [(float(row[0]), float(row[1])) for row in rows if len(row) >= 2]
+    if not pairs:
+        return np.empty(0, dtype=np.complex128)
+    xy = np.asarray(pairs)
+    return xy[:, 0] + 1j * xy[:, 1]
+
+
+def svg_points(text: str) -> np.ndarray:
+    try:
+        root = ElementTree.fromstring(text)
+    except ElementTree.ParseError as error:
+        raise ValueError(f"Could not parse SVG: {error}") from error
+    pieces: list[np.ndarray] = []
+    _collect_svg(root, IDENTITY, pieces)
+    if not pieces:
+        return np.empty(0, dtype=np.complex128)
+    return np.concatenate(pieces)
+
+
+def _collect_svg(element: ElementTree.Element, transform: Affine, pieces: list[np.ndarray]) -> None:
+    transform = _compose(transform, parse_transform(element.get("transform", "")))
+    tag = element.tag.rsplit("}", 1)[-1]
+    if tag == "path":
+        points = path_points(element.get("d", ""))
+    elif tag in ("polygon", "polyline"):
+        values = np.asarray(NUMBER.findall(element.get("points", "")), dtype=np.float64)
+        pairs = values[: len(values) // 2 * 2].reshape(-1, 2)
+        points = pairs[:, 0] + 1j * pairs[:, 1]
+        if tag == "polygon" and len(points):
+            points = np.append(points, points[0])
+    else:
+        points = None
+    if points is not None and len(points):
+        pieces.append(_apply(transform, points))
+    for child in element:
+        _collect_svg(child, transform, pieces)
+
+
+def parse_transform(text: str) -> Affine:
+    result = IDENTITY
+    for name, arguments in TRANSFORM.findall(text):
+        values = [float(value) for value in NUMBER.findall(arguments)]
+        if name == "matrix" and len(values) == 6:
+            step = tuple(values)
+        elif name == "translate" and values:
+            step = (1.0, 0.0, 0.0, 1.0, values[0], values[1] if len(values) > 1 else 0.0)
+        elif name == "scale" and values:
+            step = (values[0], 0.0, 0.0, values[1] if len(values) > 1 else values[0], 0.0, 0.0)
+        elif name == "rotate" and values:
+            angle = math.radians(values[0])
+            cos, sin = math.cos(angle), math.sin(angle)
+            step = (cos, sin, -sin, cos, 0.0, 0.0)
+            if len(values) == 3:
+                cx, cy = values[1], values[2]
+                step = _compose(_compose((1.0, 0.0, 0.0, 1.0, cx, cy), step), (1.0, 0.0, 0.0, 1.0, -cx, -cy))
+        elif name == "skewX" and values:
+            step = (1.0, 0.0, math.tan(math.radians(values[0])), 1.0, 0.0, 0.0)
+        elif name == "skewY" and values:
+            step = (1.0, math.tan(math.radians(values[0])), 0.0, 1.0, 0.0, 0.0)
+        else:
+            continue
+        result = _compose(result, step)
+    return result
+
+
+def _compose(outer: Affine, inner: Affine) -> Affine:
+    a, b, c, d, e, f = outer
+    a2, b2, c2, d2, e2, f2 = inner
+    return (
+        a * a2 + c * b2,
+        b * a2 + d * b2,
+        a * c2 + c * d2,
+        b * c2 + d * d2,
+        a * e2 + c * f2 + e,
+        b * e2 + d * f2 + f,
+    )
+
+
+def _apply(transform: Affine, points: np.ndarray) -> np.ndarray:
+    a, b, c, d, e, f = transform
+    x, y = points.real, points.imag
+    return (a * x + c * y + e) + 1j * (b * x + d * y + f)
+
+
+def path_points(d: str) -> np.ndarray:
+    tokens = PATH_TOKEN.findall(d)
+    position = 0
+    current = start = 0j
+    last_control: complex | None = None
+    last_command = ""
+    pieces: list[np.ndarray] = []
+    command = ""
+
+    def number() -> float:
+        nonlocal position
+        value = float(tokens[position])
+        position += 1
+        return value
+
+    # Arc flags may be packed without separators ("a1 1 0 01 5 5"), so they are read one digit at a time.
+    def flag() -> bool:
+        nonlocal position
+        token = tokens[position]
+        if len(token) > 1 and token[0] in "01":
+            tokens[position] = token[1:]
+        else:
+            position += 1
+        return token[0] == "1"
+
+    while position < len(tokens):
+        token = tokens[position]
+        if token.isalpha():
+            command = token
+            position += 1
+            if command in "Zz":
+                pieces.append(np.array([start]))
+                current = start
+                last_control, last_command = None, "z"
+                continue
+        elif not command or command in "Zz":
+            raise ValueError("SVG path data has coordinates without a command")
+
+        try:
+            last_control = _path_segment(command, number, flag, current, last_control, last_command, pieces)
+        except (IndexError, ValueError):
+            # A truncated or malformed tail; keep everything parsed so far.
+            break
+        kind = command.lower()
+        current = pieces[-1][-1]
+        if kind == "m":
+            start = current
+            # Further coordinate pairs after a moveto are implicit linetos.
+            command = "l" if command == "m" else "L"
+        last_command = kind
+
+    if not pieces:
+        return np.empty(0, dtype=np.complex128)
+    return np.concatenate(pieces)
+
+
+def _path_segment(
+    command: str,
+    number: Callable[[], float],
+    flag: Callable[[], bool],
+    current: complex,
+    last_control: complex | None,
+    last_command: str,
+    pieces: list[np.ndarray],
+) -> complex | None:
+    relative = command.islower()
+    origin = current if relative else 0j
+    kind = command.lower()
+    if kind in ("m", "l"):
+        pieces.append(np.array([origin + complex(number(), number())]))
+    elif kind == "h":
+        pieces.append(np.array([complex((current.real if relative else 0.0) + number(), current.imag)]))
+    elif kind == "v":
+        pieces.append(np.array([complex(current.real, (current.imag if relative else 0.0) + number())]))
+    elif kind in ("c", "s"):
+        if kind == "c":
+            first = origin + complex(number(), number())
+        elif last_command in ("c", "s") and last_control is not None:
+            first = 2 * current - last_control
+        else:
+            first = current
+        second = origin + complex(number(), number())
+        end = origin + complex(number(), number())
+        pieces.append(_cubic(current, first, second, end))
+        return second
+    elif kind in ("q", "t"):
+        if kind == "q":
+            control = origin + complex(number(), number())
+        elif last_command in ("q", "t") and last_control is not None:
+            control = 2 * current - last_control
+        else:
+            control = current
+        end = origin + complex(number(), number())
+        pieces.append(_quadratic(current, control, end))
+        return control
+    elif kind == "a":
+        rx, ry, rotation = abs(number()), abs(number()), number()
+        large, sweep = flag(), flag()
+        end = origin + complex(number(), number())
+        pieces.append(_arc(current, rx, ry, rotation, large, sweep, end))
+    return None
+
+
+def _curve_parameter() -> np.ndarray:
+    return np.linspace(0.0, 1.0, CURVE_SAMPLES + 1)[1:]
+
+
+def _cubic(p0: complex, p1: complex, p2: complex, p3: complex) -> np.ndarray:
+    t = _curve_parameter()
+    u = 1 - t
+    return u**3 * p0 + 3 * u**2 * t * p1 + 3 * u * t**2 * p2 + t**3 * p3
+
+
+def _quadratic(p0: complex, p1: complex, p2: complex) -> np.ndarray:
+    t = _curve_parameter()
+    u = 1 - t
+    return u**2 * p0 + 2 * u * t * p1 + t**2 * p2
+
+
+# Endpoint-to-center conversion from the SVG specification (implementation notes, F.6.5).
+def _arc(start: complex, rx: float, ry: float, rotation: float, large: bool, sweep: bool, end: complex) -> np.ndarray:
+    if rx == 0 or ry == 0 or start == end:
+        return np.array([end])
+    phi = math.radians(rotation)
+    cos, sin = math.cos(phi), math.sin(phi)
+    half = (start - end) / 2
+    x1 = cos * half.real + sin * half.imag
+    y1 = -sin * half.real + cos * half.imag
+    scale = x1**2 / rx**2 + y1**2 / ry**2
+    if scale > 1:
+        rx, ry = rx * math.sqrt(scale), ry * math.sqrt(scale)
+    numerator = rx**2 * ry**2 - rx**2 * y1**2 - ry**2 * x1**2
+    factor = math.sqrt(max(0.0, numerator / (rx**2 * y1**2 + ry**2 * x1**2)))
+    if large == sweep:
+        factor = -factor
+    cx1, cy1 = factor * rx * y1 / ry, -factor * ry * x1 / rx
+    middle = (start + end) / 2
+    center = complex(cos * cx1 - sin * cy1 + middle.real, sin * cx1 + cos * cy1 + middle.imag)
+
+    theta = math.atan2((y1 - cy1) / ry, (x1 - cx1) / rx)
+    delta = math.atan2((-y1 - cy1) / ry, (-x1 - cx1) / rx) - theta
+    if sweep and delta < 0:
+        delta += 2 * math.pi
+    elif not sweep and delta > 0:
+        delta -= 2 * math.pi
+    angles = theta + delta * _curve_parameter()
+    x, y = rx * np.cos(angles), ry * np.sin(angles)
+    return (cos * x - sin * y + center.real) + 1j * (sin * x + cos * y + center.imag)
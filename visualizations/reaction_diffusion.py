@@ -2,6 +2,12 @@ import streamlit as st
 
 from visualizations.shared import render_p5_iframe
 
+GRID_SIZES = [200, 256, 512, 768, 1024]
+BACKENDS = {
+    "Auto (WebGL, CPU fallback)": "auto",
+    "CPU": "cpu",
+}
+
 def render():
     st.title("Reaction-Diffusion (Turing Pattern)")
     st.markdown(r"""
@@ -15,6 +21,11 @@ def render():
     Use the **real-time sliders below the simulation** to dynamically adjust the **Feed Rate** ($f$) and **Kill Rate** ($k$) and watch a "striped" labyrinthine matrix actively melt into a "spotted" world!
     """, unsafe_allow_html=True)
     
+    st.sidebar.header("Simulation")
+    grid_size = st.sidebar.selectbox("Grid Size", GRID_SIZES, index=GRID_SIZES.index(512), format_func=lambda size: f"{size} × {size}")
+    iterations = st.sidebar.slider("Iterations Per Frame", min_value=1, max_value=64, value=24)
+    backend = st.sidebar.selectbox("Backend", list(BACKENDS))
+
     # We use purely HTML/JS sliders embedded directly with the p5 canvas!
     # This prevents Streamlit from reloading the Python script and resetting the p5.js array state,
     # achieving TRUE real-time "melting" and biological emergence.
@@ -34,15 +45,15 @@ def render():
             <button onclick="setPreset(0.035, 0.065)">Spotted</button>
             <button onclick="setPreset(0.045, 0.065)">Striped</button>
         </div>
+        <div class="slider-group">
+            <label>Backend: <span id="backend-status">starting</span></label>
+        </div>
     </div>
     """
 
     script_body = """
-    const dA = 1.0;
-    const dB = 0.5;
     let feed = 0.055;
     let k = 0.062;
-    const dt = 1.0;
 
     document.getElementById('f-slider').addEventListener('input', (e) => {
       feed = parseFloat(e.target.value);
@@ -62,90 +73,84 @@ def render():
       document.getElementById('k-val').innerText = newK.toFixed(3);
     }
 
-    const w = 200;
-    const h = 200;
-    let gridA = new Float32Array(w * h);
-    let gridB = new Float32Array(w * h);
-    let nextA = new Float32Array(w * h);
-    let nextB = new Float32Array(w * h);
+    // Worker bands keep the main thread free, so they can take larger grids than the
+    // single-threaded last resort, which keeps the original budget.
+    const WORKER_MAX_GRID = 512;
+    const WORKER_MAX_ITERATIONS = 24;
+    const WORKER_COUNT = Math.max(1, Math.min(4, (navigator.hardwareConcurrency || 2) - 1));
+    const CPU_MAX_GRID = 256;
+    const CPU_MAX_ITERATIONS = 10;
+
+    let simulation;
 
     function setup() {
-      let cnv = createCanvas(w, h);
+      let cnv = createCanvas(params.gridSize, params.gridSize);
       cnv.parent(document.body);
       document.body.insertBefore(cnv.elt, document.getElementById('controls'));
 
       pixelDensity(1);
-      gridA.fill(1.0);
-      gridB.fill(0.0);
-
-      for (let i = 0; i < 20; i++) {
-        let startX = floor(random(10, w - 10));
-        let startY = floor(random(10, h - 10));
-        for (let x = startX; x < startX + 15; x++) {
-          for (let y = startY; y < startY + 15; y++) {
-            gridB[y * w + x] = 1.0;
-          }
-        }
+      startSimulation(true);
+    }
+
+    function paramsChanged(keys) {
+      if (keys.includes("gridSize") || keys.includes("backend")) {
+        startSimulation(true);
       }
     }
 
-    function draw() {
-      for (let iter = 0; iter < 10; iter++) {
-        for (let x = 1; x < w - 1; x++) {
-          for (let y = 1; y < h - 1; y++) {
-            let i = y * w + x;
-            let a = gridA[i];
-            let b = gridB[i];
-
-            let lapA = a * -1
-                     + gridA[(y - 1) * w + x] * 0.2 + gridA[(y + 1) * w + x] * 0.2
-                     + gridA[y * w + (x - 1)] * 0.2 + gridA[y * w + (x + 1)] * 0.2
-                     + gridA[(y - 1) * w + (x - 1)] * 0.05 + gridA[(y - 1) * w + (x + 1)] * 0.05
-                     + gridA[(y + 1) * w + (x - 1)] * 0.05 + gridA[(y + 1) * w + (x + 1)] * 0.05;
-
-            let lapB = b * -1
-                     + gridB[(y - 1) * w + x] * 0.2 + gridB[(y + 1) * w + x] * 0.2
-                     + gridB[y * w + (x - 1)] * 0.2 + gridB[y * w + (x + 1)] * 0.2
-                     + gridB[(y - 1) * w + (x - 1)] * 0.05 + gridB[(y - 1) * w + (x + 1)] * 0.05
-                     + gridB[(y + 1) * w + (x - 1)] * 0.05 + gridB[(y + 1) * w + (x + 1)] * 0.05;
-
-            let valA = a + (dA * lapA - a * b * b + feed * (1 - a)) * dt;
-            let valB = b + (dB * lapB + a * b * b - (k + feed) * b) * dt;
-
-            nextA[i] = constrain(valA, 0, 1);
-            nextB[i] = constrain(valB, 0, 1);
-          }
-        }
+    function startSimulation(allowWorkers) {
+      if (simulation && simulation.release) {
+        simulation.release();
+      }
+      simulation = params.backend === "cpu" ? null : GrayScottGpu.create(params.gridSize);
+      if (!simulation && allowWorkers) {
+        simulation = GrayScottWorkers.create(Math.min(params.gridSize, WORKER_MAX_GRID), WORKER_COUNT);
+      }
+      if (!simulation) {
+        simulation = new GrayScottCpu(Math.min(params.gridSize, CPU_MAX_GRID));
+      }
+      const { a, b } = seedGrayScott(simulation.size);
+      simulation.load(a, b);
+      resizeCanvas(simulation.size, simulation.size);
+      loadPixels();
 
-        let tempA = gridA;
-        gridA = nextA;
-        nextA = tempA;
-        let tempB = gridB;
-        gridB = nextB;
-        nextB = tempB;
+      let label = "CPU";
+      if (simulation instanceof GrayScottGpu) {
+        label = "WebGL";
+      } else if (simulation instanceof GrayScottWorkers) {
+        label = `${simulation.workers.length} worker${simulation.workers.length > 1 ? "s" : ""}`;
       }
+      document.getElementById('backend-status').innerText = `${label}, ${simulation.size} × ${simulation.size}`;
+    }
 
-      loadPixels();
-      for (let i = 0; i < gridA.length; i++) {
-        let b = gridB[i];
-        let pIndex = i * 4;
-        let bVal = constrain(b, 0, 1);
-        let r = 11 + bVal * 30;
-        let g = 11 + (bVal > 0.2 ? bVal * 255 : bVal * 120);
-        let bCol = 11 + (bVal > 0.1 ? bVal * 255 * 1.5 : bVal * 150);
-
-        pixels[pIndex + 0] = constrain(r, 0, 255);
-        pixels[pIndex + 1] = constrain(g, 0, 255);
-        pixels[pIndex + 2] = constrain(bCol, 0, 255);
-        pixels[pIndex + 3] = 255;
+    function draw() {
+      if (simulation instanceof GrayScottGpu) {
+        simulation.step(params.iterationsPerFrame, feed, k);
+        simulation.paint();
+        drawingContext.drawImage(simulation.canvas, 0, 0, width, height);
+        return;
+      }
+      if (simulation.failed) {
+        startSimulation(false);
+      }
+      const limit = simulation instanceof GrayScottWorkers ? WORKER_MAX_ITERATIONS : CPU_MAX_ITERATIONS;
+      simulation.step(Math.min(params.iterationsPerFrame, limit), feed, k);
+      if (simulation.paint(pixels)) {
+        updatePixels();
       }
-      updatePixels();
     }
     """
 
     render_p5_iframe(
         script_body,
         height=700,
+        sketch_id="reaction-diffusion",
+        live_params={
+            "gridSize": grid_size,
+            "iterationsPerFrame": iterations,
+            "backend": BACKENDS[backend],
+        },
+        libraries=("gray_scott",),
         body_html=controls_html,
         body_css="""
         flex-direction: column;
@@ -1,15 +1,27 @@
 from __future__ import annotations
 
+import hashlib
+import json
+from collections.abc import Mapping
 from functools import lru_cache
 from pathlib import Path
+from typing import Any, NamedTuple
 
+import streamlit as st
 import streamlit.components.v1 as components
 
 
 PROJECT_ROOT = Path(__file__).resolve().parent.parent
 P5_BUNDLE_PATH = PROJECT_ROOT / "assets" / "vendor" / "p5.min.js"
+SKETCH_LIBRARY_DIR = PROJECT_ROOT / "assets" / "sketch"
 P5_CDN_URL = "https://cdnjs.cloudflare.com/ajax/libs/p5.js/1.9.0/p5.min.js"
 
+# "static" references the bundle by a content-hashed URL so the browser downloads and
+# compiles it once; "inline" pastes it into the document for self-contained exports.
+P5_DELIVERY_STATIC = "static"
+P5_DELIVERY_INLINE = "inline"
+P5_DELIVERY_MODES = (P5_DELIVERY_STATIC, P5_DELIVERY_INLINE)
+
 DEFAULT_BODY_CSS = """
 margin: 0;
 padding: 0;
@@ -26,6 +38,63 @@ max-width: 100%;
 height: auto !important;
 """
 
+# Display names for the steppers in assets/sketch/integrators.js.
+INTEGRATORS = {
+    "RK4": "rk4",
+    "Adaptive RK45": "rk45",
+    "Euler": "euler",
+}
+
+# Prebuilt documents are keyed by their full content, so reruns triggered by unrelated
+# widgets return the same string without formatting it again.
+DOCUMENT_CACHE_SIZE = 64
+
+LIVE_PARAMS_MESSAGE_TYPE = "math-viz:params"
+LIVE_DOCUMENTS_STATE_KEY = "_p5_live_documents"
+
+# Injected ahead of live sketches: exposes a mutable `params` object and applies incoming
+# messages in place, calling the sketch's optional `paramsChanged(keys)` hook afterwards.
+LIVE_PARAMS_PRELUDE = """
+const sketchId = __SKETCH_ID__;
+const params = Object.assign(__INITIAL_PARAMS__, readSharedParams());
+
+function readSharedParams() {
+  try {
+    return (window.parent.__mathVizParams || {})[sketchId] || {};
+  } catch (error) {
+    return {};
+  }
+}
+
+function sameParam(left, right) {
+  return left === right || JSON.stringify(left) === JSON.stringify(right);
+}
+
+window.addEventListener('message', (event) => {
+  const message = event.data;
+  if (!message || message.type !== __MESSAGE_TYPE__ || message.sketch !== sketchId) return;
+  const changed = Object.keys(message.params).filter((key) => !sameParam(params[key], message.params[key]));
+  if (changed.length === 0) return;
+  Object.assign(params, message.params);
+  if (typeof paramsChanged === 'function') paramsChanged(changed);
+});
+"""
+
+# A zero-height iframe whose only job is to deliver the latest values to the sketch frames.
+# The values are also parked on the parent window so a sketch that loads later starts from them.
+LIVE_PARAMS_MESSENGER = """
+<script>
+  const message = __MESSAGE__;
+  try {
+    const store = window.parent.__mathVizParams = window.parent.__mathVizParams || {};
+    store[message.sketch] = message.params;
+  } catch (error) {}
+  for (let i = 0; i < window.parent.frames.length; i++) {
+    window.parent.frames[i].postMessage(message, '*');
+  }
+</script>
+"""
+
 
 @lru_cache(maxsize=None)
 def read_text(path: Path) -> str:
@@ -36,27 +105,73 @@ def load_project_text(*parts: str) -> str:
     return read_text(PROJECT_ROOT.joinpath(*parts))
 
 
-def p5_script_tag() -> str:
-    if P5_BUNDLE_PATH.exists():
+@lru_cache(maxsize=None)
+def file_digest(path: Path) -> str:
+    return hashlib.sha256(path.read_bytes()).hexdigest()[:16]
+
+
+def server_url(*parts: str) -> str:
+    base_path = str(st.get_option("server.baseUrlPath") or "").strip("/")
+    return "/" + "/".join(part for part in (base_path, *parts) if part)
+
+
+def served_file_url(name: str, path: Path, *, version: str = "") -> str:
+    # Streamlit serves component directories from /component/<name>/ with a proper content
+    # type and a bare "Cache-Control: public" (no max-age or immutable, and no way to set one),
+    # so the ?v= digest only guarantees a fresh URL after a change, not a skipped revalidation.
+    # Declaring again on every call is cheap and re-registers the directory after restarts.
+    component = components.declare_component(name, path=str(path.parent))
+    if component.url:
+        url = f"{component.url.rstrip('/')}/{path.name}"
+    else:
+        url = server_url("component", component.name, path.name)
+    return f"{url}?v={version}" if version else url
+
+
+def p5_bundle_url() -> str:
+    return served_file_url("p5_vendor", P5_BUNDLE_PATH, version=file_digest(P5_BUNDLE_PATH))
+
+
+def p5_script_tag(delivery: str = P5_DELIVERY_STATIC) -> str:
+    if delivery not in P5_DELIVERY_MODES:
+        raise ValueError(f"Unknown p5 delivery mode {delivery!r}; expected one of {P5_DELIVERY_MODES}.")
+    if not P5_BUNDLE_PATH.exists():
+        return f'<script src="{P5_CDN_URL}"></script>'
+    if delivery == P5_DELIVERY_INLINE:
         return f"<script>{read_text(P5_BUNDLE_PATH)}</script>"
-    return f'<script src="{P5_CDN_URL}"></script>'
+    return f'<script src="{p5_bundle_url()}"></script>'
 
 
-def render_p5_iframe(
+def sketch_library_tags(libraries: tuple[str, ...]) -> str:
+    return "\n".join(f"<script>{read_text(SKETCH_LIBRARY_DIR / f'{name}.js')}</script>" for name in libraries)
+
+
+def live_params_prelude(sketch_id: str, initial_params: Mapping[str, Any]) -> str:
+    return (
+        LIVE_PARAMS_PRELUDE.replace("__SKETCH_ID__", json.dumps(sketch_id))
+        .replace("__INITIAL_PARAMS__", json.dumps(dict(initial_params)))
+        .replace("__MESSAGE_TYPE__", json.dumps(LIVE_PARAMS_MESSAGE_TYPE))
+    )
+
+
+@lru_cache(maxsize=DOCUMENT_CACHE_SIZE)
+def build_p5_document(
     script_body: str,
     *,
-    height: int = 650,
     body_html: str = "",
     body_css: str = "",
     canvas_css: str = "",
     extra_css: str = "",
     head_html: str = "",
-) -> None:
-    html = f"""
+    p5_delivery: str = P5_DELIVERY_STATIC,
+    libraries: tuple[str, ...] = (),
+) -> str:
+    return f"""
     <!DOCTYPE html>
     <html>
       <head>
-        {p5_script_tag()}
+        {p5_script_tag(p5_delivery)}
+        {sketch_library_tags(libraries)}
         {head_html}
         <style>
           body {{
@@ -80,4 +195,64 @@ def render_p5_iframe(
       </body>
     </html>
     """
-    components.html(html, height=height)
+
+
+# Hits count reruns that rebuilt an identical document.
+class DocumentCacheInfo(NamedTuple):
+    hits: int
+    misses: int
+    maxsize: int | None
+    currsize: int
+
+
+def p5_document_cache_info() -> DocumentCacheInfo:
+    return DocumentCacheInfo(*build_p5_document.cache_info())
+
+
+def send_live_params(sketch_id: str, params: Mapping[str, Any]) -> None:
+    message = {"type": LIVE_PARAMS_MESSAGE_TYPE, "sketch": sketch_id, "params": dict(params)}
+    components.html(LIVE_PARAMS_MESSENGER.replace("__MESSAGE__", json.dumps(message)), height=0)
+
+
+def render_p5_iframe(
+    script_body: str,
+    *,
+    height: int = 650,
+    body_html: str = "",
+    body_css: str = "",
+    canvas_css: str = "",
+    extra_css: str = "",
+    head_html: str = "",
+    p5_delivery: str = P5_DELIVERY_STATIC,
+    libraries: tuple[str, ...] = (),
+    live_params: Mapping[str, Any] | None = None,
+    sketch_id: str | None = None,
+) -> None:
+    document_options = {
+        "body_html": body_html,
+        "body_css": body_css,
+        "canvas_css": canvas_css,
+        "extra_css": extra_css,
+        "head_html": head_html,
+        "p5_delivery": p5_delivery,
+        "libraries": tuple(libraries),
+    }
+    if live_params is None:
+        components.html(build_p5_document(script_body, **document_options), height=height)
+        return
+
+    if not sketch_id:
+        raise ValueError("Live parameter updates need a sketch_id to address the running sketch.")
+
+    # The document is built once with the first parameter values and then reused verbatim,
+    # so Streamlit keeps the existing iframe alive and later values arrive via postMessage.
+    signature = (script_body, height, tuple(sorted(document_options.items())))
+    documents = st.session_state.setdefault(LIVE_DOCUMENTS_STATE_KEY, {})
+    cached = documents.get(sketch_id)
+    if cached is None or cached[0] != signature:
+        prelude = live_params_prelude(sketch_id, live_params)
+        cached = (signature, build_p5_document(f"{prelude}\n{script_body}", **document_options))
+        documents[sketch_id] = cached
+
+    components.html(cached[1], height=height)
+    send_live_params(sketch_id, live_params)
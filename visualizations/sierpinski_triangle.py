@@ -1,7 +1,14 @@
 import streamlit as st
 
+from visualizations.ifs_engine import PRESETS, load_ifs_points, polygon_chaos_game, render_ifs_still
 from visualizations.shared import render_p5_iframe
 
+POINTS_PER_FRAME = [500, 1_500, 5_000, 20_000, 100_000, 250_000, 500_000, 1_000_000, 2_000_000, 5_000_000]
+LIVE_TRIANGLE = "Triangle (Live Chaos Game)"
+SERVER_POINTS = [250_000, 1_000_000, 2_000_000, 4_000_000]
+STILL_SIZES = {"1024 x 1024": 1024, "2048 x 2048": 2048}
+STILL_POINTS = 20_000_000
+
 
 def render():
     st.title("Sierpinski Triangle (Chaos Game)")
@@ -18,31 +25,71 @@ def render():
         With a jump ratio of **0.5**, the forbidden gaps emerge naturally and the fractal appears point by point.
 
         $$P_{n+1} = (1-r)P_n + rV_k$$
+
+        The same game works for any **iterated function system**: a set of affine maps picked at random with
+        given probabilities, like the Barnsley fern, or polygon chaos games that forbid some vertices after others.
+        Those systems are iterated on the server and streamed to the canvas as a point buffer.
         """
     )
 
     st.sidebar.header("Triangle Parameters")
 
-    points_per_frame = st.sidebar.slider("Points Per Frame", min_value=100, max_value=8000, value=1500, step=100)
-    jump_ratio = st.sidebar.slider("Jump Ratio", min_value=0.35, max_value=0.75, value=0.50, step=0.01)
+    system_name = st.sidebar.selectbox("System", [LIVE_TRIANGLE, *PRESETS])
+
+    points_per_frame = st.sidebar.select_slider(
+        "Points Per Frame",
+        options=POINTS_PER_FRAME,
+        value=20_000,
+        format_func=lambda points: f"{points:,}",
+    )
+    jump_ratio = 0.5
+    points = None
+    if system_name == LIVE_TRIANGLE:
+        jump_ratio = st.sidebar.slider("Jump Ratio", min_value=0.35, max_value=0.75, value=0.50, step=0.01)
+        system = polygon_chaos_game(3, jump_ratio)
+    else:
+        system = PRESETS[system_name]
+        server_points = st.sidebar.select_slider(
+            "Server Points", options=SERVER_POINTS, value=1_000_000, format_func=lambda count: f"{count:,}"
+        )
+        with st.spinner("Iterating on the server..."):
+            points = load_ifs_points(system, server_points)
     point_size = st.sidebar.slider("Point Size", min_value=1.0, max_value=4.0, value=1.4, step=0.1)
     glow = st.sidebar.slider("Glow Strength", min_value=0.02, max_value=0.3, value=0.08, step=0.01)
 
     st.markdown(
-        f"**Current Parameters**: `points/frame={points_per_frame}`, `jump_ratio={jump_ratio:.2f}`, `point_size={point_size:.1f}`, `glow={glow:.2f}`"
+        f"**Current Parameters**: `points/frame={points_per_frame:,}`, `jump_ratio={jump_ratio:.2f}`, `point_size={point_size:.1f}`, `glow={glow:.2f}`"
     )
 
-    script_body = f"""
-    const pointsPerFrame = {points_per_frame};
-    const jumpRatio = {jump_ratio};
-    const pointSize = {point_size};
-    const glowStrength = {glow};
+    script_body = """
+    // Points land in an accumulation buffer (hit count plus the hue of the latest hit) that is
+    // tone-mapped into the pixel array once per frame, so glow and point size are applied to the
+    // whole buffer and also restyle everything drawn so far.
+    const BACKGROUND = 15;
+    const EXPOSURE_LUT_SIZE = 2048;
+    const EXPOSURE_LUT_SCALE = 256;
+    const WARMUP_POINTS = 32;
+    const IFS_MARGIN = 40;
 
     let vertices = [];
     let currentPoint;
     let iterations = 0;
+    let hits;
+    let hue;
+    let blurredHits;
+    let blurredHue;
+    let spreadHits;
+    let spreadHue;
+    let colorLut;
+    let pixelView;
+
+    // Server-side systems arrive as quantized (x, y, map) triples (see visualizations/ifs_engine.py)
+    // and are fed into the buffer pointsPerFrame at a time.
+    let ifsPixels = null;
+    let ifsMaps = null;
+    let ifsCursor = 0;
 
-    function buildVertices() {{
+    function buildVertices() {
       const margin = 60;
       const usableWidth = width - margin * 2;
       const triangleHeight = usableWidth * sqrt(3) / 2;
@@ -54,22 +101,107 @@ def render():
         createVector(margin, bottomY),
         createVector(width - margin, bottomY)
       ];
-    }}
+    }
 
-    function setup() {{
+    function setup() {
       createCanvas(700, 700);
       pixelDensity(1);
-      colorMode(HSB, 360, 100, 100, 1);
-      background(0, 0, 6);
-      blendMode(ADD);
       buildVertices();
+      hits = new Uint32Array(width * height);
+      hue = new Uint16Array(width * height);
+      blurredHits = new Float32Array(width * height);
+      blurredHue = new Uint16Array(width * height);
+      spreadHits = new Float32Array(width * height);
+      spreadHue = new Uint16Array(width * height);
+      colorLut = buildColorLut();
+      background(BACKGROUND);
+      // The pixel array is written in full every frame, so it only has to be fetched once.
+      loadPixels();
+      pixelView = new Uint32Array(pixels.buffer);
+      resetBuffer();
+      loadIFS();
+    }
+
+    function paramsChanged(keys) {
+      if (keys.includes("ifs")) {
+        resetBuffer();
+        loadIFS();
+      } else if (keys.includes("jumpRatio")) {
+        resetBuffer();
+      }
+    }
+
+    function loadIFS() {
+      const descriptor = params.ifs;
+      ifsPixels = null;
+      ifsMaps = null;
+      if (!descriptor) return;
+      fetch(descriptor.url)
+        .then((response) => {
+          if (!response.ok) throw new Error(`HTTP ${response.status}`);
+          return response.arrayBuffer();
+        })
+        .then((buffer) => {
+          if (!params.ifs || params.ifs.url !== descriptor.url) return;
+          const data = new Uint16Array(buffer);
+          const count = data.length / 3;
+          const span = (width - IFS_MARGIN * 2) / 65535;
+          const left = (width - descriptor.width * 65535 * span) / 2;
+          const top = (height - descriptor.height * 65535 * span) / 2;
+          ifsPixels = new Uint32Array(count);
+          ifsMaps = new Uint8Array(count);
+          for (let i = 0; i < count; i++) {
+            ifsPixels[i] = Math.floor(top + data[i * 3 + 1] * span) * width + Math.floor(left + data[i * 3] * span);
+            ifsMaps[i] = data[i * 3 + 2];
+          }
+          resetBuffer();
+        })
+        .catch((error) => console.warn("Could not load IFS points:", error));
+    }
+
+    function resetBuffer() {
+      hits.fill(0);
+      iterations = 0;
+      ifsCursor = 0;
       currentPoint = createVector(random(width), random(height));
-    }}
+      for (let i = 0; i < WARMUP_POINTS; i++) {
+        const target = vertices[Math.floor(Math.random() * 3)];
+        currentPoint.x += (target.x - currentPoint.x) * params.jumpRatio;
+        currentPoint.y += (target.y - currentPoint.y) * params.jumpRatio;
+      }
+    }
+
+    // ABGR pixel for each whole hue degree and exposure step. Every hit adds glowStrength of its
+    // color, as the additive point sprites did, with an exponential roll-off per channel instead
+    // of hard clipping.
+    function buildColorLut() {
+      const table = new Uint32Array(360 * EXPOSURE_LUT_SIZE);
+      colorMode(HSB, 360, 100, 100);
+      for (let h = 0; h < 360; h++) {
+        const rgb = color(h, 85, 100).levels.slice(0, 3).map((level) => level / 255);
+        for (let e = 0; e < EXPOSURE_LUT_SIZE; e++) {
+          const [r, g, b] = rgb.map((channel) =>
+            Math.round(BACKGROUND + (255 - BACKGROUND) * (1 - Math.exp(-channel * e / EXPOSURE_LUT_SCALE))));
+          table[h * EXPOSURE_LUT_SIZE + e] = (255 << 24 | b << 16 | g << 8 | r) >>> 0;
+        }
+      }
+      colorMode(RGB);
+      return table;
+    }
 
-    function drawFrameGuide() {{
+    function drawFrameGuide() {
       push();
-      blendMode(BLEND);
-      stroke(185, 30, 100, 0.25);
+      if (!params.ifs) {
+        drawTriangleGuide();
+      }
+      fill(255, 180);
+      textSize(12);
+      text(`iterations: ${iterations.toLocaleString()}`, 16, 24);
+      pop();
+    }
+
+    function drawTriangleGuide() {
+      stroke(180, 250, 255, 64);
       strokeWeight(1.5);
       noFill();
       triangle(
@@ -79,41 +211,125 @@ def render():
       );
 
       noStroke();
-      fill(185, 25, 100, 0.6);
-      for (const vertex of vertices) {{
+      fill(190, 245, 255, 153);
+      for (const vertex of vertices) {
         circle(vertex.x, vertex.y, 10);
-      }}
+      }
+    }
 
-      fill(0, 0, 100, 0.7);
-      textSize(12);
-      text(`iterations: ${{iterations.toLocaleString()}}`, 16, 24);
-      pop();
-    }}
+    function accumulateIFS() {
+      if (!ifsPixels) return;
+      const mapHue = Array.from({ length: params.ifs.maps }, (_, k) => Math.floor(k * 110 + frameCount * 0.6) % 360);
+      const end = Math.min(ifsPixels.length, ifsCursor + params.pointsPerFrame);
+      for (let i = ifsCursor; i < end; i++) {
+        const index = ifsPixels[i];
+        hits[index]++;
+        hue[index] = mapHue[ifsMaps[i]];
+      }
+      iterations += end - ifsCursor;
+      ifsCursor = end;
+    }
 
-    function draw() {{
-      blendMode(ADD);
-      noStroke();
+    function accumulate() {
+      const { jumpRatio, pointsPerFrame } = params;
+      const w = width;
+      const vx = vertices.map((vertex) => vertex.x);
+      const vy = vertices.map((vertex) => vertex.y);
+      const vertexHue = vertices.map((_, k) => Math.floor(k * 110 + frameCount * 0.6) % 360);
+      let px = currentPoint.x;
+      let py = currentPoint.y;
+
+      for (let i = 0; i < pointsPerFrame; i++) {
+        const k = Math.floor(Math.random() * 3);
+        px += (vx[k] - px) * jumpRatio;
+        py += (vy[k] - py) * jumpRatio;
+        const index = (py | 0) * w + (px | 0);
+        hits[index]++;
+        hue[index] = vertexHue[k];
+      }
 
-      for (let i = 0; i < pointsPerFrame; i++) {{
-        const targetIndex = floor(random(vertices.length));
-        const target = vertices[targetIndex];
+      currentPoint.x = px;
+      currentPoint.y = py;
+      iterations += pointsPerFrame;
+    }
 
-        currentPoint.x = lerp(currentPoint.x, target.x, jumpRatio);
-        currentPoint.y = lerp(currentPoint.y, target.y, jumpRatio);
+    // Box filter of width `size` pixels along one axis; each output takes the hue of the
+    // strongest contributing tap. The triangle sits well inside the canvas margin, so the
+    // outermost `reach` pixels of each line are never hit and are skipped.
+    function spread(sourceHits, sourceHue, targetHits, targetHue, size, stride, length, lines, lineStride) {
+      const reach = Math.ceil((size - 1) / 2);
+      const weights = new Float32Array(2 * reach + 1);
+      for (let t = -reach; t <= reach; t++) {
+        weights[t + reach] = Math.max(0, Math.min(t + 0.5, size / 2) - Math.max(t - 0.5, -size / 2));
+      }
+      for (let line = 0; line < lines; line++) {
+        const base = line * lineStride;
+        for (let i = reach; i < length - reach; i++) {
+          const center = base + i * stride;
+          let sum = 0;
+          let best = 0;
+          let bestHue = 0;
+          for (let t = 0, index = center - reach * stride; t < weights.length; t++, index += stride) {
+            const count = sourceHits[index];
+            if (count === 0) continue;
+            const value = count * weights[t];
+            sum += value;
+            if (value > best) {
+              best = value;
+              bestHue = sourceHue[index];
+            }
+          }
+          targetHits[center] = sum;
+          targetHue[center] = bestHue;
+        }
+      }
+    }
 
-        const hueVal = (targetIndex * 110 + frameCount * 0.6 + i * 0.02) % 360;
-        fill(hueVal, 85, 100, glowStrength);
-        circle(currentPoint.x, currentPoint.y, pointSize);
-        iterations += 1;
-      }}
+    function toneMap() {
+      const { pointSize, glowStrength } = params;
+      let sourceHits = hits;
+      let sourceHue = hue;
+      if (pointSize > 1) {
+        spread(hits, hue, spreadHits, spreadHue, pointSize, 1, width, height, width);
+        spread(spreadHits, spreadHue, blurredHits, blurredHue, pointSize, width, height, width, 1);
+        sourceHits = blurredHits;
+        sourceHue = blurredHue;
+      }
 
+      const background = colorLut[0];
+      const exposure = glowStrength * EXPOSURE_LUT_SCALE;
+      const last = EXPOSURE_LUT_SIZE - 1;
+      for (let i = 0; i < pixelView.length; i++) {
+        const count = sourceHits[i];
+        pixelView[i] = count === 0
+          ? background
+          : colorLut[sourceHue[i] * EXPOSURE_LUT_SIZE + Math.min(last, (count * exposure) | 0)];
+      }
+      updatePixels();
+    }
+
+    function draw() {
+      if (params.ifs) {
+        accumulateIFS();
+      } else {
+        accumulate();
+      }
+      toneMap();
       drawFrameGuide();
-    }}
+    }
     """
 
     render_p5_iframe(
         script_body,
         height=750,
+        sketch_id="sierpinski-triangle",
+        live_params={
+            "pointsPerFrame": points_per_frame,
+            "jumpRatio": jump_ratio,
+            "pointSize": point_size,
+            "glowStrength": glow,
+            "ifs": points.descriptor() if points else None,
+        },
         canvas_css="""
         width: min(100%, 700px) !important;
         aspect-ratio: 1 / 1;
@@ -122,3 +338,13 @@ def render():
         border: 1px solid rgba(255, 255, 255, 0.08);
         """,
     )
+
+    st.subheader("High-Resolution Density")
+    st.caption(f"Rendered on the server from {STILL_POINTS:,} iterations of the selected system, log-scaled.")
+    resolution = st.selectbox("Resolution", list(STILL_SIZES))
+    if st.button("Render Density"):
+        size = STILL_SIZES[resolution]
+        with st.spinner("Accumulating density..."):
+            png = render_ifs_still(system, size, STILL_POINTS, 1.0)
+        st.image(png, use_container_width=True)
+        st.download_button("Download PNG", png, file_name=f"ifs_{size}x{size}.png", mime="image/png")
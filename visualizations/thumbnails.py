@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+from collections.abc import Sequence
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from pathlib import Path
+
+from visualizations import (
+    attractor_engine,
+    fourier_engine,
+    gray_scott_engine,
+    headless_render,
+    ifs_engine,
+    lsystem_engine,
+    turmite_engine,
+)
+from visualizations.catalog import VISUALIZATION_PAGES
+from visualizations.headless_render import SCENES, render_still, scene_params
+from visualizations.shared import PROJECT_ROOT, file_digest, served_file_url
+
+
+THUMBNAIL_DIR = PROJECT_ROOT / ".cache" / "thumbnails"
+THUMBNAIL_WIDTH = 480
+THUMBNAIL_QUALITY = 85
+RENDERER_MODULES = (
+    headless_render,
+    attractor_engine,
+    fourier_engine,
+    gray_scott_engine,
+    ifs_engine,
+    lsystem_engine,
+    turmite_engine,
+)
+
+
+# Any change to the renderer or the engines behind it gives every thumbnail a new name.
+@lru_cache(maxsize=1)
+def renderer_digest() -> str:
+    digests = [file_digest(Path(module.__file__)) for module in RENDERER_MODULES]
+    return hashlib.sha256("".join(digests).encode("utf-8")).hexdigest()[:16]
+
+
+def thumbnail_key(page_key: str) -> str:
+    payload = json.dumps(
+        {"page": page_key, "params": scene_params(page_key), "width": THUMBNAIL_WIDTH, "renderer": renderer_digest()},
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+def thumbnail_path(page_key: str) -> Path:
+    return THUMBNAIL_DIR / f"{page_key}-{thumbnail_key(page_key)}.jpg"
+
+
+# Lookup only: pages without a pre-rendered thumbnail get None, never a render.
+def thumbnail_url(page_key: str) -> str | None:
+    if page_key not in SCENES:
+        return None
+    path = thumbnail_path(page_key)
+    return served_file_url("thumbnails", path) if path.exists() else None
+
+
+def render_thumbnail(page_key: str, *, force: bool = False) -> Path:
+    path = thumbnail_path(page_key)
+    if force or not path.exists():
+        image = render_still(page_key, scale=THUMBNAIL_WIDTH / SCENES[page_key].size[0])
+        THUMBNAIL_DIR.mkdir(parents=True, exist_ok=True)
+        partial = path.with_suffix(".part")
+        image.save(partial, format="JPEG", quality=THUMBNAIL_QUALITY, optimize=True)
+        partial.replace(path)
+    for stale in THUMBNAIL_DIR.glob(f"{page_key}-*.jpg"):
+        if stale != path and stale.stem.rsplit("-", 1)[0] == page_key:
+            stale.unlink(missing_ok=True)
+    return path
+
+
+def _render_thumbnail_job(job: tuple[str, bool]) -> Path:
+    page_key, force = job
+    return render_thumbnail(page_key, force=force)
+
+
+def render_thumbnails(page_keys: Sequence[str], *, force: bool = False, workers: int | None = None) -> list[Path]:
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(_render_thumbnail_job, [(page_key, force) for page_key in page_keys]))
+
+
+def main(argv: Sequence[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Pre-render the home page thumbnails.")
+    parser.add_argument("pages", nargs="*", help="Page keys (default: every visualization)")
+    parser.add_argument("--force", action="store_true", help="Re-render thumbnails that are already cached")
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    pages = args.pages or [page.key for page in VISUALIZATION_PAGES if page.key in SCENES]
+    for page in pages:
+        if page not in SCENES:
+            parser.error(f"Unknown page {page!r}; expected one of {', '.join(SCENES)}")
+    for path in render_thumbnails(pages, force=args.force, workers=args.workers):
+        print(path.relative_to(PROJECT_ROOT))
+
+
+if __name__ == "__main__":
+    main()
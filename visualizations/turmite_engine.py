@@ -0,0 +1,408 @@
+from __future__ import annotations
+
+import colorsys
+import json
+import re
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any
+
+import numpy as np
+
+from visualizations.attractor_engine import encode_png
+
+
+# Directions clockwise from up, in screen coordinates (y grows downwards).
+DX = (0, 1, 0, -1)
+DY = (-1, 0, 1, 0)
+TURNS = {"N": 0, "R": 1, "U": 2, "L": 3}
+# Golly's turmite notation {{{write, turn, next}, ...}, ...} encodes turns as flags.
+GOLLY_TURNS = {1: 0, 2: 1, 4: 2, 8: 3}
+
+PATCH_SIZE = 256
+MAX_PATCH_SIZE = 4096
+HIGHWAY_MAX_PERIOD = 2048
+HIGHWAY_REPEATS = 4
+CHECK_INTERVAL = 8192
+MAX_SIMULATED_STEPS = 5_000_000
+
+BACKGROUND = (11, 11, 11)
+ANT_COLOR = (255, 255, 255)
+
+
+@dataclass(frozen=True)
+class Turmite:
+    colors: int
+    states: int
+    # Indexed by state * colors + color read.
+    write: tuple[int, ...]
+    turn: tuple[int, ...]
+    next_state: tuple[int, ...]
+
+    def payload(self) -> dict[str, Any]:
+        return {
+            "colors": self.colors,
+            "write": list(self.write),
+            "turn": list(self.turn),
+            "next": list(self.next_state),
+        }
+
+
+# "RL", "LLRR", ... for ants (turn per color, each color advancing to the next), or a
+# multi-state turmite in Golly's notation, e.g. "{{{1, 2, 0}, {0, 8, 0}}}" for Langton's ant.
+def parse_rule(text: str) -> Turmite:
+    text = text.strip()
+    if text.startswith("{"):
+        try:
+            table = json.loads(text.replace("{", "[").replace("}", "]"))
+            states, colors = len(table), len(table[0])
+            entries = [tuple(int(value) for value in entry) for row in table for entry in row]
+        except (ValueError, TypeError, IndexError) as error:
+            raise ValueError(f"Could not parse turmite table: {error}") from error
+        if any(len(row) != colors for row in table) or any(len(entry) != 3 for entry in entries):
+            raise ValueError("Every state needs one {write, turn, next} entry per color")
+        for write, turn, next_state in entries:
+            if not 0 <= write < colors or turn not in GOLLY_TURNS or not 0 <= next_state < states:
+                raise ValueError(f"Invalid turmite entry {{{write}, {turn}, {next_state}}}")
+        return Turmite(
+            colors,
+            states,
+            tuple(entry[0] for entry in entries),
+            tuple(GOLLY_TURNS[entry[1]] for entry in entries),
+            tuple(entry[2] for entry in entries),
+        )
+
+    rule = text.upper()
+    if not re.fullmatch(r"[LRNU]{2,}", rule):
+        raise ValueError("Ant rules are two or more of L, R, N (no turn) and U (U-turn), e.g. RL or LLRR")
+    colors = len(rule)
+    return Turmite(
+        colors,
+        1,
+        tuple((color + 1) % colors for color in range(colors)),
+        tuple(TURNS[symbol] for symbol in rule),
+        (0,) * colors,
+    )
+
+
+@dataclass(frozen=True)
+class Patch:
+    x: int
+    y: int
+    cells: np.ndarray
+
+
+# `repeats` copies of one period of a highway. Period j (from 0) touches anchor + j * shift +
+# offsets and leaves `values` there; later periods overwrite earlier ones.
+@dataclass(frozen=True)
+class Highway:
+    anchor: tuple[int, int]
+    shift: tuple[int, int]
+    period: int
+    offsets: np.ndarray
+    values: np.ndarray
+    repeats: int
+
+    def cells(self, x0: int, y0: int, x1: int, y1: int) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        ax, ay = self.anchor
+        dx, dy = self.shift
+        columns, rows, values, periods = [], [], [], []
+        for (ox, oy), value in zip(self.offsets.tolist(), self.values.tolist()):
+            low, high = 0, self.repeats - 1
+            for start, step, lo, hi in ((ax + ox, dx, x0, x1), (ay + oy, dy, y0, y1)):
+                if step == 0:
+                    if not lo <= start < hi:
+                        low, high = 1, 0
+                elif step > 0:
+                    low = max(low, -((start - lo) // step))
+                    high = min(high, (hi - 1 - start) // step)
+                else:
+                    low = max(low, -((hi - 1 - start) // -step))
+                    high = min(high, (start - lo) // -step)
+            if low <= high:
+                j = np.arange(low, high + 1)
+                columns.append(ax + ox + j * dx)
+                rows.append(ay + oy + j * dy)
+                values.append(np.full(len(j), value, dtype=np.uint8))
+                periods.append(j)
+        if not columns:
+            empty = np.empty(0, dtype=np.int64)
+            return empty, empty, np.empty(0, dtype=np.uint8)
+        order = np.argsort(np.concatenate(periods), kind="stable")
+        return np.concatenate(columns)[order], np.concatenate(rows)[order], np.concatenate(values)[order]
+
+
+@dataclass(frozen=True)
+class FastForwardResult:
+    steps: int
+    simulated: int
+    skipped: int
+    highway_period: int | None
+    complete: bool
+
+
+@dataclass
+class TurmiteWorld:
+    rule: Turmite
+    x: int = 0
+    y: int = 0
+    direction: int = 0
+    state: int = 0
+    steps: int = 0
+    simulated: int = 0
+    # Frozen layers, oldest first: patches the ant has left behind and skipped highways.
+    layers: list[Patch | Highway] = field(default_factory=list)
+    patch: Patch | None = None
+    history: np.ndarray = field(default_factory=lambda: np.empty(0, dtype=np.int32))
+
+    def __post_init__(self) -> None:
+        if self.patch is None:
+            self.patch = self._paint(self.x - PATCH_SIZE // 2, self.y - PATCH_SIZE // 2, PATCH_SIZE)
+
+    def _paint(self, x: int, y: int, size: int, layers: list[Patch | Highway] | None = None) -> Patch:
+        cells = np.zeros((size, size), dtype=np.uint8)
+        for layer in self.layers if layers is None else layers:
+            if isinstance(layer, Patch):
+                h, w = layer.cells.shape
+                left, top = max(x, layer.x), max(y, layer.y)
+                right, bottom = min(x + size, layer.x + w), min(y + size, layer.y + h)
+                if left < right and top < bottom:
+                    cells[top - y : bottom - y, left - x : right - x] = layer.cells[
+                        top - layer.y : bottom - layer.y, left - layer.x : right - layer.x
+                    ]
+            else:
+                columns, rows, values = layer.cells(x, y, x + size, y + size)
+                flat = (rows - y) * size + (columns - x)
+                # Keep the last write to each cell.
+                _, last = np.unique(flat[::-1], return_index=True)
+                keep = len(flat) - 1 - last
+                cells.flat[flat[keep]] = values[keep]
+        return Patch(x, y, cells)
+
+    def _grow(self) -> None:
+        patch = self.patch
+        size = len(patch.cells)
+        if size * 2 > MAX_PATCH_SIZE:
+            # Leave the full patch behind and carry on in a fresh one around the ant.
+            self.layers.append(patch)
+            self.patch = self._paint(self.x - PATCH_SIZE // 2, self.y - PATCH_SIZE // 2, PATCH_SIZE)
+            return
+        grown = self._paint(patch.x - size // 2, patch.y - size // 2, size * 2)
+        grown.cells[size // 2 : size // 2 + size, size // 2 : size // 2 + size] = patch.cells
+        self.patch = grown
+
+    def run(self, steps: int) -> None:
+        rule = self.rule
+        write, turn, next_state, colors = rule.write, rule.turn, rule.next_state, rule.colors
+        codes: list[int] = []
+        record = codes.append
+        remaining = steps
+        while remaining > 0:
+            patch = self.patch
+            size = len(patch.cells)
+            gx, gy = self.x - patch.x, self.y - patch.y
+            # The ant moves one cell per step, so it cannot leave the patch sooner than this.
+            room = min(gx, gy, size - 1 - gx, size - 1 - gy)
+            if room < 1:
+                self._grow()
+                continue
+            batch = min(remaining, room)
+            cells = memoryview(patch.cells.reshape(-1))
+            d, s = self.direction, self.state
+            for _ in range(batch):
+                index = gy * size + gx
+                k = s * colors + cells[index]
+                record(k * 4 + d)
+                cells[index] = write[k]
+                d = (d + turn[k]) & 3
+                s = next_state[k]
+                gx += DX[d]
+                gy += DY[d]
+            self.x, self.y = gx + patch.x, gy + patch.y
+            self.direction, self.state = d, s
+            remaining -= batch
+        self.steps += steps
+        self.simulated += steps
+        window = HIGHWAY_REPEATS * HIGHWAY_MAX_PERIOD + 3
+        self.history = np.concatenate((self.history, np.asarray(codes, dtype=np.int32)))[-window:]
+
+    # Positions before each of the last `count` steps, relative to the ant's position now.
+    def _recent_positions(self, count: int) -> np.ndarray:
+        codes = self.history[-count:]
+        k, d = codes // 4, codes % 4
+        heading = (d + np.asarray(self.rule.turn)[k]) % 4
+        moves = np.stack((np.asarray(DX)[heading], np.asarray(DY)[heading]), axis=1)
+        return -np.cumsum(moves[::-1], axis=0)[::-1]
+
+    def find_highway(self) -> tuple[int, tuple[int, int]] | None:
+        codes = self.history
+        count = len(codes)
+        limit = min(HIGHWAY_MAX_PERIOD, (count - 3) // HIGHWAY_REPEATS)
+        if limit < 1:
+            return None
+        periods = np.arange(1, limit + 1)
+        # Cheap filter on the last three steps before checking whole windows.
+        candidates = periods[
+            (codes[count - 1 - periods] == codes[-1])
+            & (codes[count - 2 - periods] == codes[-2])
+            & (codes[count - 3 - periods] == codes[-3])
+        ]
+        for period in candidates.tolist():
+            window = codes[-HIGHWAY_REPEATS * period :]
+            if np.array_equal(window[period:], window[:-period]):
+                start = self._recent_positions(period)[0]
+                shift = (-int(start[0]), -int(start[1]))
+                if shift != (0, 0):
+                    return period, shift
+        return None
+
+    # Repeating moves alone do not make a highway: the ant may be retracing an older pattern. The
+    # cells each period touches first (no earlier period of the run touched them) must have read
+    # background in the observed period and must still be background ahead, for every period to
+    # be skipped. Every other cell a period reads was last written by one of the observed periods.
+    def _highway_is_clear(self, positions: np.ndarray, read: np.ndarray, shift: tuple[int, int], repeats: int) -> bool:
+        dx, dy = shift
+        length = dx * dx + dy * dy
+        touched = {tuple(position) for position in positions.tolist()}
+        reach = int(np.ptp(positions @ np.array(shift))) // length + 1
+        leading = []
+        _, first = np.unique(positions, axis=0, return_index=True)
+        for position, color in zip(positions[first].tolist(), read[first].tolist()):
+            # Period -k touched the same offsets moved back by k shifts.
+            back = [k for k in range(1, reach + 1) if (position[0] + k * dx, position[1] + k * dy) in touched]
+            if not back:
+                if color != 0:
+                    return False
+                leading.append(position)
+            elif back[0] >= HIGHWAY_REPEATS:
+                return False
+        if not leading:
+            return False
+        leading = np.unique(np.array(leading, dtype=np.int64), axis=0)
+
+        lx, ly = leading[:, 0], leading[:, 1]
+        far = (repeats + 1) * length
+        for layer in (*self.layers, self.patch):
+            if isinstance(layer, Patch):
+                rows, columns = np.nonzero(layer.cells)
+                rx = (columns + layer.x - self.x)[:, None] - lx
+                ry = (rows + layer.y - self.y)[:, None] - ly
+                along = rx * dx + ry * dy
+                multiple = (rx * dy - ry * dx == 0) & (along % length == 0)
+                if (multiple & (along > 0) & (along <= far)).any():
+                    return False
+            else:
+                # Earlier highways are checked by bounding box; overlapping one only costs a skip.
+                ends = [layer.offsets + np.array(layer.anchor) + j * np.array(layer.shift) for j in (0, layer.repeats - 1)]
+                ahead = [leading + np.array((self.x, self.y)) + j * np.array(shift) for j in (1, repeats + 1)]
+                low = np.minimum(*(np.min(end, axis=0) for end in ends))
+                high = np.maximum(*(np.max(end, axis=0) for end in ends))
+                path_low = np.minimum(*(np.min(end, axis=0) for end in ahead))
+                path_high = np.maximum(*(np.max(end, axis=0) for end in ahead))
+                if (path_low <= high).all() and (low <= path_high).all():
+                    return False
+        return True
+
+    def advance(self, steps: int, *, max_simulated: int = MAX_SIMULATED_STEPS) -> FastForwardResult:
+        target = self.steps + steps
+        simulated_before, skipped, highway_period = self.simulated, 0, None
+        while self.steps < target:
+            if self.simulated - simulated_before >= max_simulated:
+                return FastForwardResult(self.steps, self.simulated - simulated_before, skipped, highway_period, False)
+            self.run(min(CHECK_INTERVAL, target - self.steps))
+            found = self.find_highway()
+            if found is None:
+                continue
+            period, shift = found
+            # One period is left over and simulated after the jump to check the extrapolated state.
+            repeats = (target - self.steps) // period - 1
+            codes = self.history[-period:]
+            positions = self._recent_positions(period)
+            if repeats < 1 or not self._highway_is_clear(positions, (codes // 4) % self.rule.colors, shift, repeats):
+                continue
+            # Offsets of the cells the next period will touch, relative to the ant now.
+            offsets, index = np.unique(positions + shift, axis=0, return_index=True)
+            cells = self.patch.cells
+            values = cells[positions[index, 1] + self.y - self.patch.y, positions[index, 0] + self.x - self.patch.x]
+            saved = (self.x, self.y, self.direction, self.state, self.steps, self.patch, len(self.layers), self.history)
+            self.layers.extend((self.patch, Highway((self.x, self.y), shift, period, offsets, values.copy(), repeats)))
+            self.x += shift[0] * repeats
+            self.y += shift[1] * repeats
+            self.steps += period * repeats
+            self.history = np.empty(0, dtype=np.int32)
+            self.patch = self._paint(self.x - PATCH_SIZE // 2, self.y - PATCH_SIZE // 2, PATCH_SIZE)
+            self.run(period)
+            if np.array_equal(self.history, codes):
+                skipped += period * repeats
+                highway_period = period
+                continue
+            # The extrapolated period did not repeat: undo the jump and keep simulating.
+            self.x, self.y, self.direction, self.state, self.steps, self.patch, layers, self.history = saved
+            del self.layers[layers:]
+        return FastForwardResult(self.steps, self.simulated - simulated_before, skipped, highway_period, True)
+
+    # Colors of the size x size cells from (x, y), with every layer and the live patch applied.
+    def window(self, x: int, y: int, size: int) -> np.ndarray:
+        return self._paint(x, y, size, [*self.layers, self.patch]).cells
+
+    def bounds(self) -> tuple[int, int, int, int]:
+        xs, ys = [self.x], [self.y]
+        for layer in (*self.layers, self.patch):
+            if isinstance(layer, Patch):
+                rows, columns = np.nonzero(layer.cells)
+                if len(rows):
+                    xs += [layer.x + columns.min(), layer.x + columns.max()]
+                    ys += [layer.y + rows.min(), layer.y + rows.max()]
+            else:
+                for j in (0, layer.repeats - 1):
+                    xs += (layer.anchor[0] + j * layer.shift[0] + layer.offsets[:, 0]).tolist()
+                    ys += (layer.anchor[1] + j * layer.shift[1] + layer.offsets[:, 1]).tolist()
+        return int(min(xs)), int(min(ys)), int(max(xs)), int(max(ys))
+
+
+def palette(colors: int) -> np.ndarray:
+    table = np.zeros((colors, 3), dtype=np.uint8)
+    table[0] = BACKGROUND
+    for color in range(1, colors):
+        hue = (0.5 + (color - 1) / max(1, colors - 1)) % 1.0
+        table[color] = [round(channel * 255) for channel in colorsys.hsv_to_rgb(hue, 0.9, 1.0)]
+    return table
+
+
+# A size x size RGB overview of the whole world. Each pixel shows the highest color among the
+# cells it covers, so a highway stays visible however far the view is zoomed out; skipped
+# highways are sampled at a stride that still lands a few times in every pixel.
+def render_bitmap(world: TurmiteWorld, size: int = 512) -> np.ndarray:
+    left, top, right, bottom = world.bounds()
+    span = max(right - left, bottom - top) + 1
+    left -= (span - (right - left + 1)) // 2
+    top -= (span - (bottom - top + 1)) // 2
+    levels = np.zeros(size * size, dtype=np.uint8)
+
+    def plot(columns: np.ndarray, rows: np.ndarray, values: np.ndarray) -> None:
+        px = (columns - left) * size // span
+        py = (rows - top) * size // span
+        inside = (px >= 0) & (px < size) & (py >= 0) & (py < size)
+        np.maximum.at(levels, py[inside] * size + px[inside], values[inside])
+
+    for layer in (*world.layers, world.patch):
+        if isinstance(layer, Patch):
+            rows, columns = np.nonzero(layer.cells)
+            plot(columns + layer.x, rows + layer.y, layer.cells[rows, columns])
+        else:
+            stride = max(1, span // (size * 2 * max(abs(layer.shift[0]), abs(layer.shift[1]))))
+            j = np.arange(0, layer.repeats, stride)
+            for (ox, oy), value in zip(layer.offsets.tolist(), layer.values.tolist()):
+                if value:
+                    plot(layer.anchor[0] + ox + j * layer.shift[0], layer.anchor[1] + oy + j * layer.shift[1], np.full(len(j), value, dtype=np.uint8))
+
+    image = palette(world.rule.colors)[levels].reshape(size, size, 3)
+    image[(world.y - top) * size // span, (world.x - left) * size // span] = ANT_COLOR
+    return image
+
+
+@lru_cache(maxsize=8)
+def fast_forward_png(rule: str, steps: int, size: int = 512) -> tuple[bytes, FastForwardResult]:
+    world = TurmiteWorld(parse_rule(rule))
+    result = world.advance(steps)
+    return encode_png(render_bitmap(world, size)), result